@@ -0,0 +1,118 @@
+"""
+Accounts synced by this deployment.
+
+Without configuration there is a single account taken from the environment
+(TWITTER_USERNAME, GOOGLE_SHEET_ID). Pointing ACCOUNTS_FILE at a JSON list
+syncs many accounts from one process:
+
+    [
+      {"name": "ashebytes", "user_id": "1237140914558164992",
+       "spreadsheet_id": "1bIng...", "sheet": "posts"},
+      {"name": "team", "username": "team", "spreadsheet_id": "1bIng...", "sheet": "team"}
+    ]
+
+user_id saves a lookup; without it the ID is resolved from username once and
+kept in the metadata cache. Each configured account keeps its own local store
+and checkpoints under DATA_DIR/accounts/<name>. summary_sheet names the account's rollup tab
+(default 'summary', or '<sheet> summary' for a tab other than 'posts').
+layout 'append' (with partition 'year' and optionally partition_spreadsheets)
+switches the account to append-only data tabs behind a sorted view, see
+partitions.py.
+"""
+import json
+import os
+import re
+
+from partitions import APPEND, LAYOUTS, NEWEST_FIRST, PARTITION_SCHEMES
+
+DEFAULT_SHEET = 'posts'
+
+ACCOUNT_NAME = re.compile(r'^[\w.-]+$')
+SIMPLE_SHEET_NAME = re.compile(r'^\w+$')
+
+class Account:
+    def __init__(self, name, spreadsheet_id, user_id=None, username='', sheet=DEFAULT_SHEET, data_subdir=None,
+                 summary_sheet=None, layout=NEWEST_FIRST, partition=None, partition_spreadsheets=None):
+        self.name = name
+        self.spreadsheet_id = spreadsheet_id
+        self.user_id = str(user_id) if user_id else None
+        self.username = username or ''
+        self.sheet = sheet
+        self.summary_sheet = summary_sheet or ('summary' if sheet == DEFAULT_SHEET else f'{sheet} summary')
+        # Relative to DATA_DIR; None keeps the single-account layout at its root
+        self.data_subdir = data_subdir
+        self.layout = layout
+        self.partition = partition  # None or 'year', append layout only
+        self.partition_spreadsheets = {str(k): v for k, v in (partition_spreadsheets or {}).items()}
+
+    def a1(self, cells, sheet=None):
+        """Qualify an A1 range with this account's tab (or another), e.g. a1('A2:V') -> 'posts!A2:V'"""
+        sheet = sheet or self.sheet
+        if SIMPLE_SHEET_NAME.match(sheet):
+            return f"{sheet}!{cells}"
+        return "'{}'!{}".format(sheet.replace("'", "''"), cells)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'username': self.username,
+            'user_id': self.user_id,
+            'spreadsheet_id': self.spreadsheet_id,
+            'sheet': self.sheet,
+            'summary_sheet': self.summary_sheet,
+            'layout': self.layout,
+            'partition': self.partition
+        }
+
+    def __repr__(self):
+        return f"Account({self.name!r}, sheet={self.sheet!r})"
+
+def check_layout(name, layout, partition, partition_spreadsheets=None):
+    """Raise ValueError if the layout options don't go together"""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Account {name} has unknown layout {layout!r} (expected one of {', '.join(LAYOUTS)})")
+    if partition is not None and (partition not in PARTITION_SCHEMES or layout != APPEND):
+        raise ValueError(f"Account {name}: partition must be one of {', '.join(PARTITION_SCHEMES)}, "
+                         f"with layout '{APPEND}'")
+    if partition_spreadsheets and partition is None:
+        raise ValueError(f"Account {name}: partition_spreadsheets needs a partition")
+
+def load_accounts(path):
+    """Read the accounts file, raising ValueError on a malformed entry"""
+    with open(path) as f:
+        entries = json.load(f)
+
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} must contain a non-empty JSON list of accounts")
+
+    accounts = []
+    seen = set()
+    for entry in entries:
+        name = entry.get('name') or entry.get('username')
+        if not name or not ACCOUNT_NAME.match(name):
+            raise ValueError(f"Account needs a name of letters, digits, '.', '-' or '_': {entry}")
+        if name in seen:
+            raise ValueError(f"Duplicate account name: {name}")
+        if not entry.get('spreadsheet_id'):
+            raise ValueError(f"Account {name} has no spreadsheet_id")
+        if not entry.get('user_id') and not entry.get('username'):
+            raise ValueError(f"Account {name} needs a user_id or a username")
+        layout = entry.get('layout', NEWEST_FIRST)
+        partition = entry.get('partition')
+        check_layout(name, layout, partition, entry.get('partition_spreadsheets'))
+        seen.add(name)
+
+        accounts.append(Account(
+            name=name,
+            spreadsheet_id=entry['spreadsheet_id'],
+            user_id=entry.get('user_id'),
+            username=entry.get('username', ''),
+            sheet=entry.get('sheet', DEFAULT_SHEET),
+            data_subdir=os.path.join('accounts', name),
+            summary_sheet=entry.get('summary_sheet'),
+            layout=layout,
+            partition=partition,
+            partition_spreadsheets=entry.get('partition_spreadsheets')
+        ))
+
+    return accounts
@@ -1,118 +1,264 @@
 import os
+import functools
 import json
-import re
-import tweepy
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from datetime import datetime
-import pytz
-import schedule
+from datetime import datetime, timezone
+import threading
 import time
-from flask import Flask, jsonify
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, Response, jsonify, request
+from clients import (
+    DATA_DIR, account_path, get_account, get_accounts, get_metadata_cache, get_rate_limits, get_sheet_metadata,
+    get_sheet_tabs, get_sheets_service, get_snapshot_store, get_store, get_twitter_client, invalidate_sheet_metadata,
+    resolve_user_id
+)
+from jobs import JobQueue, report_progress
+from journal import SheetJournal
+from leader import LeaderLock
+from partitions import APPEND, PartitionRouter, view_formula
+from pipeline import prefetch
+from features import TweetFeatureExtractor, build_metric_cells, index_media
+from reconcile import plan_reconcile, reconcile_requests
+import metrics
+from rate_limit import RateLimitExceeded
+from scheduler import Scheduler
+from rollup import Rollup, changed_cells, load_rollup, save_rollup
+from sheet_plan import add_sheet_request, bold_rows_request, column_letter, header_requests, plan_insert_rows, sort_rows_request
+from tweet_export import FORMATS as EXPORT_FORMATS, ExportUnavailable, iter_export
+from tweet_store import snowflake_time
 
 app = Flask(__name__)
 
-SPREADSHEET_ID = '1bIngxeeaZ8cI-SHAg3XpzqEzkIt_Ne3SMvWwneVbXAs'
-RANGE_NAME = 'posts!A:V'  # Extended for new media columns
-
-def get_twitter_client():
-    api_key = os.environ.get('TWITTER_API_KEY')
-    api_key_secret = os.environ.get('TWITTER_API_KEY_SECRET')
-    bearer_token = os.environ.get('TWITTER_BEARER_TOKEN')
-
-    if not api_key or not api_key_secret:
-        raise ValueError("TWITTER_API_KEY and TWITTER_API_KEY_SECRET environment variables are required")
-
-    client = tweepy.Client(
-        consumer_key=api_key,
-        consumer_secret=api_key_secret,
-        bearer_token=bearer_token
-    )
-    return client
-
-def get_sheets_service():
-    service_account_info = json.loads(os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON', '{}'))
-
-    credentials = service_account.Credentials.from_service_account_info(
-        service_account_info,
-        scopes=['https://www.googleapis.com/auth/spreadsheets']
-    )
-
-    service = build('sheets', 'v4', credentials=credentials)
-    return service
-
-def get_time_period(hour):
-    """Categorize hour into time period"""
-    if 5 <= hour < 12:
-        return "Morning"
-    elif 12 <= hour < 17:
-        return "Afternoon"
-    elif 17 <= hour < 21:
-        return "Evening"
-    else:
-        return "Night"
-
-def count_hashtags(text):
-    """Count hashtags in tweet text"""
-    return len(re.findall(r'#\w+', text))
-
-def count_mentions(text):
-    """Count mentions in tweet text, excluding the user's own handle"""
-    username = os.environ.get('TWITTER_USERNAME', '')
-    mentions = re.findall(r'@\w+', text)
-    # Filter out the user's own handle
-    mentions = [m for m in mentions if m.lower() != f"@{username.lower()}"]
-    return len(mentions)
-
-def has_link(text):
-    """Check if tweet has links"""
-    # Look for URLs in tweet text
-    url_pattern = r'https?://\S+|www\.\S+'
-    return "TRUE" if re.search(url_pattern, text) else "FALSE"
-
-def count_images(tweet):
-    """Count number of images in tweet"""
-    # Check attachments for images
-    if hasattr(tweet, 'attachments') and tweet.attachments:
-        media_keys = tweet.attachments.get('media_keys', [])
-        # For now return count of media keys (would need expansion for exact type)
-        return len(media_keys)
-    return 0
-
-def has_images(tweet):
-    """Check if tweet has images"""
-    return "TRUE" if count_images(tweet) > 0 else "FALSE"
-
-def has_video(tweet):
-    """Check if tweet has video"""
-    # Would need media expansion to properly detect, using basic check for now
+HEADERS = ['Date', 'Time', 'Time Period', 'Day of Week', 'Tweet Content', 'Total Engagements',
+           'Likes', 'Retweets', 'Bookmarks', 'Replies', 'Quote Tweets', 'Impressions',
+           'Engagement Rate', 'Tweet Type', 'Has Link', 'Has Image', 'Number of Images', 'Has Video',
+           'Hashtag Count', 'Mention Count', 'Tweet ID', 'Sync Time']
+
+TWEET_FIELDS = ['created_at', 'public_metrics', 'author_id', 'text', 'referenced_tweets', 'attachments']
+# Media objects come back in includes.media of the same timeline response
+EXPANSIONS = ['referenced_tweets.id', 'attachments.media_keys']
+MEDIA_FIELDS = ['media_key', 'type']
+PAGE_SIZE = 100  # Max results per timeline page allowed by the API
+LOOKUP_BATCH_SIZE = 100  # Max tweet IDs per get_tweets lookup
+METRIC_START_COLUMN = 5  # Column F (Total Engagements) through M (Engagement Rate)
+TWEET_ID_COLUMN = 20  # Column U
+
+BACKFILL_STATE_FILE = 'backfill_state.json'
+SYNC_STATE_FILE = 'sync_state.json'  # Page checkpoint of a sync in progress
+PIPELINE_DEPTH = 2  # Timeline pages fetched ahead of the one being written
+JOURNAL_FILE = 'journal.jsonl'  # Sheet writes not yet confirmed, see journal.py
+ROLLUP_FILE = 'rollup.json'  # Summary tab aggregates, see rollup.py
+SCHEDULER_STATE_PATH = os.path.join(DATA_DIR, 'scheduler_state.json')
+PROJECTION_CHUNK_ROWS = 1000  # Rows per request when copying between the store and the sheet
+
+WRITE_ATTEMPTS = int(os.environ.get('WRITE_ATTEMPTS', 4))  # Tries per sheet write before it's left for replay
+WRITE_RETRY_DELAY = 2  # Seconds before the first retry, doubling each time
+
+# Optional JSON-lines log of every timed pipeline stage, see metrics.py
+METRICS_TRACE_LOG = os.environ.get('METRICS_TRACE_LOG')
+
+# Accounts synced at once; they share the Twitter budget and the Sheets quota below
+ACCOUNT_WORKERS = int(os.environ.get('ACCOUNT_WORKERS', 4))
+
+# Interactive syncs give up after RATE_LIMIT_MAX_WAIT (see clients.py); backfills and
+# refreshes wait out the 15-minute window
+RATE_LIMIT_BACKGROUND_WAIT = 15 * 60 + 5
+
+# Cron-style schedules in US/Eastern (minute hour day-of-month month day-of-week)
+SYNC_SCHEDULE = os.environ.get('SYNC_SCHEDULE', '0 6 * * *')
+REFRESH_SCHEDULE = os.environ.get('REFRESH_SCHEDULE', '30 6 * * *')
+MAINTENANCE_SCHEDULE = os.environ.get('MAINTENANCE_SCHEDULE', '0 7 * * 0')
+SCHEDULER_JITTER = int(os.environ.get('SCHEDULER_JITTER', 60))  # Seconds
+REFRESH_MAX_ROWS = int(os.environ.get('REFRESH_MAX_ROWS', 1000))  # Newest rows refreshed by the scheduled job
+# Engagement readings (see snapshots.py) are taken hourly, for whichever tweets are due
+SNAPSHOT_SCHEDULE = os.environ.get('SNAPSHOT_SCHEDULE', '15 * * * *')
+SNAPSHOT_MAX_TWEETS = int(os.environ.get('SNAPSHOT_MAX_TWEETS', 1000))  # Readings per account per run
+# Sync once at startup (missed scheduled runs are caught up either way), after the
+# server has had STARTUP_DELAY seconds to answer its first requests
+STARTUP_SYNC = os.environ.get('STARTUP_SYNC', 'true').lower() not in ('0', 'false', 'no')
+STARTUP_DELAY = float(os.environ.get('STARTUP_DELAY', 0))
+
+# Under gunicorn only the worker holding this lock runs the scheduler and the job
+# queue; the others forward job requests to it (see leader.py)
+LEADER_LOCK_PATH = os.path.join(DATA_DIR, 'scheduler.lock')
+# Each account's last sync outcome, written by the leader and read by every worker's /health
+SYNC_STATUS_PATH = os.path.join(DATA_DIR, 'sync_status.json')
+LEADER_POLL_SECONDS = 5  # How often a follower checks whether the leader has gone
+LEADER_FORWARD_TIMEOUT = 30  # Seconds
+
+scheduler = None
+leader_lock = None  # Set once the election starts; None runs everything in this process
+
+# Syncs, refreshes and maintenance run one at a time off the request threads
+job_queue = JobQueue()
+
+# Write-ahead journal of sheet writes per account
+_journals = {}
+_journal_lock = threading.Lock()
+
+# Serializes read-modify-write of SYNC_STATUS_PATH between this process's sync threads
+_sync_status_lock = threading.Lock()
+
+metrics.PENDING_WRITES.set_function(
+    lambda: {(name,): len(journal.pending()) for name, journal in list(_journals.items())})
+metrics.set_trace_log(METRICS_TRACE_LOG)
+
+# Row builders per account handle
+_feature_extractors = {}
+
+# Summary tab aggregates per account, kept in step with the store
+_rollups = {}
+_rollup_lock = threading.Lock()
+
+# Columnar copy of each account's history for /stats: (store version, TweetColumns)
+_analytics = {}
+_analytics_lock = threading.Lock()
+
+def get_journal(account=None):
+    """Get the account's sheet write journal, loaded once per process"""
+    account = account or get_account()
+    with _journal_lock:
+        journal = _journals.get(account.name)
+        if journal is None:
+            journal = _journals[account.name] = SheetJournal(account_path(account, JOURNAL_FILE))
+        return journal
+
+def is_transient_error(error):
+    """Whether a failed sheet write is worth retrying (rate limits, server errors, network)"""
+    # Already loaded by the time a write has failed
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    if isinstance(error, HttpError):
+        return error.resp.status in (408, 429) or error.resp.status >= 500
+    return isinstance(error, (OSError, httplib2.HttpLib2Error))
+
+def can_resend(entry, error):
+    """Whether a write that failed with error is safe to send again.
+
+    A timeout or server error doesn't say whether the request was applied.
+    Guarded writes are checked first and idempotent ones don't care; any
+    other write is only resent after a rate limit, which the API answers
+    without applying it.
+    """
+    from googleapiclient.errors import HttpError
+
+    if entry['guard'] or entry.get('idempotent'):
+        return True
+    return isinstance(error, HttpError) and error.resp.status == 429
+
+def send_entry(journal, entry):
+    """Send one journaled write, retrying transient errors with backoff, and mark it committed.
+
+    A failed request may still have been applied, so a guarded write checks
+    its guard before each retry and is only marked committed if it holds. A
+    write the API rejects outright is abandoned, since replaying it would
+    fail the same way. Any other failure leaves it pending and is raised.
+    """
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    sheet = get_sheets_service().spreadsheets()
+    api = sheet.values() if entry['kind'].startswith('values.') else sheet
+    method = getattr(api, entry['kind'].split('.')[-1])
+
+    for attempt in range(WRITE_ATTEMPTS):
+        if attempt and entry['guard'] and guard_holds(entry):
+            # The last attempt was applied, but its response was lost
+            journal.commit(entry)
+            return {}
+        try:
+            result = method(**entry['params']).execute()
+            break
+        except HttpError as e:
+            if not is_transient_error(e):
+                journal.abandon(entry, e)
+                raise
+            error = e
+        except (OSError, httplib2.HttpLib2Error) as e:
+            error = e
+
+        if attempt + 1 == WRITE_ATTEMPTS or not can_resend(entry, error):
+            raise error
+        delay = WRITE_RETRY_DELAY * 2 ** attempt
+        print(f"Sheet write {entry['seq']} failed ({error}), retrying in {delay}s")
+        time.sleep(delay)
+
+    journal.commit(entry)
+    return result
+
+def guard_holds(entry):
+    """Whether a journaled write's guard shows it was already applied.
+
+    The guard range is one cell, or a column whose last value is checked
+    (for appends).
+    """
+    cell, value = entry['guard']
+    result = get_sheets_service().spreadsheets().values().get(
+        spreadsheetId=entry['params']['spreadsheetId'],
+        range=cell
+    ).execute()
+    values = result.get('values', [])
+    return bool(values and values[-1]) and str(values[-1][0]) == str(value)
+
+def replay_journal(account=None):
+    """Send the account's pending sheet writes, oldest first. Returns how many were pending."""
+    account = account or get_account()
+    journal = get_journal(account)
+    with journal.lock:
+        pending = journal.pending()
+        if not pending:
+            return 0
+
+        print(f"Replaying {len(pending)} pending sheet writes for {account.name}")
+        for entry in pending:
+            if entry['guard'] and guard_holds(entry):
+                # Applied before, but the commit mark never made it to disk
+                journal.commit(entry)
+            elif not entry['guard'] and not entry.get('idempotent'):
+                # It may have been applied, and sending it again could insert or delete rows twice
+                print(f"Dropping sheet write {entry['seq']}: it may already have been applied; "
+                      f"run reconcile_sheet.py to repair the sheet")
+                journal.abandon(entry, 'unguarded write may already have been applied')
+            else:
+                send_entry(journal, entry)
+        # Replayed inserts may have changed the layout
+        invalidate_sheet_metadata(account)
+        return len(pending)
+
+def journaled_write(kind, params, guard=None, account=None, idempotent=False):
+    """Journal a sheet write, then send it. Returns the API response.
+
+    kind is the Sheets method ('batchUpdate', 'values.batchUpdate' or
+    'values.append') and params its keyword arguments. Earlier pending writes
+    go out first so the sheet always sees writes in order. If the write still
+    fails after retries it stays in the journal for the next replay. A write
+    with neither a guard nor idempotent=True (it only overwrites fixed cells)
+    is never sent twice.
+    """
+    account = account or get_account()
+    journal = get_journal(account)
+    with journal.lock:
+        replay_journal(account)
+        return send_entry(journal, journal.plan(kind, params, guard, idempotent=idempotent))
+
+def get_media_keys(tweet):
     if hasattr(tweet, 'attachments') and tweet.attachments:
-        # If there are attachments but we can't determine type, assume it might have video
-        # In production, you'd expand media objects to check type
-        return "POSSIBLE"
-    return "FALSE"
-
-def get_tweet_type(tweet):
-    """Determine tweet type based on content"""
-    text = tweet.text if hasattr(tweet, 'text') else ''
-    if text.startswith('RT @'):
-        return "Retweet"
-    elif hasattr(tweet, 'referenced_tweets'):
-        ref_tweets = tweet.referenced_tweets or []
-        for ref in ref_tweets:
-            if ref.type == 'replied_to':
-                return "Reply"
-            elif ref.type == 'quoted':
-                return "Quote"
-    return "Regular"
-
-def get_last_tweet_id(service):
-    """Get the ID of the most recent tweet in the spreadsheet (should be in row 2 for descending order)"""
+        return tweet.attachments.get('media_keys', [])
+    return []
+
+def get_last_tweet_id(service, account=None):
+    """Get the ID of the account's most recent tweet (its since_id checkpoint),
+    from the local store or else row 2 of its sheet"""
+    account = account or get_account()
+    last_tweet_id = get_store(account).latest_tweet_id()
+    if last_tweet_id:
+        return last_tweet_id
+
     try:
         sheet = service.spreadsheets()
         result = sheet.values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range='posts!A2:V2'  # Just check row 2 (first data row)
+            spreadsheetId=account.spreadsheet_id,
+            range=account.a1('A2:V2')  # Just check row 2 (first data row)
         ).execute()
 
         values = result.get('values', [])
@@ -122,278 +268,1379 @@ def get_last_tweet_id(service):
         print(f"Error getting last tweet ID: {e}")
     return None
 
-def fetch_tweets(since_id=None):
-    try:
-        twitter_client = get_twitter_client()
-
-        # Hardcoded user ID for ashebytes to save API calls
-        user_id = '1237140914558164992'
+def get_oldest_tweet_id(service, account=None):
+    """Get the ID of the oldest tweet in the spreadsheet (last row of the Tweet ID column)"""
+    account = account or get_account()
+    if account.layout == APPEND:
+        # Data tabs aren't sorted, but the oldest one holds the oldest tweet
+        tabs = data_tabs(account)
+        if not tabs:
+            return None
+        spreadsheet_id, tab = tabs[-1]
+        result = service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=account.a1('U2:U', sheet=tab)
+        ).execute()
+        ids = [row[0] for row in result.get('values', []) if row and str(row[0]).isdigit()]
+        return min(ids, key=int) if ids else None
+
+    result = service.spreadsheets().values().get(
+        spreadsheetId=account.spreadsheet_id,
+        range=account.a1('U2:U')
+    ).execute()
+
+    values = result.get('values', [])
+    for row in reversed(values):
+        if row and row[0]:
+            return row[0]
+    return None
 
+def iter_tweet_pages(since_id=None, until_id=None, pagination_token=None, account=None, max_pages=None):
+    """Yield (tweets, media_types, next_token) for each timeline page, newest first.
+
+    Walks pagination_token until the API stops returning one, which happens at
+    since_id or at the timeline limit (~3,200 most recent tweets), or until
+    max_pages pages have been fetched. media_types
+    maps each media_key on the page to its type; it's also saved to the store
+    so rows can be rebuilt later without asking for the media again.
+    """
+    account = account or get_account()
+    twitter_client = get_twitter_client()
+    user_id = resolve_user_id(account)
+    store = get_store(account)
+
+    pages = 0
+    while True:
         kwargs = {
             'id': user_id,
-            'max_results': 100,  # Get up to 100 tweets
-            'tweet_fields': ['created_at', 'public_metrics', 'author_id', 'text', 'referenced_tweets', 'attachments'],
-            'expansions': ['referenced_tweets.id']
+            'max_results': PAGE_SIZE,
+            'tweet_fields': TWEET_FIELDS,
+            'expansions': EXPANSIONS,
+            'media_fields': MEDIA_FIELDS
         }
 
         if since_id:
             kwargs['since_id'] = since_id
-
-        tweets = twitter_client.get_users_tweets(**kwargs)
-
-        return tweets.data if tweets.data else []
+        if until_id:
+            kwargs['until_id'] = until_id
+        if pagination_token:
+            kwargs['pagination_token'] = pagination_token
+
+        response = twitter_client.get_users_tweets(**kwargs)
+        next_token = (response.meta or {}).get('next_token')
+
+        media_types = index_media((response.includes or {}).get('media'))
+        store.save_media_types(media_types)
+        cache_references(response.data, (response.includes or {}).get('tweets'))
+        # Every page carries public_metrics, so each tweet's first engagement reading is free
+        get_snapshot_store(account).record({str(tweet.id): tweet.public_metrics for tweet in response.data or []})
+
+        yield response.data or [], media_types, next_token
+
+        pages += 1
+        if not next_token or pages == max_pages:
+            return
+        pagination_token = next_token
+
+def tweet_metadata(tweet):
+    """The fields of a tweet that never change, as cached in the metadata cache"""
+    created_at = getattr(tweet, 'created_at', None)
+    author_id = getattr(tweet, 'author_id', None)
+    return {
+        'id': str(tweet.id),
+        'author_id': str(author_id) if author_id else None,
+        'created_at': created_at.isoformat() if created_at else None,
+        'text': getattr(tweet, 'text', None) or ''
+    }
+
+def cache_references(tweets, referenced):
+    """Cache which tweets each tweet references, and the referenced tweets from the page's includes.tweets"""
+    cache = get_metadata_cache()
+    references = {}
+    for tweet in tweets or []:
+        refs = getattr(tweet, 'referenced_tweets', None) or []
+        if refs:
+            references[str(tweet.id)] = [[ref.type, str(ref.id)] for ref in refs]
+    cache.put_many('references', references)
+    cache.put_many('tweet', {str(tweet.id): tweet_metadata(tweet) for tweet in referenced or []})
+
+def lookup_tweets(tweet_ids, fetch_missing=False):
+    """{tweet_id: metadata} from the metadata cache.
+
+    With fetch_missing, uncached tweets are looked up 100 at a time and
+    cached; deleted or protected tweets are left out.
+    """
+    tweet_ids = [str(tweet_id) for tweet_id in tweet_ids]
+    cache = get_metadata_cache()
+    found = cache.get_many('tweet', tweet_ids)
+    missing = [tweet_id for tweet_id in dict.fromkeys(tweet_ids) if tweet_id not in found]
+    if fetch_missing and missing:
+        twitter_client = get_twitter_client()
+        for start in range(0, len(missing), LOOKUP_BATCH_SIZE):
+            batch = missing[start:start + LOOKUP_BATCH_SIZE]
+            response = twitter_client.get_tweets(ids=batch, tweet_fields=['created_at', 'author_id', 'text'])
+            fetched = {str(tweet.id): tweet_metadata(tweet) for tweet in response.data or []}
+            cache.put_many('tweet', fetched)
+            found.update(fetched)
+    return found
+
+def get_referenced_tweets(tweet_ids, fetch_missing=False):
+    """{tweet_id: [{'type': 'quoted'|'replied_to'|'retweeted', 'id', 'author_id', 'created_at', 'text'}]}
+    for those of tweet_ids that reference another tweet. A referenced tweet that
+    isn't cached (or no longer exists) has only its type and id.
+    """
+    references = get_metadata_cache().get_many('references', tweet_ids)
+    referenced = lookup_tweets({ref_id for refs in references.values() for _, ref_id in refs}, fetch_missing)
+    return {
+        tweet_id: [dict(referenced.get(ref_id, {'id': ref_id}), type=ref_type) for ref_type, ref_id in refs]
+        for tweet_id, refs in references.items()
+    }
+
+def load_sync_state(account=None):
+    """The checkpoint of an interrupted sync, if any"""
+    try:
+        with open(account_path(account or get_account(), SYNC_STATE_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def save_sync_state(state, account=None):
+    """Persist the sync checkpoint atomically"""
+    path = account_path(account or get_account(), SYNC_STATE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def clear_sync_state(account=None):
+    try:
+        os.remove(account_path(account or get_account(), SYNC_STATE_FILE))
+    except FileNotFoundError:
+        pass
+
+@metrics.timed('stream_sync')
+def stream_sync(since_id=None, pagination_token=None, account=None):
+    """Fetch, build and write tweets newer than since_id one page at a time. Returns the number written.
+
+    Pages are fetched on a background thread up to PIPELINE_DEPTH pages ahead
+    of the writer, so the next page downloads while the last one is written
+    and memory holds a few pages at most, however many tweets there are. The
+    next page token is checkpointed after every page. Once the first page is
+    stored the store's newest ID has moved past the rest, so an interrupted
+    sync is resumed from its checkpoint rather than restarted from since_id.
+    """
+    account = account or get_account()
+    store = get_store(account)
+    state = {'since_id': since_id, 'pagination_token': pagination_token}
+    save_sync_state(state, account)
+
+    # First sync only takes the newest page; use backfill_tweets() for full history.
+    # With a since_id we keep paging so a gap of more than one page isn't dropped.
+    pages = iter_tweet_pages(since_id=since_id, pagination_token=pagination_token, account=account,
+                             max_pages=None if since_id else 1)
+
+    written = 0
+    for page, media_types, next_token in prefetch(pages, depth=PIPELINE_DEPTH, name=f'fetch-{account.name}'):
+        # A resumed page may already be stored, with its sheet write journaled
+        known = store.known_ids([tweet.id for tweet in page])
+        page = [tweet for tweet in page if str(tweet.id) not in known]
+        if page:
+            report_progress(stage='writing', tweets=written + len(page))
+            if not update_spreadsheet(page, account=account, media_types=media_types):
+                # The rows are in the store and the write is journaled, so a retry replays it
+                raise RuntimeError(f"Failed to update Google Sheets for {account.name}")
+            written += len(page)
+
+        state['pagination_token'] = next_token
+        save_sync_state(state, account)
+
+    clear_sync_state(account)
+    return written
+
+def get_rollup(account):
+    """The account's summary aggregates; rebuilt from the local store if missing or out of step.
+    Call with _rollup_lock held."""
+    store = get_store(account)
+    rollup = _rollups.get(account.name) or load_rollup(account_path(account, ROLLUP_FILE))
+    if rollup is None or rollup.tweets != store.count():
+        print(f"Rebuilding summary aggregates for {account.name} from the local store")
+        written = rollup.written if rollup else None
+        rollup = Rollup.build(store.iter_rows(batch_size=PROJECTION_CHUNK_ROWS))
+        rollup.written = written
+    _rollups[account.name] = rollup
+    return rollup
+
+def store_rows(rows, account=None):
+    """Upsert sheet rows into the local store and fold them into the summary aggregates"""
+    account = account or get_account()
+    store = get_store(account)
+    with _rollup_lock:
+        rollup = get_rollup(account)
+        replaced = store.rows_by_id(row[TWEET_ID_COLUMN] for row in rows)
+        store.upsert_rows(rows)
+        rollup.update(replaced.values(), rows)
+        save_rollup(rollup, account_path(account, ROLLUP_FILE))
+
+def store_metrics(metric_cells, account=None):
+    """Overwrite metric columns (F:M) for {tweet_id: cells} and update the summary aggregates"""
+    account = account or get_account()
+    store = get_store(account)
+    with _rollup_lock:
+        rollup = get_rollup(account)
+        old_rows = store.rows_by_id(metric_cells)
+        new_rows = []
+        for tweet_id, cells in metric_cells.items():
+            store.update_metrics(tweet_id, cells)
+            old_row = old_rows.get(str(tweet_id))
+            if old_row is not None:
+                new_rows.append(old_row[:METRIC_START_COLUMN] + list(cells) + old_row[METRIC_START_COLUMN + len(cells):])
+        rollup.update(old_rows.values(), new_rows)
+        save_rollup(rollup, account_path(account, ROLLUP_FILE))
+
+@metrics.timed('write_summary')
+def write_summary(account=None):
+    """Write the summary tab cells that changed since the last write. Returns the cell count.
+
+    The first write (or the first after a failure) creates the tab if needed
+    and writes the whole grid.
+    """
+    account = account or get_account()
+    with _rollup_lock:
+        rollup = get_rollup(account)
+        grid = rollup.grid()
+        written = rollup.written
+
+    sheet = get_sheets_service().spreadsheets()
+    try:
+        if written is None:
+            result = sheet.get(spreadsheetId=account.spreadsheet_id, fields='sheets.properties.title').execute()
+            titles = [s['properties']['title'] for s in result.get('sheets', [])]
+            if account.summary_sheet not in titles:
+                sheet.batchUpdate(
+                    spreadsheetId=account.spreadsheet_id,
+                    body={'requests': [add_sheet_request(account.summary_sheet)]}
+                ).execute()
+
+        data = [
+            {
+                'range': account.a1(
+                    f'{column_letter(column)}{row + 1}:{column_letter(column + len(values) - 1)}{row + 1}',
+                    sheet=account.summary_sheet
+                ),
+                'values': [values]
+            }
+            for row, column, values in changed_cells(written, grid)
+        ]
+        if data:
+            journaled_write('values.batchUpdate', {
+                'spreadsheetId': account.spreadsheet_id,
+                'body': {'valueInputOption': 'RAW', 'data': data}
+            }, account=account, idempotent=True)
+        written, cells = grid, sum(len(d['values'][0]) for d in data)
     except Exception as e:
-        print(f"Error fetching tweets: {e}")
-        return []
+        # Rewrite the whole grid next time in case the tab was changed or removed
+        print(f"Error writing summary for {account.name}: {e}")
+        written, cells = None, 0
+
+    with _rollup_lock:
+        rollup = get_rollup(account)
+        rollup.written = written
+        save_rollup(rollup, account_path(account, ROLLUP_FILE))
+
+    if cells:
+        metrics.CELLS_UPDATED.inc(cells, account=account.name, source='summary')
+        print(f"Updated {cells} summary cells for {account.name}")
+    return cells
+
+def get_feature_extractor(account=None):
+    """Get the row builder, configured once per account handle"""
+    username = (account or get_account()).username
+    extractor = _feature_extractors.get(username)
+    if extractor is None:
+        extractor = _feature_extractors.setdefault(username, TweetFeatureExtractor(username=username))
+    return extractor
+
+@metrics.timed('build_rows')
+def build_rows(tweets, sync_time=None, account=None, media_types=None):
+    """Turn tweets into sheet rows (columns A:V).
+
+    media_types maps media_key -> type; without it the types are read from
+    the store's media cache in one query.
+    """
+    if media_types is None:
+        media_keys = [key for tweet in tweets for key in get_media_keys(tweet)]
+        media_types = get_store(account).media_types(media_keys) if media_keys else {}
+    return get_feature_extractor(account).transform_batch(tweets, sync_time, media_types)
+
+def ensure_headers(sheet, account=None):
+    """Write the bold header row if the sheet is empty. Returns True if headers were added."""
+    account = account or get_account()
+    metadata = get_sheet_metadata(sheet, account)
+    if metadata['has_headers']:
+        return False
+
+    sheet.batchUpdate(
+        spreadsheetId=account.spreadsheet_id,
+        body={'requests': header_requests(metadata['sheet_id'], HEADERS)}
+    ).execute()
+    metadata['has_headers'] = True
+    return True
+
+def data_tabs(account=None):
+    """(spreadsheet ID, tab) of each tab holding the account's rows: its own tab, or its data tabs newest first"""
+    account = account or get_account()
+    if account.layout != APPEND:
+        return [(account.spreadsheet_id, account.sheet)]
+    return [(partition.spreadsheet_id, partition.sheet) for partition in list_partitions(account)]
+
+def list_partitions(account=None):
+    """The account's data tabs that exist, newest first (append layout)"""
+    account = account or get_account()
+    sheet = get_sheets_service().spreadsheets()
+    router = PartitionRouter(account)
+    return router.existing({
+        spreadsheet_id: get_sheet_tabs(sheet, spreadsheet_id) for spreadsheet_id in router.spreadsheet_ids()
+    })
+
+def ensure_partition(sheet, partition, account=None):
+    """Create a data tab with its header row if it doesn't exist yet. Returns True if it was created."""
+    account = account or get_account()
+    if partition.sheet in get_sheet_tabs(sheet, partition.spreadsheet_id):
+        return False
 
-def update_spreadsheet(tweets, append_mode=True):
+    result = sheet.batchUpdate(
+        spreadsheetId=partition.spreadsheet_id,
+        body={'requests': [add_sheet_request(partition.sheet)]}
+    ).execute()
+    sheet_id = result['replies'][0]['addSheet']['properties']['sheetId']
+    sheet.batchUpdate(
+        spreadsheetId=partition.spreadsheet_id,
+        body={'requests': header_requests(sheet_id, HEADERS)}
+    ).execute()
+    invalidate_sheet_metadata(account, spreadsheet_id=partition.spreadsheet_id)
+    print(f"Created data tab '{partition.sheet}' for {account.name}")
+    return True
+
+def write_view(account=None):
+    """Write the header row and the sorting formula over the data tabs to the account's tab (append layout)"""
+    account = account or get_account()
+    sheet = get_sheets_service().spreadsheets()
+    if account.sheet not in get_sheet_tabs(sheet, account.spreadsheet_id):
+        sheet.batchUpdate(
+            spreadsheetId=account.spreadsheet_id,
+            body={'requests': [add_sheet_request(account.sheet)]}
+        ).execute()
+        invalidate_sheet_metadata(account)
+
+    formula = view_formula(account, list_partitions(account))
+    journaled_write('values.batchUpdate', {
+        'spreadsheetId': account.spreadsheet_id,
+        'body': {'valueInputOption': 'USER_ENTERED', 'data': [
+            {'range': account.a1('A1:V1'), 'values': [HEADERS]},
+            {'range': account.a1('A2'), 'values': [[formula or '']]}
+        ]}
+    }, account=account, idempotent=True)
+
+def plan_appends(rows, account=None):
+    """Journal values.append writes adding rows below the existing data. Returns the entries, not yet sent.
+
+    Each append is guarded by its last tweet ID ending up at the bottom of
+    the tab, so a replay never appends the rows twice. In the append layout
+    the rows are routed to their data tabs, one append per tab; new data
+    tabs are created (and the view updated) first.
+    """
+    account = account or get_account()
+    journal = get_journal(account)
+    id_column = column_letter(TWEET_ID_COLUMN)
+    if account.layout != APPEND:
+        return [journal.plan('values.append', {
+            'spreadsheetId': account.spreadsheet_id,
+            'range': account.a1('A:V'),
+            'valueInputOption': 'RAW',
+            'insertDataOption': 'INSERT_ROWS',
+            'body': {'values': rows, 'majorDimension': 'ROWS'}
+        }, guard=(account.a1(f'{id_column}2:{id_column}'), rows[-1][TWEET_ID_COLUMN]))]
+
+    sheet = get_sheets_service().spreadsheets()
+    routed = PartitionRouter(account).route(rows)
+    created = False
+    for partition, _ in routed:
+        created = ensure_partition(sheet, partition, account) or created
+    if created:
+        write_view(account)
+
+    return [
+        journal.plan('values.append', {
+            'spreadsheetId': partition.spreadsheet_id,
+            'range': account.a1('A:V', sheet=partition.sheet),
+            'valueInputOption': 'RAW',
+            'insertDataOption': 'INSERT_ROWS',
+            'body': {'values': partition_rows, 'majorDimension': 'ROWS'}
+        }, guard=(account.a1(f'{id_column}2:{id_column}', sheet=partition.sheet), partition_rows[-1][TWEET_ID_COLUMN]))
+        for partition, partition_rows in routed
+    ]
+
+def append_rows(rows, account=None):
+    """Append rows to the account's data tabs through the journal"""
+    account = account or get_account()
+    journal = get_journal(account)
+    with journal.lock:
+        replay_journal(account)
+        for entry in plan_appends(rows, account):
+            send_entry(journal, entry)
+
+@metrics.timed('update_spreadsheet')
+def update_spreadsheet(tweets, append_mode=True, account=None, media_types=None):
+    """Store new tweets (newest first) and write them to the sheet. Returns False if the write failed."""
+    account = account or get_account()
     try:
         service = get_sheets_service()
         sheet = service.spreadsheets()
 
-        # Check if spreadsheet has headers
-        result = sheet.values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range='posts!A1:V1'
-        ).execute()
-
-        existing_headers = result.get('values', [])
-        sync_time = datetime.now(pytz.timezone('US/Eastern')).strftime('%Y-%m-%d %H:%M:%S ET')
-
-        if not existing_headers or not existing_headers[0]:
-            # Add headers if sheet is empty
-            headers = [['Date', 'Time', 'Time Period', 'Day of Week', 'Tweet Content', 'Total Engagements',
-                       'Likes', 'Retweets', 'Bookmarks', 'Replies', 'Quote Tweets', 'Impressions',
-                       'Engagement Rate', 'Tweet Type', 'Has Link', 'Has Image', 'Number of Images', 'Has Video',
-                       'Hashtag Count', 'Mention Count', 'Tweet ID', 'Sync Time']]
-
-            sheet.values().update(
-                spreadsheetId=SPREADSHEET_ID,
-                range='posts!A1:V1',
-                valueInputOption='RAW',
-                body={'values': headers}
-            ).execute()
-
-        values = []
-
-        for tweet in tweets:
-            metrics = tweet.public_metrics if hasattr(tweet, 'public_metrics') else {}
-
-            # Calculate metrics
-            likes = metrics.get('like_count', 0)
-            retweets = metrics.get('retweet_count', 0)
-            bookmarks = metrics.get('bookmark_count', 0)
-            replies = metrics.get('reply_count', 0)
-            quotes = metrics.get('quote_count', 0)
-            impressions = metrics.get('impression_count', 0)
-            total_engagements = likes + retweets + bookmarks + replies + quotes
-
-            # Calculate engagement rate
-            engagement_rate = 0
-            if impressions > 0:
-                engagement_rate = round((total_engagements / impressions) * 100, 2)
-
-            # Time analysis - Convert to Eastern Time
-            created_at = tweet.created_at if tweet.created_at else datetime.now()
-            # Twitter returns times in UTC, convert to Eastern
-            utc_time = created_at.replace(tzinfo=pytz.UTC)
-            eastern = pytz.timezone('US/Eastern')
-            eastern_time = utc_time.astimezone(eastern)
-
-            hour = eastern_time.hour
-            time_period = get_time_period(hour)
-            day_of_week = eastern_time.strftime('%A')
-
-            # Content analysis
-            tweet_text = tweet.text if hasattr(tweet, 'text') else ''
-            hashtag_count = count_hashtags(tweet_text)
-            mention_count = count_mentions(tweet_text)
-            tweet_type = get_tweet_type(tweet)
-
-            # Media analysis
-            link_status = has_link(tweet_text)
-            image_status = has_images(tweet)
-            image_count = count_images(tweet)
-            video_status = has_video(tweet)
-
-            values.append([
-                eastern_time.strftime('%Y-%m-%d'),
-                eastern_time.strftime('%H:%M:%S') + ' ET',
-                time_period,
-                day_of_week,
-                tweet_text[:500],
-                total_engagements,
-                likes,
-                retweets,
-                bookmarks,
-                replies,
-                quotes,
-                impressions,
-                f"{engagement_rate}%",
-                tweet_type,
-                link_status,
-                image_status,
-                image_count,
-                video_status,
-                hashtag_count,
-                mention_count,
-                str(tweet.id),
-                sync_time  # Add sync time to each row
-            ])
+        values = build_rows(tweets, account=account, media_types=media_types)
 
         if not values:
             print("No new tweets to add")
             return True
 
-        # Insert new tweets after the header row (row 2) to maintain descending order
-        # This puts newest tweets at the top
-        body = {
-            'values': values,
-            'majorDimension': 'ROWS'
-        }
-
-        # Insert at row 2 (after header) instead of appending
-        insert_range = f'posts!A2:V{1 + len(values)}'
-
-        # First, insert blank rows
-        insert_request = {
-            "requests": [
-                {
-                    "insertRange": {
-                        "range": {
-                            "sheetId": 0,
-                            "startRowIndex": 1,  # After header
-                            "endRowIndex": 1 + len(values),
-                            "startColumnIndex": 0,
-                            "endColumnIndex": 22  # V column
-                        },
-                        "shiftDimension": "ROWS"
-                    }
-                }
-            ]
-        }
-
-        sheet.batchUpdate(
-            spreadsheetId=SPREADSHEET_ID,
-            body=insert_request
-        ).execute()
-
-        # Then update the newly inserted rows with data
-        result = sheet.values().update(
-            spreadsheetId=SPREADSHEET_ID,
-            range=insert_range,
-            valueInputOption='RAW',
-            body=body
-        ).execute()
+        # Below any stored tweets newer than these: row 2 for a sync's first page,
+        # under the rows already written for each page after that
+        start_row = 1 + get_store(account).count_newer(values[0][TWEET_ID_COLUMN])
 
-        # Only format the header row as bold if we just added headers
-        if not existing_headers or not existing_headers[0]:
-            formatting_request = {
-                "requests": [
-                    {
-                        "repeatCell": {
-                            "range": {
-                                "sheetId": 0,
-                                "startRowIndex": 0,
-                                "endRowIndex": 1
-                            },
-                            "cell": {
-                                "userEnteredFormat": {
-                                    "textFormat": {
-                                        "bold": True
-                                    }
-                                }
-                            },
-                            "fields": "userEnteredFormat.textFormat.bold"
-                        }
-                    }
-                ]
-            }
+        # The local store is the source of truth; the sheet is a projection of it
+        store_rows(values, account)
 
-            sheet.batchUpdate(
-                spreadsheetId=SPREADSHEET_ID,
-                body=formatting_request
-            ).execute()
+        if account.layout == APPEND:
+            # Oldest first, so each data tab stays in the order tweets were posted;
+            # the view tab does the newest-first sorting
+            append_rows(values[::-1], account)
+            metrics.ROWS_WRITTEN.inc(len(values), account=account.name, source='sync')
+            print(f"Appended {len(values)} rows to the data tabs")
+            return True
 
-        print(f"Updated {result.get('updatedCells')} cells in the spreadsheet")
+        # Header state comes from cached metadata instead of a read per sync
+        metadata = get_sheet_metadata(sheet, account)
+
+        # Header, row insertion, cell data and formatting all go out in one
+        # batchUpdate, which the API applies atomically
+        body = plan_insert_rows(
+            metadata['sheet_id'],
+            values,
+            headers=None if metadata['has_headers'] else HEADERS,
+            start_row=start_row
+        )
+
+        # Journaled first, so a failure here is repaired by replaying this one
+        # write; the newest tweet landing in the first inserted row shows it was applied
+        journaled_write(
+            'batchUpdate',
+            {'spreadsheetId': account.spreadsheet_id, 'body': body},
+            guard=(account.a1(f'{column_letter(TWEET_ID_COLUMN)}{start_row + 1}'), values[0][TWEET_ID_COLUMN]),
+            account=account
+        )
+        metadata['has_headers'] = True
+
+        metrics.ROWS_WRITTEN.inc(len(values), account=account.name, source='sync')
+        print(f"Updated {len(values) * len(HEADERS)} cells in the spreadsheet")
         return True
     except Exception as e:
+        # The sheet may have been changed underneath us; re-read metadata next time
+        invalidate_sheet_metadata(account)
         print(f"Error updating spreadsheet: {e}")
         return False
 
-def sync_tweets_to_sheets():
-    print(f"Starting tweet sync at {datetime.now()}")
+def diff_metric_cells(row_number, old_cells, new_cells, account=None, sheet=None):
+    """Return value ranges covering only the cells that changed in one row (of the account's tab, or sheet).
+
+    Adjacent changed cells are merged into a single range.
+    """
+    account = account or get_account()
+    data = []
+    run_start = None
+    run_values = []
+
+    for offset, new_value in enumerate(new_cells + [None]):
+        old_value = old_cells[offset] if offset < len(old_cells) else ''
+        changed = offset < len(new_cells) and str(old_value) != str(new_value)
+
+        if changed:
+            if run_start is None:
+                run_start = offset
+            run_values.append(new_value)
+        elif run_start is not None:
+            first = column_letter(METRIC_START_COLUMN + run_start)
+            last = column_letter(METRIC_START_COLUMN + offset - 1)
+            cell_range = f'{first}{row_number}' if first == last else f'{first}{row_number}:{last}{row_number}'
+            data.append({
+                'range': account.a1(cell_range, sheet=sheet),
+                'values': [run_values]
+            })
+            run_start = None
+            run_values = []
+
+    return data
+
+def read_metric_rows(sheet, max_rows=None, account=None):
+    """Read the metric cells of the newest max_rows rows (or all of them).
+
+    Returns {tweet ID: (spreadsheet ID, tab, sheet row number, metric cells)},
+    taking the first row of a duplicated ID.
+    """
+    account = account or get_account()
+    last_row = f'{1 + max_rows}' if max_rows and account.layout != APPEND else ''
+
+    rows_by_id = {}
+    for spreadsheet_id, tab in data_tabs(account):
+        result = sheet.values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=[account.a1(f'F2:M{last_row}', sheet=tab), account.a1(f'U2:U{last_row}', sheet=tab)]
+        ).execute()
 
-    # Get the last tweet ID from the spreadsheet
+        value_ranges = result.get('valueRanges', [])
+        metric_rows = value_ranges[0].get('values', []) if value_ranges else []
+        id_rows = value_ranges[1].get('values', []) if len(value_ranges) > 1 else []
+
+        # Row 2 is the first data row
+        for offset, id_row in enumerate(id_rows):
+            if id_row and id_row[0] and id_row[0] not in rows_by_id:
+                old_cells = metric_rows[offset] if offset < len(metric_rows) else []
+                rows_by_id[id_row[0]] = (spreadsheet_id, tab, offset + 2, old_cells)
+
+        # Data tabs come newest first, but rows within one aren't sorted
+        if max_rows and len(rows_by_id) >= max_rows:
+            break
+
+    if max_rows and len(rows_by_id) > max_rows:
+        newest = sorted(rows_by_id, key=lambda tweet_id: int(tweet_id) if tweet_id.isdigit() else 0,
+                        reverse=True)[:max_rows]
+        rows_by_id = {tweet_id: rows_by_id[tweet_id] for tweet_id in newest}
+    return rows_by_id
+
+@metrics.timed('refresh_metrics')
+def refresh_metrics(max_rows=None, account=None):
+    """Re-read public_metrics for tweets already in the sheet and rewrite only changed cells.
+
+    Tweet IDs are looked up 100 at a time and every changed cell is sent in a
+    single values.batchUpdate. max_rows limits the refresh to the newest rows.
+    Returns the number of cells updated.
+    """
+    account = account or get_account()
     service = get_sheets_service()
-    last_tweet_id = get_last_tweet_id(service)
+    sheet = service.spreadsheets()
+
+    # Rows are addressed by position, so pending inserts must land first
+    replay_journal(account)
+
+    rows_by_id = read_metric_rows(sheet, max_rows, account)
+    if not rows_by_id:
+        print("No tweets to refresh")
+        return 0
+
+    twitter_client = get_twitter_client()
+    tweet_ids = list(rows_by_id)
+    refreshed = {}
+    readings = {}
+    data = {}  # Spreadsheet ID -> changed ranges
+
+    # Refreshes run in the background, so wait out an exhausted window instead of failing
+    with get_rate_limits().waiting(RATE_LIMIT_BACKGROUND_WAIT):
+        for start in range(0, len(tweet_ids), LOOKUP_BATCH_SIZE):
+            batch = tweet_ids[start:start + LOOKUP_BATCH_SIZE]
+            response = twitter_client.get_tweets(ids=batch, tweet_fields=['public_metrics'])
+
+            # Deleted or protected tweets are simply missing from the response
+            for tweet in response.data or []:
+                readings[str(tweet.id)] = tweet.public_metrics
+                location = rows_by_id.get(str(tweet.id))
+                if location is None:
+                    continue
+                spreadsheet_id, tab, row_number, old_cells = location
+                new_cells = build_metric_cells(tweet.public_metrics)
+                refreshed[str(tweet.id)] = new_cells
+                changed = diff_metric_cells(row_number, old_cells, new_cells, account, sheet=tab)
+                if changed:
+                    data.setdefault(spreadsheet_id, []).extend(changed)
+
+    store_metrics(refreshed, account)
+    get_snapshot_store(account).record(readings)
+
+    if not data:
+        print(f"Metrics unchanged for {len(tweet_ids)} tweets")
+        return 0
+
+    updated = 0
+    for spreadsheet_id, spreadsheet_data in data.items():
+        result = journaled_write('values.batchUpdate', {
+            'spreadsheetId': spreadsheet_id,
+            'body': {'valueInputOption': 'RAW', 'data': spreadsheet_data}
+        }, account=account, idempotent=True)
+        updated += result.get('totalUpdatedCells', 0)
+    metrics.CELLS_UPDATED.inc(updated, account=account.name, source='refresh')
+    print(f"Refreshed metrics for {len(tweet_ids)} tweets, updated {updated} cells")
+    write_summary(account)
+    return updated
+
+def import_sheet_to_store(account=None):
+    """Load every row currently in the sheet (or its data tabs) into the local store. Returns the row count."""
+    account = account or get_account()
+    service = get_sheets_service()
+    sheet = service.spreadsheets()
+
+    imported = 0
+    for spreadsheet_id, tab in data_tabs(account):
+        start = 2
+        while True:
+            end = start + PROJECTION_CHUNK_ROWS - 1
+            result = sheet.values().get(
+                spreadsheetId=spreadsheet_id,
+                range=account.a1(f'A{start}:V{end}', sheet=tab)
+            ).execute()
 
-    if last_tweet_id:
-        print(f"Fetching tweets newer than ID: {last_tweet_id}")
-    else:
-        print("First sync - fetching recent tweets")
+            rows = result.get('values', [])
+            # Skip blank rows or rows without a Tweet ID
+            rows = [row for row in rows if len(row) > TWEET_ID_COLUMN and row[TWEET_ID_COLUMN]]
+            store_rows(rows, account)
+            imported += len(rows)
 
-    tweets = fetch_tweets(since_id=last_tweet_id)
+            if len(result.get('values', [])) < PROJECTION_CHUNK_ROWS:
+                break
+            start = end + 1
 
-    if tweets:
-        # Don't reverse - keep tweets in newest-first order
-        # tweets are already returned newest-first from Twitter API
-        success = update_spreadsheet(tweets)
-        if success:
-            print(f"Successfully synced {len(tweets)} new tweets to Google Sheets")
-        else:
-            print("Failed to update Google Sheets")
+    print(f"Imported {imported} rows into the local store")
+    return imported
+
+def project_store_to_sheet(account=None):
+    """Rewrite the sheet from the local store, newest first. Returns the row count."""
+    account = account or get_account()
+    if account.layout == APPEND:
+        return project_store_to_partitions(account)
+
+    service = get_sheets_service()
+    sheet = service.spreadsheets()
+    store = get_store(account)
+
+    metadata = get_sheet_metadata(sheet, account)
+    sheet.batchUpdate(
+        spreadsheetId=account.spreadsheet_id,
+        body={'requests': header_requests(metadata['sheet_id'], HEADERS)}
+    ).execute()
+    metadata['has_headers'] = True
+
+    next_row = 2
+    for rows in store.iter_rows(batch_size=PROJECTION_CHUNK_ROWS):
+        sheet.values().update(
+            spreadsheetId=account.spreadsheet_id,
+            range=account.a1(f'A{next_row}:V{next_row + len(rows) - 1}'),
+            valueInputOption='RAW',
+            body={'values': rows, 'majorDimension': 'ROWS'}
+        ).execute()
+        next_row += len(rows)
+
+    # Drop anything left below the projected rows
+    sheet.values().clear(
+        spreadsheetId=account.spreadsheet_id,
+        range=account.a1(f'A{next_row}:V')
+    ).execute()
+
+    print(f"Projected {next_row - 2} rows from the local store to the sheet")
+    return next_row - 2
+
+def project_store_to_partitions(account=None):
+    """Rewrite the data tabs from the local store, oldest first, and point the view at them.
+
+    Also how an account moves to the append layout: whatever its own tab held
+    is replaced by the view. Returns the row count.
+    """
+    account = account or get_account()
+    sheet = get_sheets_service().spreadsheets()
+    store = get_store(account)
+    router = PartitionRouter(account)
+
+    next_rows = {}  # Partition key -> next sheet row
+    for rows in store.iter_rows(batch_size=PROJECTION_CHUNK_ROWS, newest_first=False):
+        for partition, partition_rows in router.route(rows):
+            if partition.key not in next_rows:
+                ensure_partition(sheet, partition, account)
+                next_rows[partition.key] = 2
+            start = next_rows[partition.key]
+            sheet.values().update(
+                spreadsheetId=partition.spreadsheet_id,
+                range=account.a1(f'A{start}:V{start + len(partition_rows) - 1}', sheet=partition.sheet),
+                valueInputOption='RAW',
+                body={'values': partition_rows, 'majorDimension': 'ROWS'}
+            ).execute()
+            next_rows[partition.key] = start + len(partition_rows)
+
+    # Drop anything left below the projected rows, including data tabs with no stored rows
+    for partition in list_partitions(account):
+        sheet.values().clear(
+            spreadsheetId=partition.spreadsheet_id,
+            range=account.a1(f'A{next_rows.get(partition.key, 2)}:V', sheet=partition.sheet)
+        ).execute()
+
+    if account.sheet in get_sheet_tabs(sheet, account.spreadsheet_id):
+        sheet.values().clear(spreadsheetId=account.spreadsheet_id, range=account.a1('A2:V')).execute()
+    write_view(account)
+
+    projected = sum(next_row - 2 for next_row in next_rows.values())
+    print(f"Projected {projected} rows from the local store to {len(next_rows)} data tabs")
+    return projected
+
+@metrics.timed('reconcile')
+def reconcile_sheet(dry_run=False, prune_unknown=False, account=None):
+    """Delete duplicate and blank rows and re-insert stored tweets missing from the sheet.
+
+    Only the Tweet ID column is read; the local store is the authoritative set
+    of tweets. The fix goes out as one batchUpdate (per data tab in the append
+    layout). prune_unknown also deletes rows whose ID isn't in the store.
+    Returns the plan summary.
+    """
+    account = account or get_account()
+    # Held throughout so no other write moves rows between a read and its batchUpdate
+    with get_journal(account).lock:
+        sheet = get_sheets_service().spreadsheets()
+        store = get_store(account)
+
+        # Pending inserts would otherwise show up as missing rows
+        replay_journal(account)
+
+        if account.layout != APPEND:
+            return reconcile_tab(sheet, account.spreadsheet_id, account.sheet, store.tweet_ids(),
+                                 dry_run=dry_run, prune_unknown=prune_unknown, account=account)
+
+        # Each data tab is compared with the stored tweets routed to it
+        router = PartitionRouter(account)
+        stored = {}
+        for date, tweet_id in store.fetch_columns(['date', 'CAST(tweet_id AS TEXT)']):
+            stored.setdefault(router.key_for([date]), []).append(tweet_id)
+        partitions = {partition.key: partition for partition in list_partitions(account)}
+
+        totals = {}
+        for key in sorted(set(stored) | set(partitions)):
+            partition = partitions.get(key) or router.partition(key)
+            if key not in partitions and not dry_run:
+                ensure_partition(sheet, partition, account)
+            summary = reconcile_tab(sheet, partition.spreadsheet_id, partition.sheet, stored.get(key, []),
+                                    dry_run=dry_run, prune_unknown=prune_unknown,
+                                    newest_first=False, account=account)
+            for name, value in summary.items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+def reconcile_tab(sheet, spreadsheet_id, tab, stored_ids, dry_run=False, prune_unknown=False, newest_first=True,
+                  account=None):
+    """Reconcile one tab's Tweet ID column against stored_ids. Returns the plan summary.
+
+    The batchUpdate deletes and inserts rows by index, so it is only right for
+    the column it was planned from. It isn't journaled: each attempt, and a
+    rerun after a failure, plans again from a fresh read of the column.
+    """
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    account = account or get_account()
+    store = get_store(account)
+    id_column = column_letter(TWEET_ID_COLUMN)
+
+    for attempt in range(WRITE_ATTEMPTS):
+        id_rows = []
+        if tab in get_sheet_tabs(sheet, spreadsheet_id):
+            result = sheet.values().get(
+                spreadsheetId=spreadsheet_id,
+                range=account.a1(f'{id_column}2:{id_column}', sheet=tab)
+            ).execute()
+            id_rows = result.get('values', [])
+
+        plan = plan_reconcile(id_rows, stored_ids, prune_unknown=prune_unknown, newest_first=newest_first)
+        summary = plan.summary()
+        summary['sheet_rows'] = len(id_rows)
+        print(f"Reconcile {tab}: {len(id_rows)} rows, {plan.duplicates} duplicates, {plan.blanks} blank, "
+              f"{plan.unknown} not in the store, {len(plan.missing)} missing")
+
+        if plan.empty or dry_run:
+            return summary
+
+        sheet_id = get_sheet_tabs(sheet, spreadsheet_id)[tab]
+        requests = reconcile_requests(sheet_id, plan, store.rows_by_id(plan.missing))
+        try:
+            sheet.batchUpdate(spreadsheetId=spreadsheet_id, body={'requests': requests}).execute()
+            break
+        except (HttpError, OSError, httplib2.HttpLib2Error) as e:
+            # The batchUpdate is atomic, so the next read shows whether it was applied
+            if not is_transient_error(e) or attempt + 1 == WRITE_ATTEMPTS:
+                raise
+            delay = WRITE_RETRY_DELAY * 2 ** attempt
+            print(f"Reconcile of {tab} failed ({e}), planning again in {delay}s")
+            time.sleep(delay)
+
+    invalidate_sheet_metadata(account, tab=tab, spreadsheet_id=spreadsheet_id)
+    metrics.ROWS_WRITTEN.inc(summary['rows_inserted'], account=account.name, source='reconcile')
+    print(f"Deleted {summary['rows_deleted']} rows and inserted {summary['rows_inserted']} in one batchUpdate")
+    return summary
+
+def load_backfill_state(account=None):
+    """Load the account's saved backfill checkpoint, if any"""
+    try:
+        with open(account_path(account or get_account(), BACKFILL_STATE_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def save_backfill_state(state, account=None):
+    """Persist the backfill checkpoint atomically"""
+    path = account_path(account or get_account(), BACKFILL_STATE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def clear_backfill_state(account=None):
+    try:
+        os.remove(account_path(account or get_account(), BACKFILL_STATE_FILE))
+    except FileNotFoundError:
+        pass
+
+@metrics.timed('backfill')
+def backfill_tweets(restart=False, account=None):
+    """Walk the full timeline and append every page below the existing rows.
+
+    Pages arrive newest first, so appending each one at the bottom keeps the
+    sheet in descending order. The append layout routes each page to its data
+    tabs oldest first, like a sync's appends, but the pages still land newest
+    page first, so the data tabs aren't in order; only the view is sorted.
+    Only one page of rows is held in memory at a
+    time, and the next page token is checkpointed after every write so an
+    interrupted backfill resumes where it stopped instead of starting over.
+    Returns the number of tweets written in this run.
+    """
+    account = account or get_account()
+    service = get_sheets_service()
+    sheet = service.spreadsheets()
+
+    state = None if restart else load_backfill_state(account)
+    if state:
+        print(f"Resuming backfill after {state['pages']} pages ({state['tweets']} tweets)")
     else:
-        print("No new tweets found or error fetching tweets")
-    return len(tweets) if tweets else 0
+        # Only fetch tweets older than what's already stored. A store added to an
+        # existing sheet only goes back to its first sync, so take the older ID.
+        oldest = [tweet_id for tweet_id in (get_store(account).oldest_tweet_id(), get_oldest_tweet_id(service, account))
+                  if tweet_id and str(tweet_id).isdigit()]
+        state = {
+            'until_id': min(oldest, key=int) if oldest else None,
+            'pagination_token': None,
+            'pages': 0,
+            'tweets': 0
+        }
+        if state['until_id']:
+            print(f"Backfilling tweets older than ID: {state['until_id']}")
+        else:
+            print("Backfilling full timeline")
+
+    if account.layout != APPEND:
+        ensure_headers(sheet, account)
+    journal = get_journal(account)
+    replay_journal(account)
+
+    def pages():
+        # A backfill can use every 15-minute window fully; if it still gives up, the
+        # checkpoint lets the next run pick up from the same page. This runs on the
+        # prefetch thread, which is where the wait has to be allowed.
+        with get_rate_limits().waiting(RATE_LIMIT_BACKGROUND_WAIT):
+            yield from iter_tweet_pages(
+                until_id=state['until_id'],
+                pagination_token=state['pagination_token'],
+                account=account
+            )
+
+    written = 0
+    # The next page is fetched while this one is written
+    for page, media_types, next_token in prefetch(pages(), depth=PIPELINE_DEPTH, name=f'backfill-{account.name}'):
+        rows = build_rows(page, account=account, media_types=media_types)
+
+        entries = []
+        if rows:
+            store_rows(rows, account)
+            # Oldest first within the page, like a sync's appends; the view does the sorting
+            entries = plan_appends(rows[::-1] if account.layout == APPEND else rows, account)
+
+        written += len(rows)
+        state['pages'] += 1
+        state['tweets'] += len(rows)
+        state['pagination_token'] = next_token
+        save_backfill_state(state, account)
+
+        # The page is journaled before the checkpoint moves past it, so if
+        # the append fails it is replayed, not fetched and appended twice
+        if entries:
+            for entry in entries:
+                send_entry(journal, entry)
+            metrics.ROWS_WRITTEN.inc(len(rows), account=account.name, source='backfill')
+        report_progress(stage='backfilling', pages=state['pages'], tweets=state['tweets'])
+        print(f"Backfill page {state['pages']}: wrote {len(rows)} tweets")
+
+    clear_backfill_state(account)
+    write_summary(account)
+    print(f"Backfill complete: {state['tweets']} tweets over {state['pages']} pages")
+    return written
+
+def sync_tweets_to_sheets(account=None):
+    account = account or get_account()
+    try:
+        with metrics.stage('sync', account=account.name):
+            print(f"Starting tweet sync for {account.name} at {datetime.now()}")
+
+            # Writes left over from a failed sync go out before anything new
+            replay_journal(account)
+
+            count = 0
+            state = load_sync_state(account)
+            if state:
+                print(f"Resuming an interrupted sync of tweets newer than ID: {state['since_id']}")
+                count += stream_sync(state['since_id'], state['pagination_token'], account=account)
+
+            # Get the account's since_id checkpoint
+            service = get_sheets_service()
+            last_tweet_id = get_last_tweet_id(service, account)
+
+            if last_tweet_id:
+                print(f"Fetching tweets newer than ID: {last_tweet_id}")
+            else:
+                print("First sync - fetching recent tweets")
+
+            report_progress(stage='fetching', since_id=last_tweet_id)
+            count += stream_sync(last_tweet_id, account=account)
+
+            if count:
+                print(f"Successfully synced {count} new tweets to Google Sheets")
+                write_summary(account)
+            else:
+                print("No new tweets found")
+    except Exception as e:
+        outcome = 'rate_limited' if isinstance(e, RateLimitExceeded) else 'error'
+        metrics.SYNCS.inc(account=account.name, outcome=outcome)
+        record_sync_status(account, error=str(e))
+        raise
+
+    metrics.SYNCS.inc(account=account.name, outcome='ok')
+    metrics.LAST_SYNC.set(time.time(), account=account.name)
+    record_sync_status(account)
+    return count
+
+def load_sync_status():
+    """{account name: {'last_success': unix time or None, 'last_error': message or None}}"""
+    try:
+        with open(SYNC_STATUS_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def record_sync_status(account, error=None):
+    """Save an account's sync outcome atomically; an error is cleared by the next success"""
+    with _sync_status_lock:
+        status = load_sync_status()
+        entry = status.setdefault(account.name, {'last_success': None, 'last_error': None})
+        if error is None:
+            entry['last_success'] = time.time()
+        entry['last_error'] = error
+
+        directory = os.path.dirname(SYNC_STATUS_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = SYNC_STATUS_PATH + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(status, f)
+        os.replace(tmp_path, SYNC_STATUS_PATH)
+
+def for_each_account(func, accounts=None, max_workers=ACCOUNT_WORKERS):
+    """Run func(account) for every account, up to max_workers at a time.
+
+    The workers share one Twitter client, rate-limit budget and Sheets quota,
+    so more workers only helps until those are the bottleneck. One account
+    failing doesn't stop the others; its result is recorded as an error. If
+    every account fails, the first error is raised so the caller can retry.
+    Returns {account name: result}.
+    """
+    accounts = accounts or get_accounts()
+    results = {}
+    errors = []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(accounts)))) as pool:
+        futures = {pool.submit(func, account): account for account in accounts}
+        for future in as_completed(futures):
+            account = futures[future]
+            try:
+                results[account.name] = future.result()
+            except Exception as e:
+                print(f"Error for account {account.name}: {e}")
+                results[account.name] = {'error': str(e)}
+                errors.append(e)
+            report_progress(accounts_done=len(results), accounts_total=len(accounts))
+
+    if errors and len(errors) == len(accounts):
+        raise errors[0]
+    return {account.name: results[account.name] for account in accounts}
+
+def sync_all_accounts():
+    """Sync every configured account in parallel. Returns {account name: new tweet count}."""
+    return for_each_account(sync_tweets_to_sheets)
+
+def refresh_all_accounts(max_rows=None):
+    return for_each_account(lambda account: refresh_metrics(max_rows=max_rows, account=account))
+
+@metrics.timed('snapshot_metrics')
+def snapshot_metrics(max_tweets=SNAPSHOT_MAX_TWEETS, account=None):
+    """Take the engagement readings that are due (see snapshots.py), most overdue first.
+
+    Up to max_tweets tweets are looked up, 100 at a time. Tweets that no longer
+    come back (deleted or protected) stop being read. If the rate-limit budget
+    runs out, the rest stay due for the next run. Returns the number of readings.
+    """
+    account = account or get_account()
+    snapshots = get_snapshot_store(account)
+    due = snapshots.due(max_tweets)
+    if not due:
+        print(f"No engagement readings due for {account.name}")
+        return 0
+
+    twitter_client = get_twitter_client()
+    taken = 0
+    try:
+        for start in range(0, len(due), LOOKUP_BATCH_SIZE):
+            batch = due[start:start + LOOKUP_BATCH_SIZE]
+            response = twitter_client.get_tweets(ids=batch, tweet_fields=['public_metrics'])
+            readings = {str(tweet.id): tweet.public_metrics for tweet in response.data or []}
+            taken += snapshots.record(readings)
+            snapshots.retire(tweet_id for tweet_id in batch if tweet_id not in readings)
+            report_progress(stage='snapshots', readings=taken, due=len(due))
+    except RateLimitExceeded:
+        # Hourly runs shouldn't hold the job queue for a whole rate-limit window
+        print(f"Rate limited after {taken} of {len(due)} readings for {account.name}; the rest stay due")
+        return taken
+
+    print(f"Took {taken} engagement readings for {account.name}")
+    return taken
+
+def snapshot_all_accounts(max_tweets=SNAPSHOT_MAX_TWEETS):
+    return for_each_account(lambda account: snapshot_metrics(max_tweets=max_tweets, account=account))
+
+def forward_to_leader():
+    """Proxy the current request to the leader's internal server"""
+    import urllib.error
+    import urllib.request
+
+    leader = leader_lock.current_leader()
+    if leader is None:
+        return jsonify({'status': 'error', 'message': 'No scheduler leader yet, try again shortly'}), 503, \
+            {'Retry-After': str(LEADER_POLL_SECONDS)}
+
+    url = leader['url'] + request.full_path.rstrip('?')
+    try:
+        with urllib.request.urlopen(url, timeout=LEADER_FORWARD_TIMEOUT) as response:
+            return Response(response.read(), status=response.status, content_type=response.headers.get('Content-Type'))
+    except urllib.error.HTTPError as e:
+        return Response(e.read(), status=e.code, content_type=e.headers.get('Content-Type'))
+    except OSError as e:
+        return jsonify({'status': 'error', 'message': f'Scheduler leader unreachable: {e}'}), 503, \
+            {'Retry-After': str(LEADER_POLL_SECONDS)}
+
+def leader_only(view):
+    """Run the view in the leader, forwarding to it from any other worker"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if leader_lock is None or leader_lock.is_leader:
+            return view(*args, **kwargs)
+        return forward_to_leader()
+    return wrapper
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy'}), 200
+    # Stays 200 so a Twitter or Sheets outage doesn't get the machine restarted;
+    # a failing sync shows up as 'degraded'
+    # Only the leader syncs, so outcomes come from the file it writes and every worker agrees
+    sync_status = load_sync_status()
+    accounts = {}
+    for account in get_accounts():
+        entry = sync_status.get(account.name, {})
+        last_success = entry.get('last_success')
+        accounts[account.name] = {
+            'last_success_age': round(time.time() - last_success) if last_success is not None else None,
+            'last_error': entry.get('last_error')
+        }
+    status = 'degraded' if any(entry['last_error'] for entry in accounts.values()) else 'healthy'
+    role = 'leader' if leader_lock is None or leader_lock.is_leader else 'follower'
+    return jsonify({'status': status, 'role': role, 'accounts': accounts}), 200
+
+@app.route('/metrics', methods=['GET'])
+@leader_only
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def job_response(job, coalesced):
+    body = job.to_dict()
+    body['coalesced'] = coalesced
+    body['status_url'] = f'/jobs/{job.id}'
+    return jsonify(body), 202
+
+def requested_account():
+    """The account named by ?account=, or None for all accounts. Raises KeyError if unknown."""
+    name = request.args.get('account')
+    return get_account(name) if name else None
 
 @app.route('/sync', methods=['GET'])
+@leader_only
 def manual_sync():
     try:
-        tweet_count = sync_tweets_to_sheets()
-        return jsonify({'status': 'success', 'tweets_synced': tweet_count}), 200
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+        account = requested_account()
+    except KeyError as e:
+        return jsonify({'status': 'error', 'message': f'Unknown account: {e.args[0]}'}), 404
 
-def run_scheduler():
-    eastern = pytz.timezone('US/Eastern')
+    # Queue the sync and return right away; a sync already in flight is joined, not repeated
+    if account:
+        job, coalesced = job_queue.submit(f'sync:{account.name}', lambda: sync_tweets_to_sheets(account))
+    else:
+        job, coalesced = job_queue.submit('sync', sync_all_accounts)
+    return job_response(job, coalesced)
 
-    def job():
-        """Wrapper to run sync in Eastern Time context"""
-        current_time = datetime.now(eastern)
-        print(f"Running scheduled sync at {current_time.strftime('%Y-%m-%d %H:%M:%S ET')}")
-        sync_tweets_to_sheets()
+@app.route('/refresh', methods=['GET'])
+@leader_only
+def manual_refresh():
+    try:
+        account = requested_account()
+    except KeyError as e:
+        return jsonify({'status': 'error', 'message': f'Unknown account: {e.args[0]}'}), 404
 
-    # Convert 6 AM ET to UTC for consistent scheduling
-    # Schedule library runs in local time, so we'll check manually
-    print(f"Scheduler started. Will sync daily at 6:00 AM ET")
-    print(f"Current time: {datetime.now(eastern).strftime('%Y-%m-%d %H:%M:%S ET')}")
+    if account:
+        job, coalesced = job_queue.submit(f'refresh:{account.name}', lambda: refresh_metrics(account=account))
+    else:
+        job, coalesced = job_queue.submit('refresh', refresh_all_accounts)
+    return job_response(job, coalesced)
+
+def get_stats(account=None, top=10, metric='engagement_rate', min_impressions=0):
+    """Grouped engagement statistics and top tweets for an account's full history.
+
+    The history is loaded into NumPy arrays once and reloaded only when the
+    store has changed since.
+    """
+    # NumPy is only needed here, so it isn't imported until the first /stats
+    import analytics
+
+    account = account or get_account()
+    store = get_store(account)
+    version = store.version()
+    with _analytics_lock:
+        cached = _analytics.get(account.name)
+        if cached is None or cached[0] != version:
+            cached = _analytics[account.name] = (version, analytics.TweetColumns.load(store))
+
+    stats = analytics.compute_stats(cached[1], top=top, metric=metric, min_impressions=min_impressions)
+    contents = store.contents(tweet['tweet_id'] for tweet in stats['top_tweets'])
+    # Served from the metadata cache only, so /stats never spends API quota
+    referenced = get_referenced_tweets(tweet['tweet_id'] for tweet in stats['top_tweets'])
+    for tweet in stats['top_tweets']:
+        tweet['content'] = contents.get(tweet['tweet_id'], '')
+        tweet['referenced'] = referenced.get(tweet['tweet_id'], [])
+    return stats
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    try:
+        account = requested_account() or get_account()
+    except KeyError as e:
+        return jsonify({'status': 'error', 'message': f'Unknown account: {e.args[0]}'}), 404
 
-    # Run an initial sync on startup
-    sync_tweets_to_sheets()
+    try:
+        import analytics
+    except ImportError:
+        return jsonify({'status': 'error', 'message': 'Stats need numpy (pip install numpy)'}), 501
+
+    metric = request.args.get('metric', 'engagement_rate')
+    if metric not in analytics.TOP_METRICS:
+        return jsonify({'status': 'error', 'message': f"Unknown metric: {metric} (expected one of {', '.join(analytics.TOP_METRICS)})"}), 400
+
+    return jsonify(get_stats(
+        account,
+        top=request.args.get('top', 10, type=int),
+        metric=metric,
+        min_impressions=request.args.get('min_impressions', 0, type=int)
+    )), 200
+
+@app.route('/snapshots/<tweet_id>', methods=['GET'])
+def tweet_snapshots(tweet_id):
+    """A tweet's engagement readings over time, oldest first"""
+    try:
+        account = requested_account() or get_account()
+    except KeyError as e:
+        return jsonify({'status': 'error', 'message': f'Unknown account: {e.args[0]}'}), 404
+    if not tweet_id.isdigit():
+        return jsonify({'status': 'error', 'message': 'Tweet IDs are numeric'}), 400
+
+    readings = get_snapshot_store(account).series(tweet_id)
+    if not readings:
+        return jsonify({'status': 'error', 'message': f'No readings for tweet {tweet_id}'}), 404
+
+    posted_at = snowflake_time(tweet_id)
+    for reading in readings:
+        reading['age_hours'] = round((reading['time'] - posted_at.timestamp()) / 3600, 2)
+        reading['time'] = datetime.fromtimestamp(reading['time'], tz=timezone.utc).isoformat()
+    return jsonify({'tweet_id': tweet_id, 'posted_at': posted_at.isoformat(), 'readings': readings}), 200
+
+@app.route('/export', methods=['GET'])
+def export_history():
+    """Stream an account's full history from the local store as typed CSV, Parquet or Arrow"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'status': 'error', 'message': f"Unknown format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})"}), 400
 
-    last_run_date = None
+    try:
+        account = requested_account() or get_account()
+    except KeyError as e:
+        return jsonify({'status': 'error', 'message': f'Unknown account: {e.args[0]}'}), 404
 
-    while True:
-        now_et = datetime.now(eastern)
+    try:
+        chunks = iter_export(get_store(account), fmt)
+    except ExportUnavailable as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 501
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    return Response(chunks, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{account.name}-tweets.{extension}"'
+    })
+
+@app.route('/accounts', methods=['GET'])
+def list_accounts():
+    return jsonify([account.to_dict() for account in get_accounts()]), 200
+
+@app.route('/sync/<job_id>', methods=['GET'])
+@app.route('/jobs/<job_id>', methods=['GET'])
+@leader_only
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': f'Unknown job: {job_id}'}), 404
+    return jsonify(job.to_dict()), 200
+
+@app.route('/rate-limits', methods=['GET'])
+def rate_limits():
+    return jsonify(get_rate_limits().budget()), 200
+
+@metrics.timed('maintenance')
+def run_maintenance(account=None):
+    """Server-side resort (newest first) and header formatting in one batchUpdate"""
+    account = account or get_account()
+    if account.layout == APPEND:
+        # The view does the sorting; just make sure it covers every data tab
+        write_view(account)
+        print(f"Maintenance complete for {account.name}: view rewritten")
+        return
 
-        # Check if it's 6 AM ET and we haven't run today
-        if now_et.hour == 6 and now_et.minute == 0 and last_run_date != now_et.date():
-            job()
-            last_run_date = now_et.date()
+    service = get_sheets_service()
+    sheet = service.spreadsheets()
+    sheet_id = get_sheet_metadata(sheet, account)['sheet_id']
+
+    journaled_write('batchUpdate', {
+        'spreadsheetId': account.spreadsheet_id,
+        'body': {"requests": [
+            sort_rows_request(sheet_id, 1, len(HEADERS), [(0, True), (1, True)]),
+            bold_rows_request(sheet_id, 0, 1, bold=True),
+            bold_rows_request(sheet_id, 1, bold=False)
+        ]}
+    }, account=account, idempotent=True)
+    print(f"Maintenance complete for {account.name}: sheet resorted and formatted")
+
+def create_scheduler():
+    """Build the scheduler with the sync, metrics refresh, snapshot and maintenance jobs"""
+    job_scheduler = Scheduler('US/Eastern', state_path=SCHEDULER_STATE_PATH)
+
+    # Scheduled runs go through the job queue too, so they never overlap a manual /sync
+    job_scheduler.add_job(
+        'sync',
+        lambda: job_queue.run('sync', sync_all_accounts),
+        SYNC_SCHEDULE, jitter=SCHEDULER_JITTER
+    )
+    job_scheduler.add_job(
+        'refresh',
+        lambda: job_queue.run('refresh', lambda: refresh_all_accounts(max_rows=REFRESH_MAX_ROWS)),
+        REFRESH_SCHEDULE, jitter=SCHEDULER_JITTER
+    )
+    job_scheduler.add_job(
+        'snapshot',
+        lambda: job_queue.run('snapshot', snapshot_all_accounts),
+        SNAPSHOT_SCHEDULE, jitter=SCHEDULER_JITTER
+    )
+    job_scheduler.add_job(
+        'maintenance',
+        lambda: job_queue.run('maintenance', lambda: for_each_account(run_maintenance)),
+        MAINTENANCE_SCHEDULE, jitter=SCHEDULER_JITTER
+    )
+    return job_scheduler
+
+@app.route('/schedule', methods=['GET'])
+@leader_only
+def schedule_status():
+    if scheduler is None:
+        return jsonify({'status': 'error', 'message': 'Scheduler is not running in this process'}), 503
+    return jsonify(scheduler.status()), 200
+
+@app.route('/schedule/<name>/run', methods=['GET'])
+@leader_only
+def trigger_job(name):
+    if scheduler is None:
+        return jsonify({'status': 'error', 'message': 'Scheduler is not running in this process'}), 503
+    try:
+        scheduler.trigger(name)
+    except KeyError:
+        return jsonify({'status': 'error', 'message': f'Unknown job: {name}'}), 404
+    return jsonify({'status': 'triggered', 'job': name}), 202
 
-        # Sleep for 30 seconds between checks
-        time.sleep(30)
+def run_scheduler():
+    global scheduler
+    scheduler = create_scheduler()
+
+    print(f"Scheduler started. Sync: '{SYNC_SCHEDULE}', refresh: '{REFRESH_SCHEDULE}', "
+          f"snapshot: '{SNAPSHOT_SCHEDULE}', maintenance: '{MAINTENANCE_SCHEDULE}' (ET)")
+    print(f"Current time: {scheduler.now().strftime('%Y-%m-%d %H:%M:%S ET')}")
+    print(f"Syncing {len(get_accounts())} account(s), up to {ACCOUNT_WORKERS} at a time")
+
+    # Nothing below blocks the web server, but building the API clients competes
+    # with it for the CPU on a small machine
+    if STARTUP_DELAY:
+        time.sleep(STARTUP_DELAY)
+
+    # Finish any sheet writes a previous run left pending, then sync
+    job_queue.submit('replay', lambda: for_each_account(replay_journal))
+    if STARTUP_SYNC:
+        scheduler.trigger('sync')
+
+    # Sleeps until the next deadline instead of polling
+    scheduler.run_forever()
+
+def run_election():
+    """Wait for the leader lock, then serve forwarded requests and run the scheduler"""
+    from werkzeug.serving import make_server
+
+    while not leader_lock.try_acquire():
+        time.sleep(LEADER_POLL_SECONDS)
+
+    # Followers share the public port with the leader, so it listens on a private one too
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='leader-http', daemon=True).start()
+    leader_lock.publish({'pid': os.getpid(), 'url': f'http://127.0.0.1:{server.server_port}'})
+    print(f"Process {os.getpid()} is the scheduler leader (forwarded requests on port {server.server_port})")
+
+    run_scheduler()
+
+def start_background():
+    """Join the leader election from this process (once per worker, see gunicorn.conf.py)"""
+    global leader_lock
+    if leader_lock is not None:
+        return
+    leader_lock = LeaderLock(LEADER_LOCK_PATH)
+    threading.Thread(target=run_election, name='leader-election', daemon=True).start()
 
 if __name__ == '__main__':
-    import threading
-
-    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-    scheduler_thread.start()
+    start_background()
 
     port = int(os.environ.get('PORT', 8080))
     app.run(host='0.0.0.0', port=port)
\ No newline at end of file
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Backfill the full tweet history (up to the API's ~3,200 tweet timeline limit).
+
+Resumes from the last saved page token unless --restart is given. Every
+configured account is backfilled unless --account picks one.
+"""
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import backfill_tweets, for_each_account, get_account
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--restart', action='store_true', help='Ignore any saved checkpoint and start from the newest page')
+    parser.add_argument('--account', help='Only backfill this account (by name)')
+    args = parser.parse_args()
+
+    if args.account:
+        count = backfill_tweets(restart=args.restart, account=get_account(args.account))
+        print(f"\n✓ Backfilled {count} tweets")
+    else:
+        results = for_each_account(lambda account: backfill_tweets(restart=args.restart, account=account))
+        for name, count in results.items():
+            print(f"\n✓ {name}: backfilled {count} tweets")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: TweetFeatureExtractor vs the original per-tweet row building.
+
+Builds rows for synthetic tweets both ways, checks the rows match and prints
+the timings. No credentials or network needed.
+
+    python benchmark_features.py [--tweets 100000] [--repeat 3]
+"""
+import argparse
+import gc
+import re
+import time
+from datetime import datetime
+
+import pytz
+
+from fake_backends import make_tweets
+from features import TweetFeatureExtractor, build_metric_cells, get_time_period, get_tweet_type
+
+USERNAME = 'ashebytes'
+
+def legacy_build_rows(tweets, sync_time):
+    """Row building as update_spreadsheet originally did it, kept as the baseline"""
+    values = []
+    for tweet in tweets:
+        metrics = tweet.public_metrics if hasattr(tweet, 'public_metrics') else {}
+
+        created_at = tweet.created_at if tweet.created_at else datetime.now()
+        utc_time = created_at.replace(tzinfo=pytz.UTC)
+        eastern = pytz.timezone('US/Eastern')
+        eastern_time = utc_time.astimezone(eastern)
+
+        tweet_text = tweet.text if hasattr(tweet, 'text') else ''
+        hashtag_count = len(re.findall(r'#\w+', tweet_text))
+        mentions = [m for m in re.findall(r'@\w+', tweet_text) if m.lower() != f"@{USERNAME.lower()}"]
+        link_status = "TRUE" if re.search(r'https?://\S+|www\.\S+', tweet_text) else "FALSE"
+
+        image_count = 0
+        if hasattr(tweet, 'attachments') and tweet.attachments:
+            image_count = len(tweet.attachments.get('media_keys', []))
+        image_status = "TRUE" if image_count > 0 else "FALSE"
+        video_status = "POSSIBLE" if hasattr(tweet, 'attachments') and tweet.attachments else "FALSE"
+
+        values.append([
+            eastern_time.strftime('%Y-%m-%d'),
+            eastern_time.strftime('%H:%M:%S') + ' ET',
+            get_time_period(eastern_time.hour),
+            eastern_time.strftime('%A'),
+            tweet_text[:500],
+            *build_metric_cells(metrics),
+            get_tweet_type(tweet),
+            link_status,
+            image_status,
+            image_count,
+            video_status,
+            hashtag_count,
+            len(mentions),
+            str(tweet.id),
+            sync_time
+        ])
+    return values
+
+def best_time(func, repeat):
+    """Best wall time of repeat runs (GC paused while timing), and the last result"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run_benchmark(count, repeat=3):
+    tweets = make_tweets(count, username=USERNAME)
+    sync_time = '2025-01-01 06:00:00 ET'
+    extractor = TweetFeatureExtractor(username=USERNAME)
+
+    legacy_seconds, legacy_rows = best_time(lambda: legacy_build_rows(tweets, sync_time), repeat)
+    extractor_seconds, rows = best_time(lambda: extractor.transform_batch(tweets, sync_time), repeat)
+
+    mismatches = sum(1 for a, b in zip(legacy_rows, rows) if a != b)
+
+    print(f"Tweets:                {count}")
+    print(f"Original row building: {legacy_seconds:.3f}s ({count / legacy_seconds:,.0f} tweets/s)")
+    print(f"TweetFeatureExtractor: {extractor_seconds:.3f}s ({count / extractor_seconds:,.0f} tweets/s)")
+    print(f"Speedup:               {legacy_seconds / extractor_seconds:.2f}x")
+    print(f"Mismatched rows:       {mismatches}")
+    return mismatches == 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark tweet row building')
+    parser.add_argument('--tweets', type=int, default=100000, help='Number of synthetic tweets')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation; the best is reported')
+    args = parser.parse_args()
+
+    if not run_benchmark(args.tweets, args.repeat):
+        raise SystemExit("✗ Extractor output differs from the original row building")
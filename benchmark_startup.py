@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark.
+
+Measures how long `import app` takes in a fresh interpreter, which heavy
+client libraries that import pulls in, and how long `python app.py` takes to
+answer its first /health request (with STARTUP_SYNC=0 and a throwaway
+DATA_DIR, so no credentials or network needed). Each figure is the median of
+--runs fresh processes.
+
+    python benchmark_startup.py
+    python benchmark_startup.py --runs 10 --max-import-ms 300 --max-health-ms 1500
+    python benchmark_startup.py --json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+# Client libraries that should only load once a job needs them
+HEAVY_MODULES = ['tweepy', 'googleapiclient', 'google.oauth2', 'google_auth_httplib2', 'httplib2', 'requests',
+                 'numpy', 'pandas', 'pyarrow']
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+seconds = time.perf_counter() - started
+print(json.dumps({'seconds': seconds, 'modules': [m for m in %r if m in sys.modules]}))
+"""
+
+def startup_env(data_dir, port=None):
+    env = dict(os.environ, DATA_DIR=data_dir, STARTUP_SYNC='0', PYTHONDONTWRITEBYTECODE='1')
+    # Never point a benchmark at the real sheet
+    env['GOOGLE_SHEET_ID'] = 'benchmark'
+    if port is not None:
+        env['PORT'] = str(port)
+    return env
+
+def measure_import(data_dir):
+    """Seconds to import app in a fresh interpreter, and the heavy modules it loaded"""
+    result = subprocess.run([sys.executable, '-c', IMPORT_PROBE % (HEAVY_MODULES,)], cwd=HERE,
+                            env=startup_env(data_dir), capture_output=True, text=True, check=True)
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    return probe['seconds'], probe['modules']
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def measure_health(data_dir, timeout=30):
+    """Seconds from spawning app.py to its first 200 from /health"""
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/health'
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, 'app.py'], cwd=HERE, env=startup_env(data_dir, port),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"app.py exited with code {process.returncode} before answering /health")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"No 200 from /health within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+def run_benchmark(runs):
+    with tempfile.TemporaryDirectory() as data_dir:
+        imports = [measure_import(data_dir) for _ in range(runs)]
+        health = [measure_health(data_dir) for _ in range(runs)]
+
+    return {
+        'runs': runs,
+        'import_ms': round(statistics.median(seconds for seconds, _ in imports) * 1000, 1),
+        'health_ms': round(statistics.median(health) * 1000, 1),
+        'heavy_modules': sorted({module for _, modules in imports for module in modules})
+    }
+
+def print_report(report):
+    print(f"Runs:            {report['runs']} (medians)")
+    print(f"import app:      {report['import_ms']:.1f} ms")
+    print(f"First /health:   {report['health_ms']:.1f} ms")
+    print(f"Heavy modules:   {', '.join(report['heavy_modules']) or 'none'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark import time and time to the first /health response')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes per measurement')
+    parser.add_argument('--max-import-ms', type=float, help='Exit non-zero if importing app exceeds this budget')
+    parser.add_argument('--max-health-ms', type=float, help='Exit non-zero if the first /health exceeds this budget')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.runs)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.max_import_ms is not None and report['import_ms'] > args.max_import_ms:
+        raise SystemExit(f"✗ import app took {report['import_ms']:.1f} ms, budget {args.max_import_ms:.1f} ms")
+    if args.max_health_ms is not None and report['health_ms'] > args.max_health_ms:
+        raise SystemExit(f"✗ First /health took {report['health_ms']:.1f} ms, budget {args.max_health_ms:.1f} ms")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the sync hot path.
+
+Swaps get_twitter_client and get_sheets_service for in-process fakes with
+configurable latency and dataset sizes, then reports wall time, API call
+counts, request bytes and per-stage timings. No credentials or network needed.
+
+    python benchmark_sync.py --history 3000 --new 150 --latency-ms 50
+    python benchmark_sync.py --scenario refresh --history 2000
+    python benchmark_sync.py --accounts 8 --latency-ms 50
+    python benchmark_sync.py --json > bench_output.txt
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager, redirect_stdout
+from unittest import mock
+
+import app
+import clients
+from accounts import Account
+from fake_backends import CallRecorder, FakeSheetsService, FakeTwitterClient, make_tweets
+
+# Functions whose wall time is reported per stage (times are inclusive)
+STAGES = ['get_last_tweet_id', 'stream_sync', 'build_rows', 'update_spreadsheet', 'refresh_metrics', 'backfill_tweets']
+
+@contextmanager
+def fake_backends(twitter, sheets, data_dir, accounts=None):
+    """Point the app at the fakes and a throwaway DATA_DIR (and optionally a list of accounts)"""
+    with ExitStack() as stack:
+        # app imported the client getters by name, so both modules are patched
+        for module in (app, clients):
+            stack.enter_context(mock.patch.object(module, 'get_twitter_client', lambda: twitter))
+            stack.enter_context(mock.patch.object(module, 'get_sheets_service', lambda: sheets))
+        stack.enter_context(mock.patch.object(clients, 'DATA_DIR', data_dir))
+        stack.enter_context(mock.patch.object(clients, '_accounts', accounts))
+        stack.enter_context(mock.patch.object(clients, '_stores', {}))
+        stack.enter_context(mock.patch.object(clients, '_snapshot_stores', {}))
+        stack.enter_context(mock.patch.object(clients, '_sheet_metadata', {}))
+        stack.enter_context(mock.patch.object(clients, '_sheet_tabs', {}))
+        stack.enter_context(mock.patch.object(
+            clients, 'METADATA_CACHE_PATH', os.path.join(data_dir, 'metadata_cache.db')))
+        stack.enter_context(mock.patch.object(clients, '_metadata_cache', None))
+        stack.enter_context(mock.patch.object(app, 'SYNC_STATUS_PATH', os.path.join(data_dir, 'sync_status.json')))
+        stack.enter_context(mock.patch.object(app, '_rollups', {}))
+        stack.enter_context(mock.patch.object(app, '_journals', {}))
+        try:
+            yield
+        finally:
+            for store in list(clients._stores.values()) + list(clients._snapshot_stores.values()):
+                store.close()
+            if clients._metadata_cache is not None:
+                clients._metadata_cache.close()
+
+def make_accounts(count, spreadsheet):
+    """count accounts, each syncing to its own tab of the fake spreadsheet"""
+    accounts = []
+    for i in range(count):
+        sheet = 'posts' if i == 0 else f'posts{i + 1}'
+        if sheet not in spreadsheet.tabs:
+            spreadsheet.add_tab(sheet)
+        accounts.append(Account(
+            name=f'account{i + 1}',
+            spreadsheet_id='fake',
+            user_id=clients.USER_ID,
+            username='ashebytes',
+            sheet=sheet,
+            data_subdir=os.path.join('accounts', f'account{i + 1}')
+        ))
+    return accounts
+
+@contextmanager
+def stage_timer():
+    """Record the wall time of each stage function while active"""
+    timings = defaultdict(float)
+
+    def timed(name, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[name] += time.perf_counter() - start
+        return wrapper
+
+    with ExitStack() as stack:
+        for name in STAGES:
+            stack.enter_context(mock.patch.object(app, name, timed(name, getattr(app, name))))
+        yield timings
+
+def seed_history(sheets, tweets, account=None):
+    """Put already-synced tweets in the fake sheet and the local store, newest first"""
+    account = account or app.get_account()
+    rows = app.build_rows(sorted(tweets, key=lambda t: t.id, reverse=True), account=account)
+    sheets.spreadsheet.tabs[account.sheet] = [list(app.HEADERS)] + [list(row) for row in rows]
+    app.get_store(account).upsert_rows(rows)
+
+def run_benchmark(scenario='sync', history=1000, new=100, latency_ms=0.0, refresh_rows=None, account_count=1):
+    recorder = CallRecorder(latency=latency_ms / 1000)
+    tweets = make_tweets(history + new)
+    twitter = FakeTwitterClient(tweets, recorder)
+    sheets = FakeSheetsService(recorder=recorder)
+    accounts = make_accounts(account_count, sheets.spreadsheet) if account_count > 1 else None
+
+    with tempfile.TemporaryDirectory() as data_dir, fake_backends(twitter, sheets, data_dir, accounts):
+        for account in app.get_accounts():
+            if scenario == 'sync':
+                seed_history(sheets, tweets[:history], account)
+            elif scenario == 'refresh':
+                seed_history(sheets, tweets, account)
+        recorder.reset()
+
+        with stage_timer() as timings:
+            start = time.perf_counter()
+            if scenario == 'sync':
+                result = app.sync_all_accounts()
+            elif scenario == 'refresh':
+                result = app.refresh_all_accounts(max_rows=refresh_rows)
+            else:
+                result = app.for_each_account(lambda account: app.backfill_tweets(restart=True, account=account))
+            wall_seconds = time.perf_counter() - start
+
+        rows = sheets.spreadsheet.tabs[app.get_account().sheet]
+        newest_id = rows[1][app.TWEET_ID_COLUMN] if len(rows) > 1 else None
+
+    return {
+        'scenario': scenario,
+        'history': history,
+        'new': new,
+        'accounts': account_count,
+        'latency_ms': latency_ms,
+        'result': result,
+        'wall_seconds': round(wall_seconds, 4),
+        'api_calls': dict(sorted(recorder.calls.items())),
+        'total_api_calls': sum(recorder.calls.values()),
+        'bytes_sent': recorder.bytes_sent,
+        'stage_seconds': {name: round(timings[name], 4) for name in STAGES if name in timings},
+        'sheet_rows': len(rows) - 1,
+        'newest_tweet_id': str(newest_id) if newest_id is not None else None
+    }
+
+def print_report(report):
+    print(f"Scenario:        {report['scenario']} (history={report['history']}, new={report['new']}, "
+          f"accounts={report['accounts']}, latency={report['latency_ms']}ms)")
+    print(f"Result:          {report['result']}")
+    print(f"Wall time:       {report['wall_seconds'] * 1000:.1f} ms")
+    print(f"API calls:       {report['total_api_calls']}")
+    for name, count in report['api_calls'].items():
+        print(f"  {name}: {count}")
+    print(f"Bytes sent:      {report['bytes_sent']:,}")
+    print("Stage timings (inclusive):")
+    for name, seconds in report['stage_seconds'].items():
+        print(f"  {name}: {seconds * 1000:.1f} ms")
+    print(f"Sheet rows:      {report['sheet_rows']} in the first account's tab (newest tweet ID {report['newest_tweet_id']})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark sync against fake Twitter and Sheets backends')
+    parser.add_argument('--scenario', choices=['sync', 'refresh', 'backfill'], default='sync')
+    parser.add_argument('--history', type=int, default=1000, help='Tweets already in the sheet')
+    parser.add_argument('--new', type=int, default=100, help='Tweets posted since the last sync')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated latency per API call')
+    parser.add_argument('--accounts', type=int, default=1, help='Accounts synced in parallel, each to its own tab')
+    parser.add_argument('--refresh-rows', type=int, help='Limit the refresh scenario to the newest N rows')
+    parser.add_argument('--max-seconds', type=float, help='Exit non-zero if wall time exceeds this budget')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    # Keep the app's progress output out of the JSON report
+    with redirect_stdout(sys.stderr if args.json else sys.stdout):
+        report = run_benchmark(args.scenario, args.history, args.new, args.latency_ms, args.refresh_rows, args.accounts)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.max_seconds is not None and report['wall_seconds'] > args.max_seconds:
+        raise SystemExit(f"✗ Wall time {report['wall_seconds']:.3f}s exceeds budget {args.max_seconds:.3f}s")
@@ -1,29 +1,48 @@
 #!/usr/bin/env python3
-import os
-import tweepy
-from dotenv import load_dotenv
+"""
+Show the Twitter API rate-limit budget.
+
+By default this reads the budget the app saved from its last responses'
+x-rate-limit-* headers, so it costs no API calls. --probe spends one
+timeline request to get fresh numbers.
+"""
+import argparse
 from datetime import datetime
+from dotenv import load_dotenv
 
 load_dotenv()
 
-def check_rate_limit():
-    bearer_token = os.environ.get('TWITTER_BEARER_TOKEN')
-    client = tweepy.Client(bearer_token=bearer_token)
+from clients import get_account, get_rate_limits, get_twitter_client, resolve_user_id
+from rate_limit import RateLimitExceeded
 
-    try:
-        # Make a simple request to check rate limit
-        response = client.get_user(username='twitter')
+def print_budget():
+    budget = get_rate_limits().budget()
+    print("Rate limit info:")
+    print(f"Current time: {datetime.now()}")
 
-        # Check rate limit headers
-        print("Rate limit info:")
-        print(f"Current time: {datetime.now()}")
+    if not budget:
+        print("  No budget recorded yet (no API calls since the last window reset)")
+        return
 
-    except tweepy.TooManyRequests as e:
-        print(f"Rate limit exceeded: {e}")
-        print(f"Current time: {datetime.now()}")
-        print("Please wait approximately 15 minutes before retrying.")
-    except Exception as e:
-        print(f"Error: {e}")
+    for endpoint, info in sorted(budget.items()):
+        limit = info.get('limit') or '?'
+        print(f"  {endpoint}: {info['remaining']}/{limit} remaining, resets in {info['resets_in']}s")
+
+def check_rate_limit(probe=False):
+    if probe:
+        try:
+            get_twitter_client().get_users_tweets(id=resolve_user_id(get_account()), max_results=5)
+        except RateLimitExceeded as e:
+            print(f"Rate limit exceeded: {e}")
+            print("Please wait until the window resets before retrying.")
+        except Exception as e:
+            print(f"Error: {e}")
+
+    print_budget()
 
 if __name__ == "__main__":
-    check_rate_limit()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--probe', action='store_true', help='Spend one timeline request to refresh the numbers')
+    args = parser.parse_args()
+
+    check_rate_limit(probe=args.probe)
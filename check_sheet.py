@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
-import os
 from dotenv import load_dotenv
-from app import get_sheets_service, SPREADSHEET_ID
 
 load_dotenv()
 
+from clients import get_account, get_sheets_service, get_store
+
 def check_sheet():
     try:
+        account = get_account()
         service = get_sheets_service()
         sheet = service.spreadsheets()
 
         # Get spreadsheet metadata
-        metadata = sheet.get(spreadsheetId=SPREADSHEET_ID).execute()
+        metadata = sheet.get(spreadsheetId=account.spreadsheet_id).execute()
         sheets = metadata.get('sheets', [])
 
         print("Sheet information:")
@@ -21,6 +22,13 @@ def check_sheet():
             print(f"  Sheet ID: {properties.get('sheetId')}")
             print(f"  Grid Properties: {properties.get('gridProperties')}")
 
+        # Row counts and newest/oldest tweets come from the local store, not the sheet
+        store = get_store(account)
+        print("Local store:")
+        print(f"  Tweets: {store.count()}")
+        print(f"  Newest tweet ID: {store.latest_tweet_id()}")
+        print(f"  Oldest tweet ID: {store.oldest_tweet_id()}")
+
     except Exception as e:
         print(f"Error: {e}")
 
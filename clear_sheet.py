@@ -1,26 +1,56 @@
 #!/usr/bin/env python3
-import os
+"""
+Clear every value from the account's sheet.
+
+The local store keeps its tweets, and syncs only add tweets newer than the
+store's newest, so the history doesn't come back on its own. Afterwards
+either rewrite the sheet from the store (python sync_store.py project) or
+pass --store to empty the store too, so the next sync and backfill start
+over. Restart a running server as well: it caches whether the sheet has a
+header row.
+"""
+import argparse
 from dotenv import load_dotenv
-from app import get_sheets_service, SPREADSHEET_ID
 
 load_dotenv()
 
-def clear_sheet():
+from app import clear_backfill_state, clear_sync_state
+from clients import get_account, get_sheets_service, get_sheet_metadata, get_store, invalidate_sheet_metadata
+from sheet_plan import clear_values_request
+
+def clear_sheet(clear_store=False, account=None):
     try:
+        account = account or get_account()
         service = get_sheets_service()
         sheet = service.spreadsheets()
+        sheet_id = get_sheet_metadata(sheet, account)['sheet_id']
 
-        # Clear the entire sheet
-        sheet.values().clear(
-            spreadsheetId=SPREADSHEET_ID,
-            range='posts'
+        # Clear the entire sheet server-side
+        sheet.batchUpdate(
+            spreadsheetId=account.spreadsheet_id,
+            body={"requests": [clear_values_request(sheet_id)]}
         ).execute()
-
+        invalidate_sheet_metadata(account)
         print("✓ Spreadsheet cleared successfully")
+
+        store = get_store(account)
+        if clear_store:
+            deleted = store.clear()
+            clear_sync_state(account)
+            clear_backfill_state(account)
+            print(f"✓ Deleted {deleted} tweets from the local store; the next sync starts over")
+        else:
+            print(f"The local store still has {store.count()} tweets. Run `python sync_store.py project` "
+                  f"to rewrite the sheet from it, or clear again with --store to start over.")
+        print("Restart the server if it's running, so it re-reads the sheet's header.")
         return True
     except Exception as e:
         print(f"Error clearing spreadsheet: {e}")
         return False
 
 if __name__ == "__main__":
-    clear_sheet()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--store', action='store_true', help='Also delete the tweets in the local store')
+    parser.add_argument('--account', help='Account to clear (defaults to the first configured account)')
+    args = parser.parse_args()
+    clear_sheet(clear_store=args.store, account=get_account(args.account) if args.account else None)
@@ -0,0 +1,345 @@
+"""
+Accounts, local stores and the long-lived API clients, created on first use.
+
+Nothing slow happens at import: tweepy, the Google API client and their
+dependencies are imported the first time a client is asked for. The web app
+and the utility scripts share these, so a script that only needs the Sheets
+service doesn't load Flask, and a cold /health doesn't load the API clients.
+"""
+import json
+import os
+import queue
+import threading
+from urllib.parse import urlparse
+
+import metrics
+from accounts import Account, check_layout, load_accounts
+from metadata_cache import MetadataCache
+from partitions import NEWEST_FIRST
+from rate_limit import QuotaBucket, RateLimitTracker
+from snapshots import SnapshotStore
+from tweet_store import TweetStore
+
+# Defaults for the single-account setup; GOOGLE_SHEET_ID or ACCOUNTS_FILE override them
+SPREADSHEET_ID = '1bIngxeeaZ8cI-SHAg3XpzqEzkIt_Ne3SMvWwneVbXAs'
+SHEET_NAME = 'posts'
+# User ID for ashebytes, used when neither TWITTER_USER_ID nor TWITTER_USERNAME is set
+USER_ID = '1237140914558164992'
+
+# Local state (tweet store, journal, checkpoints) lives here; on Fly it's the volume in fly.toml.example
+DATA_DIR = os.environ.get('DATA_DIR', 'data')
+STORE_FILE = 'tweets.db'  # Per account, see account_path()
+SNAPSHOT_FILE = 'snapshots.db'  # Per account, engagement history (see snapshots.py)
+RATE_LIMITS_PATH = os.path.join(DATA_DIR, 'rate_limits.json')
+METADATA_CACHE_PATH = os.path.join(DATA_DIR, 'metadata_cache.db')
+
+# Username -> user ID and referenced tweets, shared by the app and the scripts
+METADATA_CACHE_MAX_ENTRIES = int(os.environ.get('METADATA_CACHE_MAX_ENTRIES', 50000))
+USER_ID_TTL = 30 * 24 * 3600  # Usernames can be changed or given up, so look them up again now and then
+
+HTTP_POOL_SIZE = 8  # Keep-alive connections kept open per API client
+HTTP_TIMEOUT = 30  # Seconds
+
+# Sheets API per-minute quotas for the service account (reads and writes are counted separately)
+SHEETS_READS_PER_MINUTE = int(os.environ.get('SHEETS_READS_PER_MINUTE', 60))
+SHEETS_WRITES_PER_MINUTE = int(os.environ.get('SHEETS_WRITES_PER_MINUTE', 60))
+
+# How long a call may sleep waiting for its rate-limit window to reset.
+# Interactive syncs give up quickly; backfills and refreshes wait out the 15-minute window.
+RATE_LIMIT_MAX_WAIT = int(os.environ.get('RATE_LIMIT_MAX_WAIT', 60))
+
+_accounts = None
+_accounts_lock = threading.Lock()
+
+# One local store (and one snapshot store) per account
+_stores = {}
+_snapshot_stores = {}
+_store_lock = threading.Lock()
+
+# Cached sheet metadata (sheetId, whether the header row exists) per (spreadsheet, tab), read once per process
+_sheet_metadata = {}
+_sheet_metadata_lock = threading.Lock()
+# Tab titles -> sheetId per spreadsheet, guarded by the same lock
+_sheet_tabs = {}
+
+# Long-lived API clients, built once per process
+_twitter_client = None
+_sheets_service = None
+_rate_limits = None
+_metadata_cache = None
+_clients_lock = threading.Lock()
+
+def sheets_operation(uri, method='GET'):
+    """Name a Sheets API request for metrics, e.g. 'values.batchUpdate' or 'values.get'"""
+    path = urlparse(uri).path.split('/spreadsheets/', 1)[-1]
+    spreadsheet, _, rest = path.partition('/')
+    if not rest:
+        return spreadsheet.rpartition(':')[2] if ':' in spreadsheet else 'get'
+    # values/<range>:append, values:batchGet; the range itself is percent-encoded
+    action = rest.rpartition(':')[2] if ':' in rest else {'GET': 'get', 'PUT': 'update'}.get(method, method.lower())
+    return f'values.{action}'
+
+class PooledHttp:
+    """Thread-safe stand-in for httplib2.Http that reuses keep-alive connections.
+
+    httplib2.Http can't be shared between threads, so each request checks out
+    an authorized connection from the pool and puts it back when done. The
+    credentials are shared, so the access token is fetched once and refreshed
+    only when it expires.
+    """
+
+    def __init__(self, credentials, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT, read_quota=None, write_quota=None):
+        self.credentials = credentials
+        self.timeout = timeout
+        self.read_quota = read_quota
+        self.write_quota = write_quota
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+
+    def request(self, uri, method='GET', *args, **kwargs):
+        # Every Sheets call passes through here, so this is where the shared quota is spent
+        quota = self.read_quota if method == 'GET' else self.write_quota
+        if quota is not None:
+            quota.acquire()
+
+        try:
+            http = self._idle.get_nowait()
+        except queue.Empty:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+
+        try:
+            with metrics.api_call('sheets', sheets_operation(uri, method)) as call:
+                response = http.request(uri, method, *args, **kwargs)
+                call['status'] = response[0].status
+                return response
+        finally:
+            try:
+                self._idle.put_nowait(http)
+            except queue.Full:
+                http.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+def get_rate_limits():
+    """Get the process-wide Twitter rate-limit budget"""
+    global _rate_limits
+    with _clients_lock:
+        if _rate_limits is None:
+            _rate_limits = RateLimitTracker(RATE_LIMITS_PATH, max_wait=RATE_LIMIT_MAX_WAIT)
+        return _rate_limits
+
+def get_metadata_cache():
+    """Get the on-disk metadata cache, opened once per process"""
+    global _metadata_cache
+    with _clients_lock:
+        if _metadata_cache is None:
+            _metadata_cache = MetadataCache(METADATA_CACHE_PATH, max_entries=METADATA_CACHE_MAX_ENTRIES)
+        return _metadata_cache
+
+def get_twitter_client():
+    """Get the process-wide Twitter client (its requests session keeps connections alive)"""
+    global _twitter_client
+    rate_limits = get_rate_limits()
+    with _clients_lock:
+        if _twitter_client is not None:
+            return _twitter_client
+
+        api_key = os.environ.get('TWITTER_API_KEY')
+        api_key_secret = os.environ.get('TWITTER_API_KEY_SECRET')
+        bearer_token = os.environ.get('TWITTER_BEARER_TOKEN')
+
+        if not api_key or not api_key_secret:
+            raise ValueError("TWITTER_API_KEY and TWITTER_API_KEY_SECRET environment variables are required")
+
+        # tweepy is the slowest import here, so it waits until a client is needed
+        from requests.adapters import HTTPAdapter
+        from twitter_client import RateLimitedClient
+
+        client = RateLimitedClient(
+            consumer_key=api_key,
+            consumer_secret=api_key_secret,
+            bearer_token=bearer_token,
+            rate_limits=rate_limits
+        )
+        client.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE))
+
+        _twitter_client = client
+        return client
+
+def get_sheets_service():
+    """Get the process-wide Sheets service.
+
+    Built once from the discovery document bundled with google-api-python-client,
+    so no discovery fetch or re-parse happens per sync.
+    """
+    global _sheets_service
+    with _clients_lock:
+        if _sheets_service is not None:
+            return _sheets_service
+
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build
+
+        service_account_info = json.loads(os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON', '{}'))
+
+        credentials = service_account.Credentials.from_service_account_info(
+            service_account_info,
+            scopes=['https://www.googleapis.com/auth/spreadsheets']
+        )
+
+        _sheets_service = build(
+            'sheets', 'v4',
+            http=PooledHttp(
+                credentials,
+                read_quota=QuotaBucket(SHEETS_READS_PER_MINUTE),
+                write_quota=QuotaBucket(SHEETS_WRITES_PER_MINUTE)
+            ),
+            static_discovery=True,
+            cache_discovery=False
+        )
+        return _sheets_service
+
+def reset_clients():
+    """Drop the cached API clients, e.g. after rotating credentials"""
+    global _twitter_client, _sheets_service
+    with _clients_lock:
+        if _sheets_service is not None:
+            _sheets_service._http.close()
+        _twitter_client = None
+        _sheets_service = None
+
+def get_accounts():
+    """Get the accounts to sync: ACCOUNTS_FILE if set, else one account from the environment"""
+    global _accounts
+    with _accounts_lock:
+        if _accounts is None:
+            accounts_file = os.environ.get('ACCOUNTS_FILE')
+            if accounts_file:
+                _accounts = load_accounts(accounts_file)
+            else:
+                username = os.environ.get('TWITTER_USERNAME', '')
+                layout = os.environ.get('SHEET_LAYOUT', NEWEST_FIRST)
+                partition = os.environ.get('SHEET_PARTITION') or None
+                check_layout(username or 'default', layout, partition)
+                _accounts = [Account(
+                    name=username or 'default',
+                    spreadsheet_id=os.environ.get('GOOGLE_SHEET_ID') or SPREADSHEET_ID,
+                    user_id=os.environ.get('TWITTER_USER_ID') or (None if username else USER_ID),
+                    username=username,
+                    sheet=SHEET_NAME,
+                    layout=layout,
+                    partition=partition
+                )]
+        return _accounts
+
+def get_account(name=None):
+    """Look up an account by name; the first configured account by default"""
+    accounts = get_accounts()
+    if name is None:
+        return accounts[0]
+    for account in accounts:
+        if account.name == name:
+            return account
+    raise KeyError(name)
+
+def lookup_user_id(username):
+    """A username's Twitter user ID, from the metadata cache or (once per USER_ID_TTL) the API"""
+    key = username.lstrip('@').lower()
+    cache = get_metadata_cache()
+    user_id = cache.get('user_id', key)
+    if user_id is None:
+        user = get_twitter_client().get_user(username=key).data
+        user_id = str(user.id)
+        cache.put('user_id', key, user_id, ttl=USER_ID_TTL)
+        print(f"Resolved @{key} to user ID {user_id}")
+    return user_id
+
+def resolve_user_id(account):
+    """The account's Twitter user ID, looked up from its username the first time if not configured"""
+    if not account.user_id:
+        account.user_id = lookup_user_id(account.username)
+    return account.user_id
+
+def account_path(account, filename):
+    """Path of one of the account's local state files"""
+    return os.path.join(DATA_DIR, account.data_subdir or '', filename)
+
+def get_store(account=None):
+    """Get the account's local tweet store, opened once per process"""
+    account = account or get_account()
+    with _store_lock:
+        store = _stores.get(account.name)
+        if store is None:
+            store = _stores[account.name] = TweetStore(account_path(account, STORE_FILE))
+        return store
+
+def get_snapshot_store(account=None):
+    """Get the account's engagement snapshot store, opened once per process"""
+    account = account or get_account()
+    with _store_lock:
+        store = _snapshot_stores.get(account.name)
+        if store is None:
+            store = _snapshot_stores[account.name] = SnapshotStore(account_path(account, SNAPSHOT_FILE))
+        return store
+
+def get_sheet_metadata(sheet, account=None, tab=None, spreadsheet_id=None):
+    """Get the account's sheet ID and header state, reading it from the API only once.
+
+    Returns a dict with 'sheet_id' and 'has_headers'. tab and spreadsheet_id
+    look up another of the account's tabs (e.g. a data tab), which must
+    exist. Call invalidate_sheet_metadata() if the sheet is changed outside
+    this process.
+    """
+    account = account or get_account()
+    tab = tab or account.sheet
+    spreadsheet_id = spreadsheet_id or account.spreadsheet_id
+    key = (spreadsheet_id, tab)
+    with _sheet_metadata_lock:
+        if key in _sheet_metadata:
+            return _sheet_metadata[key]
+
+        result = sheet.get(
+            spreadsheetId=spreadsheet_id,
+            ranges=[account.a1('A1:V1', sheet=tab)],
+            fields='sheets(properties(sheetId,title),data(rowData(values(formattedValue))))'
+        ).execute()
+
+        metadata = {'sheet_id': 0, 'has_headers': False}
+        for s in result.get('sheets', []):
+            if s.get('properties', {}).get('title') != tab:
+                continue
+            metadata['sheet_id'] = s['properties'].get('sheetId', 0)
+            for grid in s.get('data', []):
+                for row in grid.get('rowData', []):
+                    if any(cell.get('formattedValue') for cell in row.get('values', [])):
+                        metadata['has_headers'] = True
+
+        _sheet_metadata[key] = metadata
+        return metadata
+
+def get_sheet_tabs(sheet, spreadsheet_id):
+    """Map tab title -> sheet ID for every tab in a spreadsheet, read from the API only once"""
+    with _sheet_metadata_lock:
+        tabs = _sheet_tabs.get(spreadsheet_id)
+        if tabs is None:
+            result = sheet.get(spreadsheetId=spreadsheet_id, fields='sheets.properties(sheetId,title)').execute()
+            tabs = _sheet_tabs[spreadsheet_id] = {
+                s['properties']['title']: s['properties'].get('sheetId', 0) for s in result.get('sheets', [])
+            }
+        return tabs
+
+def invalidate_sheet_metadata(account=None, tab=None, spreadsheet_id=None):
+    """Forget cached metadata for one of an account's tabs (its main tab by default), or for every sheet"""
+    with _sheet_metadata_lock:
+        if account is None:
+            _sheet_metadata.clear()
+            _sheet_tabs.clear()
+        else:
+            _sheet_tabs.pop(spreadsheet_id or account.spreadsheet_id, None)
+            _sheet_metadata.pop((spreadsheet_id or account.spreadsheet_id, tab or account.sheet), None)
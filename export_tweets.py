@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Export the full tweet history from the local store as typed CSV, Parquet or Arrow.
+
+    python export_tweets.py --format csv > tweets.csv
+    python export_tweets.py --format parquet --output tweets.parquet
+    python export_tweets.py --local
+
+--local writes an uncompressed Arrow file next to the account's store
+(DATA_DIR/tweets.arrow by default) that can be memory-mapped for fast repeated
+reads. Parquet, Arrow and --local need pyarrow.
+"""
+import argparse
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from clients import account_path, get_account, get_store
+from tweet_export import FORMATS, LOCAL_COPY_FILE, ExportUnavailable, iter_export, write_export, write_local_copy
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--format', choices=list(FORMATS), default='csv')
+    parser.add_argument('--output', help='File to write (defaults to stdout)')
+    parser.add_argument('--local', action='store_true', help='Write the memory-mappable Arrow copy instead')
+    parser.add_argument('--account', help='Account to export (defaults to the first configured account)')
+    args = parser.parse_args()
+
+    account = get_account(args.account)
+    store = get_store(account)
+
+    try:
+        if args.local:
+            path = account_path(account, LOCAL_COPY_FILE)
+            rows = write_local_copy(store, path)
+            print(f"✓ Wrote {rows} rows to {path}")
+        elif args.output:
+            size = write_export(store, args.output, args.format)
+            print(f"✓ Wrote {size:,} bytes to {args.output}")
+        else:
+            for chunk in iter_export(store, args.format):
+                sys.stdout.buffer.write(chunk)
+    except ExportUnavailable as e:
+        raise SystemExit(f"✗ {e}")
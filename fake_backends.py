@@ -0,0 +1,380 @@
+"""
+In-process fakes for the Twitter and Google Sheets clients.
+
+They implement just enough of tweepy.Client and the Sheets v4 discovery
+client for the sync code paths, with configurable per-call latency, and
+record API call counts and request bytes so benchmarks can run offline.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import tweepy
+
+MEDIA_TYPES = ['photo'] * 6 + ['video'] * 3 + ['animated_gif']
+WORDS = ['strategy', 'growth', 'thread', 'launch', 'build', 'ship', 'founder', 'ai', 'product', 'today']
+FIRST_TWEET_ID = 1600000000000000000
+FIRST_REFERENCED_ID = 1500000000000000000  # Other users' tweets that replies and quotes point to
+
+def make_tweets(count, seed=42, username='ashebytes'):
+    """Generate synthetic tweets shaped like tweepy.Tweet, oldest first"""
+    rng = random.Random(seed)
+    # Separate stream so media types don't change the rest of the dataset
+    media_rng = random.Random(seed + 1)
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    tweets = []
+
+    for i in range(count):
+        words = rng.choices(WORDS, k=rng.randint(5, 30))
+        if rng.random() < 0.3:
+            words.append(f'#{rng.choice(WORDS)}')
+        if rng.random() < 0.3:
+            words.append(f'@{rng.choice([username, "someone", "other_user"])}')
+        if rng.random() < 0.25:
+            words.append(f'https://t.co/{rng.randint(10 ** 8, 10 ** 9)}')
+        if rng.random() < 0.05:
+            words.insert(0, 'RT @someone:')
+
+        referenced = None
+        referenced_tweets = []
+        if rng.random() < 0.2:
+            referenced = [SimpleNamespace(type=rng.choice(['replied_to', 'quoted']), id=FIRST_REFERENCED_ID + i)]
+            referenced_tweets = [SimpleNamespace(id=FIRST_REFERENCED_ID + i, text=f'Referenced tweet {i}',
+                                                 author_id=42, created_at=start + timedelta(minutes=37 * i - 5))]
+
+        attachments = None
+        media = []
+        if rng.random() < 0.2:
+            attachments = {'media_keys': [f'3_{i}_{j}' for j in range(rng.randint(1, 4))]}
+            media = [SimpleNamespace(media_key=key, type=media_rng.choice(MEDIA_TYPES)) for key in attachments['media_keys']]
+
+        tweets.append(SimpleNamespace(
+            id=FIRST_TWEET_ID + i,
+            text=' '.join(words),
+            created_at=start + timedelta(minutes=37 * i),
+            public_metrics={
+                'like_count': rng.randint(0, 500),
+                'retweet_count': rng.randint(0, 50),
+                'bookmark_count': rng.randint(0, 20),
+                'reply_count': rng.randint(0, 30),
+                'quote_count': rng.randint(0, 10),
+                'impression_count': rng.randint(0, 20000)
+            },
+            referenced_tweets=referenced,
+            attachments=attachments,
+            # Served in includes.media / includes.tweets when those expansions are requested
+            media=media,
+            referenced=referenced_tweets
+        ))
+
+    return tweets
+
+class CallRecorder:
+    """Thread-safe API call and payload accounting shared by the fakes"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def record(self, name, payload=None):
+        size = len(json.dumps(payload, default=str)) if payload is not None else 0
+        with self._lock:
+            self.calls[name] += 1
+            self.bytes_sent += size
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.bytes_sent = 0
+
+class FakeTwitterClient:
+    """Serves a fixed timeline through the tweepy.Client methods the app calls"""
+
+    def __init__(self, tweets, recorder=None):
+        # Newest first, like the API
+        self.tweets = sorted(tweets, key=lambda t: t.id, reverse=True)
+        self.by_id = {t.id: t for t in self.tweets}
+        self.recorder = recorder or CallRecorder()
+
+    def includes(self, tweets, expansions):
+        includes = {}
+        if 'attachments.media_keys' in (expansions or []):
+            includes['media'] = [item for t in tweets for item in getattr(t, 'media', [])]
+        if 'referenced_tweets.id' in (expansions or []):
+            includes['tweets'] = [item for t in tweets for item in getattr(t, 'referenced', [])]
+        return includes
+
+    def get_users_tweets(self, id, max_results=10, since_id=None, until_id=None, pagination_token=None,
+                         expansions=None, **kwargs):
+        self.recorder.record('twitter.get_users_tweets')
+
+        tweets = self.tweets
+        if since_id:
+            tweets = [t for t in tweets if t.id > int(since_id)]
+        if until_id:
+            tweets = [t for t in tweets if t.id < int(until_id)]
+
+        start = int(pagination_token or 0)
+        page = tweets[start:start + max_results]
+        meta = {'result_count': len(page)}
+        if start + max_results < len(tweets):
+            meta['next_token'] = str(start + max_results)
+
+        return tweepy.Response(page or None, self.includes(page, expansions), [], meta)
+
+    def get_tweets(self, ids, expansions=None, **kwargs):
+        self.recorder.record('twitter.get_tweets')
+        found = [self.by_id[int(i)] for i in ids if int(i) in self.by_id]
+        return tweepy.Response(found or None, self.includes(found, expansions), [], {'result_count': len(found)})
+
+    def get_user(self, username=None, **kwargs):
+        self.recorder.record('twitter.get_user')
+        return tweepy.Response(SimpleNamespace(id=1237140914558164992, username=username), {}, [], {})
+
+A1_PATTERN = re.compile(r"^(?:'?([^'!]+)'?!)?([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+
+def column_index(letters):
+    index = 0
+    for letter in letters:
+        index = index * 26 + (ord(letter) - 64)
+    return index - 1
+
+def parse_range(a1, default_sheet):
+    """Parse 'posts!A2:V' into (sheet, first_row, last_row, first_col, last_col), zero-based, None = open"""
+    match = A1_PATTERN.match(a1)
+    if not match:
+        raise ValueError(f"Unsupported range: {a1}")
+    sheet, start_col, start_row, end_col, end_row = match.groups()
+    first_row = int(start_row) - 1 if start_row else 0
+    first_col = column_index(start_col) if start_col else 0
+
+    if match.group(4) is None and match.group(5) is None:
+        # Single cell or bare sheet name
+        last_row = first_row if start_row else None
+        last_col = first_col if start_col else None
+    else:
+        last_row = int(end_row) - 1 if end_row else None
+        last_col = column_index(end_col) if end_col else None
+
+    return sheet or default_sheet, first_row, last_row, first_col, last_col
+
+def cell_value(cell):
+    """Unwrap a CellData dict"""
+    entered = cell.get('userEnteredValue', {})
+    for key in ('numberValue', 'stringValue', 'boolValue', 'formulaValue'):
+        if key in entered:
+            return entered[key]
+    return ''
+
+class FakeRequest:
+    def __init__(self, recorder, name, payload, handler):
+        self._recorder = recorder
+        self._name = name
+        self._payload = payload
+        self._handler = handler
+
+    def execute(self, **kwargs):
+        self._recorder.record(self._name, self._payload)
+        return self._handler()
+
+class FakeSpreadsheet:
+    """An in-memory spreadsheet: tabs of rows of values"""
+
+    def __init__(self, tabs=('posts',)):
+        self.tabs = {}
+        self.sheet_ids = {}
+        for title in tabs:
+            self.add_tab(title)
+
+    def add_tab(self, title, sheet_id=None):
+        if sheet_id is None:
+            sheet_id = len(self.sheet_ids)
+        self.tabs[title] = []
+        self.sheet_ids[title] = sheet_id
+        return sheet_id
+
+    def tab_for_id(self, sheet_id):
+        for title, tab_id in self.sheet_ids.items():
+            if tab_id == sheet_id:
+                return self.tabs[title]
+        raise ValueError(f"No sheet with ID {sheet_id}")
+
+    def read(self, a1):
+        title, first_row, last_row, first_col, last_col = parse_range(a1, 'posts')
+        rows = self.tabs[title]
+        end = len(rows) if last_row is None else min(last_row + 1, len(rows))
+        values = []
+        for row in rows[first_row:end]:
+            cells = row[first_col:None if last_col is None else last_col + 1]
+            while cells and cells[-1] in ('', None):
+                cells = cells[:-1]
+            values.append([str(c) if not isinstance(c, str) else c for c in cells])
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def write(self, title, first_row, first_col, values):
+        rows = self.tabs[title]
+        for offset, new_cells in enumerate(values):
+            index = first_row + offset
+            while len(rows) <= index:
+                rows.append([])
+            row = list(rows[index])
+            while len(row) < first_col + len(new_cells):
+                row.append('')
+            row[first_col:first_col + len(new_cells)] = new_cells
+            rows[index] = row
+
+    def write_range(self, a1, values):
+        title, first_row, _, first_col, _ = parse_range(a1, 'posts')
+        self.write(title, first_row, first_col, values)
+        return sum(len(row) for row in values)
+
+    def clear_range(self, a1):
+        title, first_row, last_row, first_col, last_col = parse_range(a1, 'posts')
+        rows = self.tabs[title]
+        end = len(rows) if last_row is None else min(last_row + 1, len(rows))
+        for index in range(first_row, end):
+            row = list(rows[index])
+            stop = len(row) if last_col is None else min(last_col + 1, len(row))
+            for col in range(first_col, stop):
+                row[col] = ''
+            rows[index] = row
+
+    def apply(self, request):
+        """Apply one batchUpdate request, returning its reply"""
+        kind, body = next(iter(request.items()))
+
+        if kind == 'updateCells':
+            values = [[cell_value(cell) for cell in row.get('values', [])] for row in body.get('rows', [])]
+            if 'start' in body:
+                start = body['start']
+                title = self._title(start.get('sheetId', 0))
+                self.write(title, start.get('rowIndex', 0), start.get('columnIndex', 0), values)
+            else:
+                grid = body['range']
+                rows = self.tab_for_id(grid.get('sheetId', 0))
+                for index in range(grid.get('startRowIndex', 0), len(rows)):
+                    rows[index] = []
+        elif kind == 'insertDimension':
+            grid = body['range']
+            rows = self.tab_for_id(grid.get('sheetId', 0))
+            start, end = grid['startIndex'], grid['endIndex']
+            rows[start:start] = [[] for _ in range(end - start)]
+        elif kind == 'deleteDimension':
+            grid = body['range']
+            rows = self.tab_for_id(grid.get('sheetId', 0))
+            del rows[grid['startIndex']:grid['endIndex']]
+        elif kind == 'appendCells':
+            rows = self.tab_for_id(body.get('sheetId', 0))
+            rows.extend([cell_value(cell) for cell in row.get('values', [])] for row in body.get('rows', []))
+        elif kind == 'addSheet':
+            properties = body.get('properties', {})
+            sheet_id = self.add_tab(properties['title'], properties.get('sheetId'))
+            return {'addSheet': {'properties': {'sheetId': sheet_id, 'title': properties['title']}}}
+        elif kind == 'sortRange':
+            grid = body['range']
+            rows = self.tab_for_id(grid.get('sheetId', 0))
+            start = grid.get('startRowIndex', 0)
+            data = rows[start:]
+            for spec in reversed(body.get('sortSpecs', [])):
+                column = spec['dimensionIndex']
+                data.sort(
+                    key=lambda row: str(row[column]) if column < len(row) else '',
+                    reverse=spec.get('sortOrder') == 'DESCENDING'
+                )
+            rows[start:] = data
+        # Formatting-only requests (repeatCell etc.) don't change values
+        return {}
+
+    def _title(self, sheet_id):
+        for title, tab_id in self.sheet_ids.items():
+            if tab_id == sheet_id:
+                return title
+        raise ValueError(f"No sheet with ID {sheet_id}")
+
+class FakeValues:
+    def __init__(self, spreadsheet, recorder):
+        self._spreadsheet = spreadsheet
+        self._recorder = recorder
+
+    def get(self, spreadsheetId, range, **kwargs):
+        return FakeRequest(self._recorder, 'sheets.values.get', {'range': range},
+                           lambda: {'range': range, 'values': self._spreadsheet.read(range)})
+
+    def batchGet(self, spreadsheetId, ranges, **kwargs):
+        return FakeRequest(self._recorder, 'sheets.values.batchGet', {'ranges': ranges},
+                           lambda: {'valueRanges': [{'range': r, 'values': self._spreadsheet.read(r)} for r in ranges]})
+
+    def update(self, spreadsheetId, range, body, **kwargs):
+        return FakeRequest(self._recorder, 'sheets.values.update', body,
+                           lambda: {'updatedCells': self._spreadsheet.write_range(range, body.get('values', []))})
+
+    def append(self, spreadsheetId, range, body, **kwargs):
+        def handler():
+            title = parse_range(range, 'posts')[0]
+            rows = self._spreadsheet.tabs[title]
+            self._spreadsheet.write(title, len(rows), 0, body.get('values', []))
+            return {'updates': {'updatedRows': len(body.get('values', []))}}
+        return FakeRequest(self._recorder, 'sheets.values.append', body, handler)
+
+    def batchUpdate(self, spreadsheetId, body, **kwargs):
+        def handler():
+            total = sum(self._spreadsheet.write_range(d['range'], d['values']) for d in body.get('data', []))
+            return {'totalUpdatedCells': total}
+        return FakeRequest(self._recorder, 'sheets.values.batchUpdate', body, handler)
+
+    def clear(self, spreadsheetId, range, **kwargs):
+        return FakeRequest(self._recorder, 'sheets.values.clear', {'range': range},
+                           lambda: self._spreadsheet.clear_range(range) or {})
+
+class FakeSpreadsheets:
+    def __init__(self, spreadsheet, recorder):
+        self._spreadsheet = spreadsheet
+        self._recorder = recorder
+
+    def values(self):
+        return FakeValues(self._spreadsheet, self._recorder)
+
+    def get(self, spreadsheetId, ranges=None, **kwargs):
+        def handler():
+            sheets = []
+            for title, sheet_id in self._spreadsheet.sheet_ids.items():
+                rows = self._spreadsheet.tabs[title]
+                entry = {'properties': {
+                    'sheetId': sheet_id,
+                    'title': title,
+                    'gridProperties': {'rowCount': max(len(rows), 1000), 'columnCount': 26}
+                }}
+                for a1 in ranges or []:
+                    if parse_range(a1, 'posts')[0] == title:
+                        entry['data'] = [{'rowData': [
+                            {'values': [{'formattedValue': str(v)} for v in row]} for row in self._spreadsheet.read(a1)
+                        ]}]
+                sheets.append(entry)
+            return {'sheets': sheets}
+        return FakeRequest(self._recorder, 'sheets.get', {'ranges': ranges}, handler)
+
+    def batchUpdate(self, spreadsheetId, body, **kwargs):
+        def handler():
+            return {'replies': [self._spreadsheet.apply(r) for r in body.get('requests', [])]}
+        return FakeRequest(self._recorder, 'sheets.batchUpdate', body, handler)
+
+class FakeSheetsService:
+    """Stands in for build('sheets', 'v4', ...)"""
+
+    def __init__(self, spreadsheet=None, recorder=None):
+        self.spreadsheet = spreadsheet or FakeSpreadsheet()
+        self.recorder = recorder or CallRecorder()
+
+    def spreadsheets(self):
+        return FakeSpreadsheets(self.spreadsheet, self.recorder)
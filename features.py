@@ -0,0 +1,197 @@
+"""
+Derived tweet columns (time period, type, links, media, hashtags, mentions).
+
+TweetFeatureExtractor is configured once (username, timezone) and turns each
+tweet into a sheet row with a single regex pass over the text, a cached UTC
+offset lookup instead of a timezone conversion, and one look at the attachments.
+
+Media types come from the attachments.media_keys expansion: each page's
+includes.media is indexed by media_key once (index_media) and every tweet's
+keys are looked up in that dict.
+"""
+import re
+from datetime import datetime
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# One pass finds hashtags, mentions and the start of any link. Only the link
+# prefix (plus one non-space character) is consumed, so hashtags and mentions
+# further along a URL are still counted, as they were with separate scans.
+TOKEN_PATTERN = re.compile(r'https?://\S|www\.\S|[#@]\w+')
+
+def get_time_period(hour):
+    """Categorize hour into time period"""
+    if 5 <= hour < 12:
+        return "Morning"
+    elif 12 <= hour < 17:
+        return "Afternoon"
+    elif 17 <= hour < 21:
+        return "Evening"
+    else:
+        return "Night"
+
+VIDEO_TYPES = ('video', 'animated_gif')
+
+# Precomputed so the per-tweet path is a list index
+TIME_PERIODS = [get_time_period(hour) for hour in range(24)]
+
+def get_tweet_type(tweet):
+    """Determine tweet type based on content"""
+    text = tweet.text if hasattr(tweet, 'text') else ''
+    if text.startswith('RT @'):
+        return "Retweet"
+    elif hasattr(tweet, 'referenced_tweets'):
+        ref_tweets = tweet.referenced_tweets or []
+        for ref in ref_tweets:
+            if ref.type == 'replied_to':
+                return "Reply"
+            elif ref.type == 'quoted':
+                return "Quote"
+    return "Regular"
+
+def build_metric_cells(metrics):
+    """Build the metric cells (columns F:M) from a tweet's public_metrics"""
+    metrics = metrics or {}
+
+    # Calculate metrics
+    likes = metrics.get('like_count', 0)
+    retweets = metrics.get('retweet_count', 0)
+    bookmarks = metrics.get('bookmark_count', 0)
+    replies = metrics.get('reply_count', 0)
+    quotes = metrics.get('quote_count', 0)
+    impressions = metrics.get('impression_count', 0)
+    total_engagements = likes + retweets + bookmarks + replies + quotes
+
+    # Calculate engagement rate
+    engagement_rate = 0
+    if impressions > 0:
+        engagement_rate = round((total_engagements / impressions) * 100, 2)
+
+    return [
+        total_engagements,
+        likes,
+        retweets,
+        bookmarks,
+        replies,
+        quotes,
+        impressions,
+        f"{engagement_rate}%"
+    ]
+
+def index_media(media):
+    """Map media_key -> type for a page's includes.media"""
+    return {item.media_key: item.type for item in media or []}
+
+def media_counts(media_keys, media_types):
+    """Return (image_count, has_video) for a tweet's media keys.
+
+    has_video is "TRUE"/"FALSE", or "POSSIBLE" when a key's type isn't known
+    (rows built without the media expansion). Unknown keys count as images.
+    """
+    images = 0
+    video = False
+    unknown = False
+
+    for key in media_keys:
+        media_type = media_types.get(key)
+        if media_type == 'photo':
+            images += 1
+        elif media_type in VIDEO_TYPES:
+            video = True
+        elif media_type is None:
+            images += 1
+            unknown = True
+
+    if video:
+        return images, "TRUE"
+    return images, "POSSIBLE" if unknown else "FALSE"
+
+class TweetFeatureExtractor:
+    """Turns tweets into sheet rows (columns A:V)"""
+
+    def __init__(self, username='', timezone='US/Eastern'):
+        # Imported here so the modules that only need the constants start without it
+        import pytz
+
+        self.own_mention = f"@{username.lower()}"
+        self.timezone = pytz.timezone(timezone) if isinstance(timezone, str) else timezone
+        self._utc = pytz.UTC
+        # UTC offset per UTC hour; DST transitions fall on the hour, so every
+        # tweet in the same UTC hour shares an offset
+        self._offsets = {}
+
+    def to_local(self, created_at):
+        """Convert a UTC creation time to the configured timezone"""
+        utc_time = created_at.replace(tzinfo=None)
+        hour = utc_time.toordinal() * 24 + utc_time.hour
+
+        offset = self._offsets.get(hour)
+        if offset is None:
+            offset = self._utc.localize(utc_time).astimezone(self.timezone).utcoffset()
+            self._offsets[hour] = offset
+
+        # Naive local wall-clock time
+        return utc_time + offset
+
+    def scan_text(self, text):
+        """Return (hashtag_count, mention_count, has_link) from one pass over text"""
+        hashtags = 0
+        mentions = 0
+        link = False
+
+        for token in TOKEN_PATTERN.findall(text):
+            first = token[0]
+            if first == '#':
+                hashtags += 1
+            elif first == '@':
+                # Don't count the user's own handle
+                if token.lower() != self.own_mention:
+                    mentions += 1
+            else:
+                link = True
+
+        return hashtags, mentions, link
+
+    def transform(self, tweet, sync_time, media_types=None):
+        """Build one sheet row, looking up attachment types in media_types (media_key -> type)"""
+        metrics = tweet.public_metrics if hasattr(tweet, 'public_metrics') else {}
+
+        # Twitter returns times in UTC, convert to Eastern
+        created_at = tweet.created_at if tweet.created_at else datetime.now()
+        local_time = self.to_local(created_at)
+
+        tweet_text = tweet.text if hasattr(tweet, 'text') else ''
+        hashtag_count, mention_count, link = self.scan_text(tweet_text)
+
+        attachments = tweet.attachments if hasattr(tweet, 'attachments') else None
+        media_keys = attachments.get('media_keys') if attachments else None
+        if media_keys:
+            image_count, video = media_counts(media_keys, media_types or {})
+        else:
+            image_count, video = 0, "FALSE"
+
+        return [
+            f'{local_time.year:04d}-{local_time.month:02d}-{local_time.day:02d}',
+            f'{local_time.hour:02d}:{local_time.minute:02d}:{local_time.second:02d} ET',
+            TIME_PERIODS[local_time.hour],
+            DAY_NAMES[local_time.weekday()],
+            tweet_text[:500],
+            *build_metric_cells(metrics),
+            get_tweet_type(tweet),
+            "TRUE" if link else "FALSE",
+            "TRUE" if image_count > 0 else "FALSE",
+            image_count,
+            video,
+            hashtag_count,
+            mention_count,
+            str(tweet.id),
+            sync_time
+        ]
+
+    def transform_batch(self, tweets, sync_time=None, media_types=None):
+        """Build sheet rows for a batch of tweets sharing one sync time"""
+        if sync_time is None:
+            sync_time = datetime.now(self.timezone).strftime('%Y-%m-%d %H:%M:%S ET')
+
+        transform = self.transform
+        return [transform(tweet, sync_time, media_types) for tweet in tweets]
@@ -1,70 +1,29 @@
 #!/usr/bin/env python3
-import os
 from dotenv import load_dotenv
-from app import get_sheets_service, SPREADSHEET_ID
 
 load_dotenv()
 
+from clients import get_account, get_sheets_service, get_sheet_metadata
+from sheet_plan import bold_rows_request
+
 def fix_formatting():
     try:
+        account = get_account()
         service = get_sheets_service()
         sheet = service.spreadsheets()
+        sheet_id = get_sheet_metadata(sheet, account)['sheet_id']
 
-        # Get the current sheet to find how many rows exist
-        result = sheet.values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range='Sheet1!A:A'
-        ).execute()
-
-        values = result.get('values', [])
-        total_rows = len(values)
-
-        print(f"Found {total_rows} rows in the spreadsheet")
-
-        # Format request: Bold header row, normal text for all other rows
+        # Format request: Bold header row, normal text for all other rows.
+        # The data range is open-ended, so there's no need to count rows first.
         formatting_request = {
             "requests": [
-                # First, make header row bold
-                {
-                    "repeatCell": {
-                        "range": {
-                            "sheetId": 0,
-                            "startRowIndex": 0,
-                            "endRowIndex": 1
-                        },
-                        "cell": {
-                            "userEnteredFormat": {
-                                "textFormat": {
-                                    "bold": True
-                                }
-                            }
-                        },
-                        "fields": "userEnteredFormat.textFormat.bold"
-                    }
-                },
-                # Then, make all other rows not bold
-                {
-                    "repeatCell": {
-                        "range": {
-                            "sheetId": 0,
-                            "startRowIndex": 1,
-                            "endRowIndex": total_rows if total_rows > 1 else 2
-                        },
-                        "cell": {
-                            "userEnteredFormat": {
-                                "textFormat": {
-                                    "bold": False
-                                }
-                            }
-                        },
-                        "fields": "userEnteredFormat.textFormat.bold"
-                    }
-                }
+                bold_rows_request(sheet_id, 0, 1, bold=True),
+                bold_rows_request(sheet_id, 1, bold=False)
             ]
         }
 
         sheet.batchUpdate(
-            spreadsheetId=SPREADSHEET_ID,
+            spreadsheetId=account.spreadsheet_id,
             body=formatting_request
         ).execute()
 
@@ -75,4 +34,4 @@ def fix_formatting():
         return False
 
 if __name__ == "__main__":
-    fix_formatting()
\ No newline at end of file
+    fix_formatting()
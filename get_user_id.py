@@ -1,20 +1,25 @@
 #!/usr/bin/env python3
+"""
+Print the user ID for TWITTER_USERNAME (or a username given as an argument).
+
+The ID comes from the metadata cache shared with the app, so only the first
+lookup of a username spends a get_user call.
+"""
 import os
+import sys
 from dotenv import load_dotenv
-import tweepy
 
 load_dotenv()
 
-def get_user_id():
-    bearer_token = os.environ.get('TWITTER_BEARER_TOKEN')
-    username = os.environ.get('TWITTER_USERNAME')
+from clients import lookup_user_id
 
-    client = tweepy.Client(bearer_token=bearer_token)
-    user = client.get_user(username=username)
+def get_user_id(username=None):
+    username = username or os.environ.get('TWITTER_USERNAME')
+    user_id = lookup_user_id(username)
 
     print(f"Username: {username}")
-    print(f"User ID: {user.data.id}")
-    return user.data.id
+    print(f"User ID: {user_id}")
+    return user_id
 
 if __name__ == "__main__":
-    get_user_id()
\ No newline at end of file
+    get_user_id(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,26 @@
+"""
+Gunicorn settings for production:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Requests are spread over WEB_CONCURRENCY worker processes of WEB_THREADS
+threads each. Every worker joins the leader election after it starts; the
+one that wins runs the scheduler and all syncs, and the rest forward job
+requests to it (see leader.py).
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+# Only the leader syncs and each worker holds its own stores and caches, so a few workers are plenty
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 4))
+# Long jobs run on background threads, so a request never gets near this
+timeout = 60
+# Each worker starts its own threads, which wouldn't survive a fork from a preloaded master
+preload_app = False
+accesslog = '-'
+
+def post_worker_init(worker):
+    import app
+    app.start_background()
@@ -0,0 +1,154 @@
+"""
+Background job queue with single-flight coalescing.
+
+Jobs run one at a time on a worker thread, so syncs, refreshes and
+maintenance never overlap and never block an HTTP worker. Submitting a kind
+of job that is already queued or running returns the job in flight instead
+of starting another one.
+"""
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+MAX_FINISHED_JOBS = 100  # Finished jobs kept for status lookups
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+_current = threading.local()
+
+def report_progress(**progress):
+    """Update the progress of the job running on this thread (no-op outside a job)"""
+    job = getattr(_current, 'job', None)
+    if job is not None:
+        job.progress.update(progress)
+
+class JobFailed(Exception):
+    """A job run through JobQueue.run() raised"""
+
+    def __init__(self, job):
+        self.job = job
+        self.retry_after = job.retry_after
+        super().__init__(job.error)
+
+class Job:
+    def __init__(self, kind, func):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.func = func
+        self.status = QUEUED
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.retry_after = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in (SUCCEEDED, FAILED)
+
+    def wait(self, timeout=None):
+        """Block until the job finishes. Returns True if it did."""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'result': self.result,
+            'error': self.error,
+            'retry_after': self.retry_after,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+class JobQueue:
+    """Runs submitted jobs in order on a single background thread"""
+
+    def __init__(self, max_finished=MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._in_flight = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, kind, func):
+        """Queue func as a job of the given kind.
+
+        Returns (job, coalesced): if a job of this kind is already queued or
+        running, that job is returned with coalesced=True.
+        """
+        with self._lock:
+            existing = self._in_flight.get(kind)
+            if existing is not None:
+                return existing, True
+
+            job = Job(kind, func)
+            self._jobs[job.id] = job
+            self._in_flight[kind] = job
+            self._queue.put(job)
+            self._ensure_worker()
+            return job, False
+
+    def run(self, kind, func):
+        """Submit (or join) a job and wait for it, raising JobFailed if it fails"""
+        job, _ = self.submit(kind, func)
+        job.wait()
+        if job.status == FAILED:
+            raise JobFailed(job)
+        return job.result
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def in_flight(self):
+        with self._lock:
+            return list(self._in_flight.values())
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, name='job-queue', daemon=True)
+            self._worker.start()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            self._run(job)
+
+    def _run(self, job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        _current.job = job
+        try:
+            job.result = job.func()
+            job.status = SUCCEEDED
+        except Exception as e:
+            job.error = str(e)
+            job.retry_after = getattr(e, 'retry_after', None)
+            job.status = FAILED
+            print(f"Job {job.kind} {job.id} failed: {e}")
+        finally:
+            _current.job = None
+            job.finished_at = time.time()
+            with self._lock:
+                if self._in_flight.get(job.kind) is job:
+                    del self._in_flight[job.kind]
+                self._prune()
+            job._done.set()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,121 @@
+"""
+Write-ahead journal for sheet mutations.
+
+Every write to a sheet is appended to a local journal (one JSON object per
+line, fsynced) before it is sent, and a commit mark is appended once the API
+has accepted it. Entries planned but never committed are pending: a crash or
+a failed request leaves them in the journal, and they are sent again, in
+order, before the account's next write or on startup. The local store is
+updated before the sheet, so a failed sheet write is repaired by replaying
+one entry rather than re-fetching from Twitter.
+
+An entry can carry a guard: a cell and the value it holds once the entry has
+been applied. Before a retry or a replay the cell is read first, and if it
+already holds the value (the request succeeded but its response or commit
+mark was lost) the entry is only marked committed. An entry without a guard
+is only sent again if it is idempotent, i.e. it overwrites fixed cells and
+applying it twice changes nothing.
+"""
+import json
+import os
+import threading
+import time
+
+MAX_JOURNAL_BYTES = 1024 * 1024  # Truncated once this large with nothing pending
+
+PLAN = 'plan'
+COMMIT = 'commit'
+ABANDON = 'abandon'
+
+class SheetJournal:
+    """Append-only journal of planned sheet writes for one account"""
+
+    def __init__(self, path, max_bytes=MAX_JOURNAL_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        # Held by callers across replay and the next write so entries go out in order
+        self.lock = threading.RLock()
+        self._pending = {}
+        self._next_seq = 1
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-append; the entry was never sent
+                continue
+            seq = record.get('seq', 0)
+            self._next_seq = max(self._next_seq, seq + 1)
+            if record.get('op') == PLAN:
+                self._pending[seq] = record
+            else:
+                self._pending.pop(seq, None)
+
+    def _append(self, record):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def plan(self, kind, params, guard=None, idempotent=False):
+        """Record a write before sending it. Returns the entry.
+
+        kind is the API method ('batchUpdate', 'values.batchUpdate',
+        'values.append') and params its keyword arguments. guard is an optional
+        (a1_cell, value) pair that holds once the write has been applied.
+        idempotent marks a write that is safe to send twice.
+        """
+        with self.lock:
+            entry = {
+                'op': PLAN,
+                'seq': self._next_seq,
+                'kind': kind,
+                'params': params,
+                'guard': list(guard) if guard else None,
+                'idempotent': idempotent,
+                'planned_at': time.time()
+            }
+            self._append(entry)
+            self._pending[entry['seq']] = entry
+            self._next_seq += 1
+            return entry
+
+    def commit(self, entry):
+        with self.lock:
+            self._append({'op': COMMIT, 'seq': entry['seq']})
+            self._pending.pop(entry['seq'], None)
+            self._compact()
+
+    def abandon(self, entry, reason):
+        """Give up on an entry that can never succeed (e.g. the API rejected it)"""
+        with self.lock:
+            self._append({'op': ABANDON, 'seq': entry['seq'], 'reason': str(reason)})
+            self._pending.pop(entry['seq'], None)
+            self._compact()
+
+    def pending(self):
+        """Uncommitted entries, oldest first"""
+        with self.lock:
+            return [self._pending[seq] for seq in sorted(self._pending)]
+
+    def _compact(self):
+        if self._pending:
+            return
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except FileNotFoundError:
+            return
+        # Nothing pending, so the history can go; sequence numbers carry on
+        os.remove(self.path)
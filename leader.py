@@ -0,0 +1,75 @@
+"""
+Leader election between worker processes on one machine.
+
+Under gunicorn every worker imports the app, but only one may run the
+scheduler and the job queue, or each would sync on its own. The workers
+compete for an exclusive flock on a file in DATA_DIR, and the winner holds
+it for its lifetime. The leader publishes the address of its internal
+server in the file, so the others can forward requests there. The OS
+releases the lock when the leader exits, and another worker takes over.
+"""
+import fcntl
+import json
+import os
+
+class LeaderLock:
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    @property
+    def is_leader(self):
+        return self._file is not None
+
+    def try_acquire(self):
+        """Take the lock if no other process holds it. Returns True once this process leads."""
+        if self._file is not None:
+            return True
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        f = open(self.path, 'a+')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    def publish(self, info):
+        """Replace the file's contents with info (a dict) for the other workers to read"""
+        if self._file is None:
+            raise RuntimeError("Only the leader can publish")
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(json.dumps(info))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def current_leader(self):
+        """The info the current leader published, or None if nobody holds the lock (or it hasn't published yet)"""
+        try:
+            f = open(self.path)
+        except FileNotFoundError:
+            return None
+        with f:
+            try:
+                # Taking even a shared lock means the leader has gone and left stale info behind
+                fcntl.flock(f, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except OSError:
+                pass
+            else:
+                fcntl.flock(f, fcntl.LOCK_UN)
+                return None
+            try:
+                return json.loads(f.read())
+            except ValueError:
+                return None
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
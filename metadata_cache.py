@@ -0,0 +1,129 @@
+"""
+On-disk cache for Twitter metadata that rarely changes.
+
+Username -> user ID lookups and the referenced tweets that come back in a
+timeline's includes are kept in one SQLite file under DATA_DIR, shared by
+the web app and the utility scripts, so a repeat lookup never spends API
+quota. Entries are grouped by namespace and expire after a per-entry TTL.
+Once the cache holds more than max_entries, expired entries go first, then
+the least recently used ones.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed_at ON entries (accessed_at);
+"""
+
+class MetadataCache:
+    """Thread-safe TTL + LRU cache of JSON values, keyed by (namespace, key)"""
+
+    def __init__(self, path, max_entries=50000, default_ttl=30 * 24 * 3600):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        # Other processes (gunicorn workers, scripts) write the same file
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, namespace, key, now=None):
+        """The cached value, or None if it's missing or expired"""
+        return self.get_many(namespace, [key], now=now).get(str(key))
+
+    def get_many(self, namespace, keys, now=None):
+        """{key: value} for the keys that are cached and fresh; the rest are left out"""
+        keys = list(dict.fromkeys(str(key) for key in keys))
+        now = time.time() if now is None else now
+        found = {}
+        with self._lock, self._conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                found.update(self._conn.execute(
+                    f'SELECT key, value FROM entries WHERE namespace = ? AND key IN ({placeholders}) '
+                    'AND expires_at > ?',
+                    [namespace] + chunk + [now]
+                ).fetchall())
+                hits = [key for key in chunk if key in found]
+                if hits:
+                    self._conn.execute(
+                        f"UPDATE entries SET accessed_at = ? WHERE namespace = ? "
+                        f"AND key IN ({', '.join('?' * len(hits))})",
+                        [now, namespace] + hits
+                    )
+
+        if found:
+            metrics.METADATA_CACHE_LOOKUPS.inc(len(found), namespace=namespace, outcome='hit')
+        if len(keys) > len(found):
+            metrics.METADATA_CACHE_LOOKUPS.inc(len(keys) - len(found), namespace=namespace, outcome='miss')
+        return {key: json.loads(value) for key, value in found.items()}
+
+    def put(self, namespace, key, value, ttl=None, now=None):
+        self.put_many(namespace, {key: value}, ttl=ttl, now=now)
+
+    def put_many(self, namespace, values, ttl=None, now=None):
+        """Cache {key: value} (JSON-serializable) for ttl seconds. Returns the number written."""
+        if not values:
+            return 0
+        now = time.time() if now is None else now
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        records = [(namespace, str(key), json.dumps(value), expires_at, now) for key, value in values.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO entries (namespace, key, value, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                records
+            )
+            self._evict(now)
+        return len(records)
+
+    def delete(self, namespace, key):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM entries WHERE namespace = ? AND key = ?', (namespace, str(key)))
+
+    def _evict(self, now):
+        """Drop expired entries, then the least recently used, down to max_entries (caller holds the lock)"""
+        count = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        if count <= self.max_entries:
+            return
+        count -= self._conn.execute('DELETE FROM entries WHERE expires_at <= ?', (now,)).rowcount
+        if count > self.max_entries:
+            self._conn.execute(
+                'DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries ORDER BY accessed_at LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
+    def stats(self, now=None):
+        """{namespace: {'entries': n, 'expired': n}}"""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT namespace, COUNT(*), SUM(expires_at <= ?) FROM entries GROUP BY namespace', (now,)
+            ).fetchall()
+        return {namespace: {'entries': count, 'expired': expired or 0} for namespace, count, expired in rows}
@@ -0,0 +1,221 @@
+"""
+Process-wide counters, gauges and latency histograms for the sync pipeline.
+
+Everything is kept in memory and rendered in the Prometheus text format for
+/metrics. Stages are timed with stage(), which can also append one JSON line
+per stage to a trace log (see set_trace_log) to follow a single sync through
+production.
+"""
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+_trace_path = None
+_trace_lock = threading.Lock()
+
+def format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + list(extra or [])
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def series(self):
+        """{label values tuple: value} for every series"""
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self):
+        """(suffix, label values, extra labels, value) for every series"""
+        with self._lock:
+            return [('', key, None, value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} {self.kind}']
+        for suffix, key, extra, value in self.samples():
+            lines.append(f'{self.name}{suffix}{format_labels(self.labelnames, key, extra)} {format_value(value)}')
+        return lines
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, description, labelnames=(), function=None):
+        super().__init__(name, description, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function):
+        """Compute the series at render time: function() -> {label values tuple: value}"""
+        self.function = function
+
+    def samples(self):
+        if self.function is None:
+            return super().samples()
+        return [('', tuple(str(v) for v in key), None, value) for key, value in sorted(self.function().items())]
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket counts (not cumulative), then sum and count
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        samples = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                samples.append(('_bucket', key, [('le', format_value(float(bound)))], cumulative))
+            samples.append(('_bucket', key, [('le', '+Inf')], series[-1]))
+            samples.append(('_sum', key, None, series[-2]))
+            samples.append(('_count', key, None, series[-1]))
+        return samples
+
+def render():
+    """Every registered metric in the Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+def set_trace_log(path):
+    """Append a JSON line per timed stage to path (None turns tracing off)"""
+    global _trace_path
+    _trace_path = path
+
+def trace(event):
+    if _trace_path is None:
+        return
+    line = json.dumps(dict(event, ts=round(time.time(), 3), thread=threading.current_thread().name))
+    with _trace_lock:
+        with open(_trace_path, 'a') as f:
+            f.write(line + '\n')
+
+STAGE_SECONDS = Histogram(
+    'tweet_sync_stage_seconds', 'Time spent in each pipeline stage', ['stage', 'outcome'])
+API_REQUESTS = Counter(
+    'tweet_sync_api_requests_total', 'Twitter and Sheets API requests by operation and HTTP status',
+    ['api', 'operation', 'status'])
+API_SECONDS = Histogram(
+    'tweet_sync_api_request_seconds', 'Twitter and Sheets API request latency', ['api', 'operation'])
+ROWS_WRITTEN = Counter(
+    'tweet_sync_rows_written_total', 'Tweet rows written to the sheet', ['account', 'source'])
+CELLS_UPDATED = Counter(
+    'tweet_sync_cells_updated_total', 'Metric and summary cells rewritten in place', ['account', 'source'])
+SYNCS = Counter(
+    'tweet_sync_syncs_total', 'Account syncs by outcome', ['account', 'outcome'])
+LAST_SYNC = Gauge(
+    'tweet_sync_last_success_timestamp_seconds', 'Unix time of the last successful sync', ['account'])
+LAST_SYNC_AGE = Gauge(
+    'tweet_sync_last_success_age_seconds', 'Seconds since the last successful sync', ['account'],
+    function=lambda: {key: round(time.time() - value, 3) for key, value in LAST_SYNC.series().items()})
+SCHEDULED_RUNS = Counter(
+    'tweet_sync_scheduled_runs_total', 'Scheduled job runs by outcome', ['job', 'outcome'])
+SCHEDULED_SECONDS = Histogram(
+    'tweet_sync_scheduled_run_seconds', 'Scheduled job run time', ['job'])
+PENDING_WRITES = Gauge(
+    'tweet_sync_pending_sheet_writes', 'Journaled sheet writes not yet committed', ['account'])
+METADATA_CACHE_LOOKUPS = Counter(
+    'tweet_sync_metadata_cache_lookups_total', 'Metadata cache lookups by namespace and outcome',
+    ['namespace', 'outcome'])
+
+@contextmanager
+def stage(name, **details):
+    """Time a pipeline stage into STAGE_SECONDS (and the trace log, with details)"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(seconds, stage=name, outcome=outcome)
+        trace(dict(details, stage=name, outcome=outcome, seconds=round(seconds, 6)))
+
+def timed(name):
+    """Decorator form of stage() for a whole function (traced with its account= argument, if any)"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            account = getattr(kwargs.get('account'), 'name', None)
+            with stage(name, **({'account': account} if account else {})):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@contextmanager
+def api_call(api, operation):
+    """Time one API request; the block sets call['status'] (an HTTP code) when it has one"""
+    call = {'status': 'error'}
+    started = time.perf_counter()
+    try:
+        yield call
+    finally:
+        API_SECONDS.observe(time.perf_counter() - started, api=api, operation=operation)
+        API_REQUESTS.inc(api=api, operation=operation, status=call['status'])
@@ -0,0 +1,106 @@
+"""
+Append-ordered sheet layout with partition tabs.
+
+The default layout keeps the newest tweets on top by inserting each sync's
+rows at row 2, so Sheets shifts every existing row and writes slow down as
+the sheet grows. With the 'append' layout rows are only ever appended below
+the data, so a write costs the same at any size:
+
+- Raw rows go to data tabs. With partition 'year' there is one tab per year
+  of the tweet's date ('posts 2024', 'posts 2025', ...), created on first
+  use; otherwise a single '<sheet> data' tab.
+- The account's own tab becomes a view: a QUERY formula over the data tabs
+  showing the newest VIEW_ROWS rows, newest first.
+- partition_spreadsheets maps a year to another spreadsheet, so old years
+  can move out before a spreadsheet reaches the 10M-cell limit. The view
+  only reads tabs in the account's own spreadsheet.
+
+PartitionRouter decides which tab (and spreadsheet) each row goes to.
+"""
+NEWEST_FIRST = 'newest_first'
+APPEND = 'append'
+LAYOUTS = (NEWEST_FIRST, APPEND)
+
+YEAR = 'year'
+PARTITION_SCHEMES = (YEAR,)
+
+VIEW_ROWS = 10000  # Rows shown in the view tab; older rows stay in the data tabs
+DATE_COLUMN = 0  # Column A, 'YYYY-MM-DD' in Eastern time
+TWEET_ID_COLUMN = 20  # Column U
+
+class Partition:
+    """One data tab: key is the year ('' when unpartitioned)"""
+
+    def __init__(self, key, spreadsheet_id, sheet):
+        self.key = key
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet = sheet
+
+    def __repr__(self):
+        return f"Partition({self.key!r}, sheet={self.sheet!r})"
+
+class PartitionRouter:
+    def __init__(self, account):
+        self.account = account
+
+    def key_for(self, row):
+        """The partition key of a sheet row"""
+        if self.account.partition == YEAR:
+            return str(row[DATE_COLUMN])[:4]
+        return ''
+
+    def partition(self, key):
+        if key:
+            sheet = f'{self.account.sheet} {key}'
+        else:
+            sheet = f'{self.account.sheet} data'
+        spreadsheet_id = self.account.partition_spreadsheets.get(key, self.account.spreadsheet_id)
+        return Partition(key, spreadsheet_id, sheet)
+
+    def route(self, rows):
+        """Split rows by partition: [(Partition, rows)], oldest partition first, rows in their original order"""
+        groups = {}
+        for row in rows:
+            groups.setdefault(self.key_for(row), []).append(row)
+        return [(self.partition(key), groups[key]) for key in sorted(groups)]
+
+    def key_for_title(self, title):
+        """The partition key of a data tab title, or None if the tab isn't one"""
+        if self.account.partition == YEAR:
+            prefix = f'{self.account.sheet} '
+            key = title[len(prefix):]
+            return key if title.startswith(prefix) and len(key) == 4 and key.isdigit() else None
+        return '' if title == f'{self.account.sheet} data' else None
+
+    def spreadsheet_ids(self):
+        """Every spreadsheet that may hold this account's data tabs, its own first"""
+        ids = [self.account.spreadsheet_id]
+        for spreadsheet_id in self.account.partition_spreadsheets.values():
+            if spreadsheet_id not in ids:
+                ids.append(spreadsheet_id)
+        return ids
+
+    def existing(self, titles_by_spreadsheet):
+        """The partitions among {spreadsheet_id: [tab titles]}, newest first"""
+        found = {}
+        for spreadsheet_id, titles in titles_by_spreadsheet.items():
+            for title in titles:
+                key = self.key_for_title(title)
+                if key is None:
+                    continue
+                partition = self.partition(key)
+                if partition.spreadsheet_id == spreadsheet_id:
+                    found[key] = partition
+        return [found[key] for key in sorted(found, reverse=True)]
+
+def view_formula(account, partitions, rows=VIEW_ROWS):
+    """QUERY formula for the view tab: the newest rows of the account's local data tabs, newest first.
+
+    Returns None if none of the partitions are in the account's spreadsheet.
+    """
+    ranges = [account.a1('A2:V', sheet=p.sheet) for p in partitions if p.spreadsheet_id == account.spreadsheet_id]
+    if not ranges:
+        return None
+    # Dates and ET times are zero-padded text, so they sort chronologically
+    query = f'select * where Col{TWEET_ID_COLUMN + 1} is not null order by Col1 desc, Col2 desc limit {rows}'
+    return f'=QUERY({{{"; ".join(ranges)}}}, "{query}", 0)'
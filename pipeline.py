@@ -0,0 +1,59 @@
+"""
+Run a generator ahead of its consumer on a background thread.
+
+prefetch() lets a producer (fetching timeline pages) work on the next item
+while the consumer (building rows and writing them) handles the current one.
+The queue between them is bounded, so a slow consumer blocks the producer
+instead of letting pages pile up, and memory holds at most depth items plus
+the one being consumed however many flow through.
+"""
+import queue
+import threading
+
+_DONE = object()
+
+def prefetch(iterable, depth=1, name='prefetch'):
+    """Yield the items of iterable, produced on a background thread up to depth items ahead.
+
+    The iterable runs entirely on that thread, so thread-local settings it
+    needs must be set up inside it. An exception in the producer is raised
+    in the consumer. Stopping early (break, or an exception in the consumer)
+    stops the producer before its next item.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except BaseException as e:
+            put((_DONE, e))
+        finally:
+            # Run the generator's cleanup on its own thread
+            close = getattr(iterable, 'close', None)
+            if close:
+                close()
+
+    threading.Thread(target=produce, name=name, daemon=True).start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
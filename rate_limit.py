@@ -0,0 +1,173 @@
+"""
+Shared Twitter API rate-limit budget.
+
+Every response's x-rate-limit-* headers update a per-endpoint budget. Before
+each call the budget is checked: if it's spent, the caller sleeps until the
+window resets, or gets RateLimitExceeded when the reset is further away than
+it's willing to wait. The budget is saved to disk so a restarted process (or
+check_rate_limit.py) knows where each window stands without spending a call.
+
+Google Sheets doesn't report its quota in headers, so Sheets requests share a
+QuotaBucket per kind (reads, writes) sized to the per-minute quota instead.
+"""
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_MAX_WAIT = 60  # Seconds a call may block waiting for its window to reset
+RESET_MARGIN = 1  # Extra seconds after the reset time before calling again
+
+# Numeric path segments are IDs (the single-digit API version is left alone)
+ID_SEGMENT = re.compile(r'/\d{2,}(?=/|$)')
+
+def endpoint_key(method, route):
+    """Normalize a request to its rate-limited endpoint, e.g. 'GET /2/users/:id/tweets'"""
+    return f"{method.upper()} {ID_SEGMENT.sub('/:id', route)}"
+
+class RateLimitExceeded(Exception):
+    """The endpoint's budget is spent and its window resets later than we can wait"""
+
+    def __init__(self, endpoint, reset_at):
+        self.endpoint = endpoint
+        self.reset_at = reset_at
+        self.retry_after = max(0, int(reset_at - time.time()))
+        super().__init__(f"Rate limit exhausted for {endpoint}; resets in {self.retry_after}s")
+
+class RateLimitTracker:
+    """Thread-safe per-endpoint budget built from response headers"""
+
+    def __init__(self, path=None, max_wait=DEFAULT_MAX_WAIT):
+        self.path = path
+        self.max_wait = max_wait
+        self._budgets = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._load()
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path) as f:
+                self._budgets = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._budgets = {}
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._budgets, f)
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def waiting(self, max_wait):
+        """Let calls on this thread wait up to max_wait seconds for a reset (e.g. backfills)"""
+        previous = getattr(self._local, 'max_wait', None)
+        self._local.max_wait = max_wait
+        try:
+            yield
+        finally:
+            self._local.max_wait = previous
+
+    def update(self, endpoint, headers):
+        """Record the budget reported by a response's headers"""
+        try:
+            remaining = int(headers['x-rate-limit-remaining'])
+            reset_at = int(headers['x-rate-limit-reset'])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        limit = headers.get('x-rate-limit-limit')
+        with self._lock:
+            self._budgets[endpoint] = {
+                'limit': int(limit) if limit else None,
+                'remaining': remaining,
+                'reset_at': reset_at
+            }
+            self._save()
+
+    def exhaust(self, endpoint, reset_at):
+        """Mark an endpoint as spent until reset_at (after a 429)"""
+        with self._lock:
+            budget = self._budgets.setdefault(endpoint, {'limit': None})
+            budget['remaining'] = 0
+            budget['reset_at'] = reset_at
+            self._save()
+
+    def acquire(self, endpoint, max_wait=None):
+        """Reserve one call against the endpoint's budget, sleeping until reset if needed"""
+        if max_wait is None:
+            max_wait = getattr(self._local, 'max_wait', None)
+        if max_wait is None:
+            max_wait = self.max_wait
+
+        while True:
+            with self._lock:
+                budget = self._budgets.get(endpoint)
+                now = time.time()
+
+                # Unknown endpoint or a window that has already reset: go ahead
+                if not budget or budget['reset_at'] <= now:
+                    if budget:
+                        del self._budgets[endpoint]
+                    return
+
+                if budget['remaining'] > 0:
+                    # Reserve the call so concurrent threads don't overspend
+                    budget['remaining'] -= 1
+                    return
+
+                wait = budget['reset_at'] + RESET_MARGIN - now
+                reset_at = budget['reset_at']
+
+            if wait > max_wait:
+                raise RateLimitExceeded(endpoint, reset_at)
+
+            print(f"Rate limit reached for {endpoint}, sleeping {wait:.0f}s until reset")
+            time.sleep(wait)
+
+    def budget(self):
+        """Snapshot of every known endpoint's budget"""
+        now = time.time()
+        with self._lock:
+            return {
+                endpoint: dict(budget, resets_in=max(0, int(budget['reset_at'] - now)))
+                for endpoint, budget in self._budgets.items()
+            }
+
+class QuotaBucket:
+    """Token bucket refilled continuously up to a per-minute quota, shared by every thread"""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one request from the quota, sleeping until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.per_minute, self._tokens + (now - self._updated) * self.per_minute / 60)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * 60 / self.per_minute
+
+            time.sleep(wait)
+
+    def available(self):
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return int(min(self.per_minute, self._tokens + elapsed * self.per_minute / 60))
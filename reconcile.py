@@ -0,0 +1,126 @@
+"""
+Reconcile the sheet against the local store using only the Tweet ID column.
+
+The sheet's IDs are indexed in one pass (ID -> row positions), then compared
+with the store's IDs, which are the authoritative set. The result is a plan
+of row deletions (duplicates, rows without an ID and, optionally, IDs the
+store doesn't know) and insertions (stored tweets missing from the sheet),
+compiled into a single batchUpdate. Reading one column instead of A:V keeps
+the cost proportional to the ID column, not the whole sheet.
+"""
+from bisect import bisect_left
+
+from sheet_plan import delete_rows_request, insert_rows_request, update_cells_request
+
+class ReconcilePlan:
+    def __init__(self, duplicates, blanks, unknown, missing, deletes, inserts):
+        self.duplicates = duplicates  # Extra copies of IDs already in the sheet
+        self.blanks = blanks  # Rows without a tweet ID
+        self.unknown = unknown  # IDs not in the store (only deleted when pruning)
+        self.missing = missing  # Stored IDs absent from the sheet
+        self.deletes = deletes  # [(start_row, end_row)], zero-based sheet rows
+        self.inserts = inserts  # [(before_row, [tweet IDs])], zero-based, in original row numbers
+
+    @property
+    def empty(self):
+        return not self.deletes and not self.inserts
+
+    def summary(self):
+        return {
+            'duplicates': self.duplicates,
+            'blank_rows': self.blanks,
+            'unknown': self.unknown,
+            'missing': len(self.missing),
+            'rows_deleted': sum(end - start for start, end in self.deletes),
+            'rows_inserted': len(self.missing)
+        }
+
+def index_ids(id_rows):
+    """Map tweet ID -> positions (offsets into id_rows) in one pass; blank IDs map under ''"""
+    index = {}
+    for offset, row in enumerate(id_rows):
+        tweet_id = str(row[0]).strip() if row else ''
+        index.setdefault(tweet_id, []).append(offset)
+    return index
+
+def merge_runs(offsets):
+    """Sorted offsets -> [(start, end)] ranges of consecutive offsets"""
+    runs = []
+    for offset in offsets:
+        if runs and runs[-1][1] == offset:
+            runs[-1][1] = offset + 1
+        else:
+            runs.append([offset, offset + 1])
+    return [tuple(run) for run in runs]
+
+def plan_reconcile(id_rows, stored_ids, first_row=1, prune_unknown=False, newest_first=True):
+    """Diff the sheet's ID column against the stored IDs.
+
+    id_rows are the values of the ID column starting at zero-based sheet row
+    first_row (row 2 by default, below the header). The first copy of each
+    ID is kept. Missing tweets are inserted above the first kept row with a
+    smaller ID, which keeps a newest-first sheet in order. newest_first=False
+    (an append layout data tab) adds them at the bottom instead.
+    """
+    index = index_ids(id_rows)
+    stored = set(stored_ids)
+
+    doomed = []
+    duplicates = blanks = unknown = 0
+    for tweet_id, offsets in index.items():
+        if tweet_id == '':
+            doomed.extend(offsets)
+            blanks += len(offsets)
+            continue
+        if tweet_id not in stored:
+            unknown += len(offsets)
+            if prune_unknown:
+                doomed.extend(offsets)
+                continue
+        doomed.extend(offsets[1:])
+        duplicates += len(offsets) - 1
+
+    doomed_set = set(doomed)
+    deletes = [(start + first_row, end + first_row) for start, end in merge_runs(sorted(doomed))]
+
+    # Kept rows in sheet order, keyed by -ID so a newest-first sheet is ascending for bisect
+    kept = sorted((offsets[0], int(tweet_id)) for tweet_id, offsets in index.items()
+                  if tweet_id.isdigit() and offsets[0] not in doomed_set)
+    kept_keys = [-tweet_id for _, tweet_id in kept]
+    ordered = newest_first and kept_keys == sorted(kept_keys)
+
+    missing = sorted((tweet_id for tweet_id in stored if tweet_id not in index), key=int, reverse=True)
+    end_row = first_row + len(id_rows)
+    inserts = {}
+    for tweet_id in missing:
+        if ordered:
+            position = bisect_left(kept_keys, -int(tweet_id))
+            before = kept[position][0] + first_row if position < len(kept) else end_row
+        else:
+            # An unsorted sheet has no right place; add at the bottom for the next resort
+            before = end_row
+        inserts.setdefault(before, []).append(tweet_id)
+
+    return ReconcilePlan(duplicates, blanks, unknown, missing, deletes, sorted(inserts.items()))
+
+def reconcile_requests(sheet_id, plan, rows_by_id):
+    """Compile the plan into batchUpdate requests.
+
+    Operations run bottom-up so each one's row numbers are still those of the
+    original sheet. A deletion runs before an insertion at the same row, so the
+    inserted rows aren't deleted with it. rows_by_id maps each missing ID to
+    its sheet row.
+    """
+    operations = [(start, 1, ('delete', end)) for start, end in plan.deletes] + \
+                 [(before, 0, ('insert', ids)) for before, ids in plan.inserts]
+    operations.sort(key=lambda op: (op[0], op[1]), reverse=True)
+
+    requests = []
+    for row, _, (kind, detail) in operations:
+        if kind == 'delete':
+            requests.append(delete_rows_request(sheet_id, row, detail))
+        else:
+            rows = [rows_by_id[tweet_id] for tweet_id in detail]
+            requests.append(insert_rows_request(sheet_id, row, len(rows)))
+            requests.append(update_cells_request(sheet_id, row, rows, bold=False))
+    return requests
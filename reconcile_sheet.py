@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Find and fix duplicate, blank and missing rows in the sheet.
+
+Only the Tweet ID column is read and compared with the local store, and the
+fix is sent as one batchUpdate. Every configured account is reconciled
+unless --account picks one.
+"""
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import for_each_account, get_account, reconcile_sheet
+
+def print_summary(name, summary):
+    action = 'would delete' if args.dry_run else 'deleted'
+    print(f"\n✓ {name}: {summary['sheet_rows']} rows checked, {action} {summary['rows_deleted']} "
+          f"({summary['duplicates']} duplicates, {summary['blank_rows']} blank), "
+          f"{'would insert' if args.dry_run else 'inserted'} {summary['rows_inserted']} missing")
+    if summary['unknown'] and not args.prune_unknown:
+        print(f"  {summary['unknown']} rows have IDs that aren't in the local store (--prune-unknown deletes them)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dry-run', action='store_true', help='Show what would change without writing')
+    parser.add_argument('--prune-unknown', action='store_true', help="Also delete rows whose tweet isn't in the local store")
+    parser.add_argument('--account', help='Only reconcile this account (by name)')
+    args = parser.parse_args()
+
+    def reconcile(account):
+        return reconcile_sheet(dry_run=args.dry_run, prune_unknown=args.prune_unknown, account=account)
+
+    if args.account:
+        print_summary(args.account, reconcile(get_account(args.account)))
+    else:
+        for name, summary in for_each_account(reconcile).items():
+            if 'error' not in summary:
+                print_summary(name, summary)
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Refresh likes, retweets, impressions etc. for tweets already in the sheet.
+
+Only cells whose values changed are rewritten. Every configured account is
+refreshed unless --account picks one.
+"""
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import get_account, refresh_all_accounts, refresh_metrics
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-rows', type=int, help='Only refresh the newest N rows')
+    parser.add_argument('--account', help='Only refresh this account (by name)')
+    args = parser.parse_args()
+
+    if args.account:
+        updated = refresh_metrics(max_rows=args.max_rows, account=get_account(args.account))
+        print(f"\n✓ Updated {updated} cells")
+    else:
+        for name, updated in refresh_all_accounts(max_rows=args.max_rows).items():
+            print(f"\n✓ {name}: updated {updated} cells")
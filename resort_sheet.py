@@ -1,95 +1,38 @@
 #!/usr/bin/env python3
-import os
 from dotenv import load_dotenv
-from app import get_sheets_service, SPREADSHEET_ID
-from datetime import datetime
 
 load_dotenv()
 
+from clients import get_account, get_sheets_service, get_sheet_metadata
+from partitions import APPEND
+from sheet_plan import bold_rows_request, sort_rows_request
+from tweet_store import COLUMNS
+
 def resort_sheet():
     try:
+        account = get_account()
+        if account.layout == APPEND:
+            # The view tab is a formula over the data tabs and already sorts newest first
+            print(f"Skipping {account.name}: the append layout's view is sorted by its formula")
+            return True
+
         service = get_sheets_service()
         sheet = service.spreadsheets()
+        sheet_id = get_sheet_metadata(sheet, account)['sheet_id']
 
-        # Get all data
-        result = sheet.values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range='Sheet1!A:S'
-        ).execute()
-
-        values = result.get('values', [])
-
-        if len(values) <= 1:
-            print("No data to sort")
-            return
-
-        # Separate header and data
-        header = values[0]
-        data = values[1:]
-
-        print(f"Found {len(data)} data rows to sort")
-
-        # Sort data by date (column 0) and time (column 1) in descending order
-        # Parse the date and time for proper sorting
-        def parse_datetime(row):
-            try:
-                if len(row) >= 2:
-                    date_str = row[0]
-                    time_str = row[1].replace(' ET', '')  # Remove ET suffix
-                    datetime_str = f"{date_str} {time_str}"
-                    return datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S")
-                return datetime.min
-            except:
-                return datetime.min
-
-        data.sort(key=parse_datetime, reverse=True)
-
-        # Clear the sheet
-        sheet.values().clear(
-            spreadsheetId=SPREADSHEET_ID,
-            range='Sheet1!A:S'
-        ).execute()
-
-        # Write back header and sorted data
-        all_values = [header] + data
-
-        body = {
-            'values': all_values
-        }
-
-        sheet.values().update(
-            spreadsheetId=SPREADSHEET_ID,
-            range='Sheet1!A:S',
-            valueInputOption='RAW',
-            body=body
-        ).execute()
-
-        # Format header as bold
-        formatting_request = {
+        # Sort by date (column 0) then time (column 1), newest first. Both are
+        # zero-padded strings, so the server-side text sort matches date order.
+        # Runs entirely in Sheets: nothing is downloaded and the sheet is never empty.
+        sort_request = {
             "requests": [
-                {
-                    "repeatCell": {
-                        "range": {
-                            "sheetId": 0,
-                            "startRowIndex": 0,
-                            "endRowIndex": 1
-                        },
-                        "cell": {
-                            "userEnteredFormat": {
-                                "textFormat": {
-                                    "bold": True
-                                }
-                            }
-                        },
-                        "fields": "userEnteredFormat.textFormat.bold"
-                    }
-                }
+                sort_rows_request(sheet_id, 1, len(COLUMNS), [(0, True), (1, True)]),
+                bold_rows_request(sheet_id, 0, 1)
             ]
         }
 
         sheet.batchUpdate(
-            spreadsheetId=SPREADSHEET_ID,
-            body=formatting_request
+            spreadsheetId=account.spreadsheet_id,
+            body=sort_request
         ).execute()
 
         print("✓ Sheet resorted in descending order (newest tweets first)")
@@ -100,4 +43,4 @@ def resort_sheet():
         return False
 
 if __name__ == "__main__":
-    resort_sheet()
\ No newline at end of file
+    resort_sheet()
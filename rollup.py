@@ -0,0 +1,254 @@
+"""
+Incrementally maintained engagement rollups for the summary tab.
+
+Each group (overall, each time period, each weekday) keeps mergeable state:
+a tweet count, sums and a quantile sketch of the engagement rate. Adding a
+row or taking it back out are both O(1), so a sync applies only its new
+rows, and a metrics refresh takes out each refreshed row's old values and
+adds the new ones. The summary grid is rendered from that state and
+compared with the grid last written, so only cells that changed go back to
+the sheet. The full history is never downloaded.
+"""
+import json
+import math
+import os
+
+from features import DAY_NAMES, TIME_PERIODS
+
+TIME_PERIOD_NAMES = list(dict.fromkeys(TIME_PERIODS))
+
+SUMMARY_HEADERS = ['Group', 'Value', 'Tweets', 'Total Engagements', 'Avg Engagements', 'Total Impressions',
+                   'Avg Engagement Rate', 'Median Engagement Rate', 'P90 Engagement Rate']
+
+# Fixed row layout so every cell keeps its address between syncs
+GROUPS = [('Overall', 'All tweets')] + \
+         [('Time Period', name) for name in TIME_PERIOD_NAMES] + \
+         [('Day of Week', name) for name in DAY_NAMES]
+
+SKETCH_ACCURACY = 0.01  # Quantiles within 1% relative error
+
+# Sheet row columns used (A:V order)
+TIME_PERIOD_INDEX = 2
+DAY_OF_WEEK_INDEX = 3
+TOTAL_ENGAGEMENTS_INDEX = 5
+IMPRESSIONS_INDEX = 11
+
+class QuantileSketch:
+    """Log-bucketed histogram (DDSketch-style) supporting add, remove and merge.
+
+    Each positive value lands in bucket ceil(log_gamma(value)); quantiles are
+    read back within SKETCH_ACCURACY relative error. Zeros are counted apart.
+    """
+
+    def __init__(self, accuracy=SKETCH_ACCURACY, buckets=None, zeros=0):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = buckets or {}
+        self.zeros = zeros
+
+    @property
+    def count(self):
+        return self.zeros + sum(self.buckets.values())
+
+    def add(self, value, weight=1):
+        """Add a value (weight=-1 takes a previously added value back out)"""
+        if value <= 0:
+            self.zeros += weight
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        count = self.buckets.get(index, 0) + weight
+        if count:
+            self.buckets[index] = count
+        else:
+            self.buckets.pop(index, None)
+
+    def merge(self, other):
+        self.zeros += other.zeros
+        for index, count in other.buckets.items():
+            total = self.buckets.get(index, 0) + count
+            if total:
+                self.buckets[index] = total
+            else:
+                self.buckets.pop(index, None)
+
+    def quantile(self, q):
+        count = self.count
+        if count <= 0:
+            return None
+        rank = q * (count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket, which bounds the relative error
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {'zeros': self.zeros, 'buckets': {str(k): v for k, v in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(buckets={int(k): v for k, v in data.get('buckets', {}).items()}, zeros=data.get('zeros', 0))
+
+class Aggregate:
+    """Mergeable engagement totals for one group"""
+
+    def __init__(self, count=0, engagements=0, impressions=0, rate_sum=0.0, sketch=None):
+        self.count = count
+        self.engagements = engagements
+        self.impressions = impressions
+        self.rate_sum = rate_sum
+        self.sketch = sketch or QuantileSketch()
+
+    def add(self, engagements, impressions, rate, weight=1):
+        self.count += weight
+        self.engagements += weight * engagements
+        self.impressions += weight * impressions
+        self.rate_sum += weight * rate
+        self.sketch.add(rate, weight)
+
+    def merge(self, other):
+        self.count += other.count
+        self.engagements += other.engagements
+        self.impressions += other.impressions
+        self.rate_sum += other.rate_sum
+        self.sketch.merge(other.sketch)
+
+    def render(self):
+        """Summary cells from Tweets onwards"""
+        if self.count <= 0:
+            return [0, 0, 0, 0, '', '', '']
+        median = self.sketch.quantile(0.5)
+        p90 = self.sketch.quantile(0.9)
+        return [
+            self.count,
+            self.engagements,
+            round(self.engagements / self.count, 2),
+            self.impressions,
+            f"{round(self.rate_sum / self.count, 2)}%",
+            f"{round(median, 2)}%",
+            f"{round(p90, 2)}%"
+        ]
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'engagements': self.engagements,
+            'impressions': self.impressions,
+            'rate_sum': self.rate_sum,
+            'sketch': self.sketch.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['count'], data['engagements'], data['impressions'], data['rate_sum'],
+                   QuantileSketch.from_dict(data['sketch']))
+
+def to_number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+def row_values(row):
+    """(groups, engagements, impressions, engagement rate) for a sheet row"""
+    engagements = to_number(row[TOTAL_ENGAGEMENTS_INDEX]) if len(row) > TOTAL_ENGAGEMENTS_INDEX else 0
+    impressions = to_number(row[IMPRESSIONS_INDEX]) if len(row) > IMPRESSIONS_INDEX else 0
+    rate = engagements * 100 / impressions if impressions > 0 else 0.0
+    groups = [GROUPS[0]]
+    if len(row) > DAY_OF_WEEK_INDEX:
+        groups.append(('Time Period', row[TIME_PERIOD_INDEX]))
+        groups.append(('Day of Week', row[DAY_OF_WEEK_INDEX]))
+    return groups, engagements, impressions, rate
+
+class Rollup:
+    """Aggregates for every summary group plus the grid last written to the sheet"""
+
+    def __init__(self, aggregates=None, tweets=0, written=None):
+        self.aggregates = aggregates or {group: Aggregate() for group in GROUPS}
+        self.tweets = tweets
+        # Last grid written to the summary tab; None means write it all next time
+        self.written = written
+
+    def apply(self, row, weight=1):
+        """Add a sheet row to its groups (weight=-1 removes it)"""
+        groups, engagements, impressions, rate = row_values(row)
+        for group in groups:
+            aggregate = self.aggregates.get(group)
+            if aggregate is not None:
+                aggregate.add(engagements, impressions, rate, weight)
+        self.tweets += weight
+
+    def update(self, old_rows=(), new_rows=()):
+        """Replace old_rows' contribution with new_rows'. Both are sheet rows (A:V)."""
+        for row in old_rows:
+            self.apply(row, -1)
+        for row in new_rows:
+            self.apply(row)
+
+    def merge(self, other):
+        for group, aggregate in other.aggregates.items():
+            self.aggregates.setdefault(group, Aggregate()).merge(aggregate)
+        self.tweets += other.tweets
+
+    def grid(self):
+        """The summary tab's values, header first"""
+        return [SUMMARY_HEADERS] + [[group, value] + self.aggregates[(group, value)].render() for group, value in GROUPS]
+
+    def to_dict(self):
+        return {
+            'tweets': self.tweets,
+            'groups': [[group, value, aggregate.to_dict()] for (group, value), aggregate in self.aggregates.items()],
+            'written': self.written
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregates = {group: Aggregate() for group in GROUPS}
+        for group, value, aggregate in data.get('groups', []):
+            aggregates[(group, value)] = Aggregate.from_dict(aggregate)
+        return cls(aggregates, data.get('tweets', 0), data.get('written'))
+
+    @classmethod
+    def build(cls, batches):
+        """Build from scratch out of batches of sheet rows (e.g. TweetStore.iter_rows())"""
+        rollup = cls()
+        for rows in batches:
+            rollup.update(new_rows=rows)
+        return rollup
+
+def load_rollup(path):
+    try:
+        with open(path) as f:
+            return Rollup.from_dict(json.load(f))
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+def save_rollup(rollup, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(rollup.to_dict(), f)
+    os.replace(tmp_path, path)
+
+def changed_cells(old_grid, new_grid):
+    """(row, first_column, values) runs of cells that differ between two grids, zero-based"""
+    runs = []
+    old_grid = old_grid or []
+    for r, new_row in enumerate(new_grid):
+        old_row = old_grid[r] if r < len(old_grid) else []
+        start = None
+        for c, value in enumerate(new_row + [None]):
+            changed = c < len(new_row) and (c >= len(old_row) or str(old_row[c]) != str(value))
+            if changed and start is None:
+                start = c
+            elif not changed and start is not None:
+                runs.append((r, start, new_row[start:c]))
+                start = None
+    return runs
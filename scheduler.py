@@ -0,0 +1,279 @@
+"""
+Deadline-based job scheduler.
+
+Instead of polling, the scheduler sleeps until the earliest job's next
+deadline (or until trigger() wakes it). Jobs use cron-style schedules in a
+fixed timezone, get optional random jitter, and record when they last ran so
+a run missed while the machine was stopped is caught up once on startup.
+"""
+import heapq
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from metrics import SCHEDULED_RUNS, SCHEDULED_SECONDS
+
+MAX_SLEEP = 3600  # Re-check the wall clock at least hourly (clock changes, suspended VMs)
+
+FIELD_RANGES = [
+    (0, 59),  # minute
+    (0, 23),  # hour
+    (1, 31),  # day of month
+    (1, 12),  # month
+    (0, 6)    # day of week, 0 = Sunday
+]
+
+def parse_field(field, low, high):
+    """Expand one cron field ('*', '5', '1-5', '*/15', '0,30') into a set of values"""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/')
+            step = int(step)
+
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(x) for x in part.split('-'))
+        else:
+            start = end = int(part)
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronSchedule:
+    """A five-field cron expression: minute hour day-of-month month day-of-week"""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 cron fields, got '{expression}'")
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            parse_field(field, low, high) for field, (low, high) in zip(fields, FIELD_RANGES)
+        )
+        # Like cron: if both day fields are restricted, either may match
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def matches_day(self, day):
+        if day.month not in self.months:
+            return False
+        day_match = day.day in self.days
+        weekday_match = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return weekday_match
+        if self.any_weekday:
+            return day_match
+        return day_match or weekday_match
+
+    def next_after(self, moment, tz):
+        """First scheduled time strictly after moment (an aware datetime), in tz"""
+        local = moment.astimezone(tz).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+
+        for _ in range(366 * 5):
+            if self.matches_day(local):
+                for hour in sorted(h for h in self.hours if h >= local.hour):
+                    first_minute = local.minute if hour == local.hour else 0
+                    for minute in sorted(m for m in self.minutes if m >= first_minute):
+                        candidate = tz.localize(local.replace(hour=hour, minute=minute))
+                        # Normalizing resolves wall times skipped by a DST change
+                        candidate = tz.normalize(candidate)
+                        if candidate > moment:
+                            return candidate
+            local = (local + timedelta(days=1)).replace(hour=0, minute=0)
+
+        raise ValueError(f"Cron expression '{self.expression}' never fires")
+
+class Job:
+    def __init__(self, name, func, schedule, jitter=0, catch_up=True, retry_delay=300):
+        self.name = name
+        self.func = func
+        self.schedule = CronSchedule(schedule)
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.retry_delay = retry_delay
+        self.last_run = None
+        self.next_run = None
+        self.last_error = None
+        self.failures = 0
+
+class Scheduler:
+    """Runs jobs at their deadlines on a single thread"""
+
+    def __init__(self, timezone='US/Eastern', state_path=None):
+        import pytz
+
+        self.timezone = pytz.timezone(timezone) if isinstance(timezone, str) else timezone
+        self.state_path = state_path
+        self.jobs = {}
+        self._queue = []
+        self._triggered = []
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._state = self._load_state()
+
+    def _load_state(self):
+        if not self.state_path:
+            return {}
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def now(self):
+        return datetime.now(self.timezone)
+
+    def add_job(self, name, func, schedule, jitter=0, catch_up=True, retry_delay=300):
+        """Register func to run on a cron schedule, plus up to jitter random seconds.
+
+        A failed run is retried after retry_delay seconds, doubling each time
+        (or after the exception's retry_after, if it has one), but never later
+        than the next scheduled run.
+        """
+        job = Job(name, func, schedule, jitter, catch_up, retry_delay)
+        last_run = self._state.get(name)
+        if last_run:
+            job.last_run = datetime.fromtimestamp(last_run, self.timezone)
+
+        with self._lock:
+            self.jobs[name] = job
+            now = self.now()
+
+            # Catch up once if a deadline passed while we weren't running
+            if job.catch_up and job.last_run and job.schedule.next_after(job.last_run, self.timezone) <= now:
+                print(f"Scheduler: {name} missed a run since {job.last_run.strftime('%Y-%m-%d %H:%M %Z')}, catching up")
+                job.next_run = now
+            else:
+                job.next_run = self._next_deadline(job, now)
+            heapq.heappush(self._queue, (job.next_run, name))
+
+        self._wake.set()
+        return job
+
+    def _next_deadline(self, job, after):
+        deadline = job.schedule.next_after(after, self.timezone)
+        if job.jitter:
+            deadline += timedelta(seconds=random.uniform(0, job.jitter))
+        return deadline
+
+    def trigger(self, name):
+        """Run a job as soon as possible, waking the scheduler if it's asleep"""
+        if name not in self.jobs:
+            raise KeyError(name)
+        with self._lock:
+            if name not in self._triggered:
+                self._triggered.append(name)
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def status(self):
+        """Each job's schedule, last and next run"""
+        with self._lock:
+            return {
+                name: {
+                    'schedule': job.schedule.expression,
+                    'last_run': job.last_run.isoformat() if job.last_run else None,
+                    'next_run': job.next_run.isoformat() if job.next_run else None,
+                    'last_error': job.last_error
+                }
+                for name, job in self.jobs.items()
+            }
+
+    def _run(self, job):
+        """Run a job, returning the retry delay in seconds if it failed"""
+        started = self.now()
+        print(f"Running scheduled {job.name} at {started.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+        timer = time.perf_counter()
+        try:
+            job.func()
+        except Exception as e:
+            SCHEDULED_RUNS.inc(job=job.name, outcome='error')
+            job.failures += 1
+            job.last_error = str(e)
+            delay = getattr(e, 'retry_after', None) or job.retry_delay * 2 ** (job.failures - 1)
+            print(f"Scheduled {job.name} failed: {e} (retrying in {delay:.0f}s)")
+            return delay
+        finally:
+            SCHEDULED_SECONDS.observe(time.perf_counter() - timer, job=job.name)
+
+        SCHEDULED_RUNS.inc(job=job.name, outcome='ok')
+        job.failures = 0
+        job.last_error = None
+        # Only successful runs count for catch-up
+        job.last_run = started
+        with self._lock:
+            self._state[job.name] = started.timestamp()
+            self._save_state()
+        return None
+
+    def _pop_due(self):
+        """Next job to run now, or (None, seconds to sleep)"""
+        with self._lock:
+            if self._triggered:
+                return self.jobs[self._triggered.pop(0)], 0
+
+            while self._queue:
+                deadline, name = self._queue[0]
+                job = self.jobs[name]
+                if deadline != job.next_run:
+                    # Stale entry left behind by a reschedule
+                    heapq.heappop(self._queue)
+                    continue
+
+                wait = (deadline - self.now()).total_seconds()
+                if wait > 0:
+                    return None, min(wait, MAX_SLEEP)
+
+                heapq.heappop(self._queue)
+                return job, 0
+
+            return None, MAX_SLEEP
+
+    def _reschedule(self, job, retry_delay=None):
+        with self._lock:
+            now = self.now()
+            next_run = self._next_deadline(job, now)
+            if retry_delay is not None:
+                next_run = min(next_run, now + timedelta(seconds=retry_delay))
+            job.next_run = next_run
+            heapq.heappush(self._queue, (job.next_run, job.name))
+
+    def run_forever(self):
+        """Sleep until each deadline and run the due job, until stop() is called"""
+        while not self._stopped.is_set():
+            job, wait = self._pop_due()
+
+            if job is None:
+                self._wake.wait(wait)
+                self._wake.clear()
+                continue
+
+            retry_delay = self._run(job)
+            if retry_delay is not None or job.next_run <= self.now():
+                # Move to the next deadline (or sooner, to retry a failure).
+                # A successful triggered run leaves the schedule alone.
+                self._reschedule(job, retry_delay)
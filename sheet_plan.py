@@ -0,0 +1,160 @@
+"""
+Builders for spreadsheets.batchUpdate requests.
+
+A sync's header creation, row insertion, cell data and formatting are compiled
+into one request body so the whole write is a single round trip and lands
+atomically (batchUpdate applies all requests or none).
+"""
+
+def cell_data(value, bold=None):
+    """Convert a Python value to a CellData dict, matching valueInputOption=RAW"""
+    if isinstance(value, bool):
+        entered = {'boolValue': value}
+    elif isinstance(value, (int, float)):
+        entered = {'numberValue': value}
+    else:
+        entered = {'stringValue': '' if value is None else str(value)}
+
+    cell = {'userEnteredValue': entered}
+    if bold is not None:
+        cell['userEnteredFormat'] = {'textFormat': {'bold': bold}}
+    return cell
+
+def update_cells_request(sheet_id, start_row, rows, start_column=0, bold=None):
+    """Write rows of values starting at (start_row, start_column), zero-based"""
+    fields = 'userEnteredValue'
+    if bold is not None:
+        fields += ',userEnteredFormat.textFormat.bold'
+
+    return {
+        "updateCells": {
+            "start": {
+                "sheetId": sheet_id,
+                "rowIndex": start_row,
+                "columnIndex": start_column
+            },
+            "rows": [{"values": [cell_data(value, bold) for value in row]} for row in rows],
+            "fields": fields
+        }
+    }
+
+def insert_rows_request(sheet_id, start_row, count):
+    """Insert count blank rows before start_row (zero-based), taking formatting from below"""
+    return {
+        "insertDimension": {
+            "range": {
+                "sheetId": sheet_id,
+                "dimension": "ROWS",
+                "startIndex": start_row,
+                "endIndex": start_row + count
+            },
+            "inheritFromBefore": False
+        }
+    }
+
+def delete_rows_request(sheet_id, start_row, end_row):
+    """Delete rows [start_row, end_row), zero-based"""
+    return {
+        "deleteDimension": {
+            "range": {
+                "sheetId": sheet_id,
+                "dimension": "ROWS",
+                "startIndex": start_row,
+                "endIndex": end_row
+            }
+        }
+    }
+
+def sort_rows_request(sheet_id, start_row, end_column, sort_specs):
+    """Sort every row from start_row down, server-side.
+
+    sort_specs is a list of (column_index, descending) pairs. Omitting
+    endRowIndex makes the range open-ended, so the request is the same size
+    however many rows the sheet has.
+    """
+    return {
+        "sortRange": {
+            "range": {
+                "sheetId": sheet_id,
+                "startRowIndex": start_row,
+                "startColumnIndex": 0,
+                "endColumnIndex": end_column
+            },
+            "sortSpecs": [
+                {
+                    "dimensionIndex": column,
+                    "sortOrder": "DESCENDING" if descending else "ASCENDING"
+                }
+                for column, descending in sort_specs
+            ]
+        }
+    }
+
+def bold_rows_request(sheet_id, start_row, end_row=None, bold=True):
+    """Set bold on rows [start_row, end_row); end_row=None runs to the bottom of the sheet"""
+    grid_range = {
+        "sheetId": sheet_id,
+        "startRowIndex": start_row
+    }
+    if end_row is not None:
+        grid_range["endRowIndex"] = end_row
+
+    return {
+        "repeatCell": {
+            "range": grid_range,
+            "cell": {
+                "userEnteredFormat": {
+                    "textFormat": {
+                        "bold": bold
+                    }
+                }
+            },
+            "fields": "userEnteredFormat.textFormat.bold"
+        }
+    }
+
+def clear_values_request(sheet_id, start_row=0):
+    """Clear cell values from start_row down, leaving formatting in place"""
+    return {
+        "updateCells": {
+            "range": {
+                "sheetId": sheet_id,
+                "startRowIndex": start_row
+            },
+            "fields": "userEnteredValue"
+        }
+    }
+
+def add_sheet_request(title):
+    """Create a new tab"""
+    return {"addSheet": {"properties": {"title": title}}}
+
+def column_letter(index):
+    """Convert a zero-based column index to its A1 letter"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def header_requests(sheet_id, headers):
+    """Write the header row in bold"""
+    return [update_cells_request(sheet_id, 0, [headers], bold=True)]
+
+def plan_insert_rows(sheet_id, rows, headers=None, start_row=1):
+    """Compile a newest-first insert into one batchUpdate body.
+
+    Rows go in at row 2 (index 1) by default so the newest tweets stay on
+    top; a later page of the same sync goes in below the earlier ones. Pass
+    headers when the sheet doesn't have a header row yet.
+    """
+    requests = []
+    if headers:
+        requests.extend(header_requests(sheet_id, headers))
+
+    if rows:
+        requests.append(insert_rows_request(sheet_id, start_row, len(rows)))
+        requests.append(update_cells_request(sheet_id, start_row, rows, bold=False))
+
+    return {"requests": requests}
@@ -0,0 +1,210 @@
+"""
+Engagement history for each tweet.
+
+The sheet and the tweet store only hold a tweet's latest public_metrics.
+This store keeps every reading, so you can see how fast a tweet picked up
+engagement and when it stopped.
+
+Readings are spaced by the tweet's age: hourly for its first day, daily for
+its first week and weekly after that. Each tweet's next reading is due at
+next_due, and the index on that column makes the table a priority queue on
+disk: due() hands out the most overdue tweets first, so a run with a limited
+API budget spends it on the young tweets that are still changing.
+
+A tweet's series is one BLOB of zigzag varints. Each reading adds the seconds
+since the previous reading (since the tweet was posted, for the first one)
+and the change in each metric, which for most readings is a few bytes. The
+latest values are kept beside the series, so a new reading is appended
+without decoding it.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from tweet_store import snowflake_time
+
+METRICS = ['like_count', 'retweet_count', 'bookmark_count', 'reply_count', 'quote_count', 'impression_count']
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+# (age under, interval between readings); older tweets are read every WEEK
+CADENCE = [(DAY, HOUR), (WEEK, DAY)]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    tweet_id INTEGER PRIMARY KEY,
+    posted_at INTEGER NOT NULL,
+    last_at INTEGER NOT NULL,
+    last_values BLOB NOT NULL,
+    next_due INTEGER,
+    readings INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_series_next_due ON series (next_due);
+"""
+
+def reading_interval(age):
+    """Seconds until the next reading of a tweet that is age seconds old"""
+    for max_age, interval in CADENCE:
+        if age < max_age:
+            return interval
+    return WEEK
+
+def encode_varints(values):
+    """Zigzag varint bytes for a list of ints"""
+    out = bytearray()
+    for value in values:
+        value = (value << 1) ^ (value >> 63)  # Small negatives stay small
+        while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+def decode_varints(data):
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append((value >> 1) ^ -(value & 1))
+        value = shift = 0
+    return values
+
+def decode_series(posted_at, data):
+    """[(unix time, [metric values])] from a series BLOB"""
+    values = decode_varints(data)
+    width = len(METRICS) + 1
+    readings = []
+    at = posted_at
+    current = [0] * len(METRICS)
+    for start in range(0, len(values), width):
+        at += values[start]
+        current = [total + delta for total, delta in zip(current, values[start + 1:start + width])]
+        readings.append((at, current))
+    return readings
+
+class SnapshotStore:
+    """Thread-safe SQLite store of delta-encoded public_metrics readings per tweet"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def record(self, readings, now=None):
+        """Append a reading per tweet from {tweet_id: public_metrics} and schedule the next one.
+
+        Returns the number of readings recorded.
+        """
+        if not readings:
+            return 0
+        now = int(time.time() if now is None else now)
+        tweet_ids = [int(tweet_id) for tweet_id in readings]
+
+        with self._lock, self._conn:
+            existing = {}
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(tweet_ids), 500):
+                chunk = tweet_ids[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT tweet_id, last_at, last_values FROM series WHERE tweet_id IN ({placeholders})',
+                    chunk
+                ).fetchall()
+                for tweet_id, last_at, last_values in rows:
+                    existing[tweet_id] = (last_at, decode_varints(last_values))
+
+            inserts = []
+            updates = []
+            for tweet_id, public_metrics in zip(tweet_ids, readings.values()):
+                values = [int((public_metrics or {}).get(name, 0) or 0) for name in METRICS]
+                posted_at = int(snowflake_time(tweet_id).timestamp())
+                next_due = now + reading_interval(now - posted_at)
+                if tweet_id in existing:
+                    last_at, last_values = existing[tweet_id]
+                    deltas = [value - last for value, last in zip(values, last_values)]
+                    chunk = encode_varints([max(0, now - last_at)] + deltas)
+                    updates.append((chunk, now, encode_varints(values), next_due, tweet_id))
+                else:
+                    chunk = encode_varints([max(0, now - posted_at)] + values)
+                    inserts.append((tweet_id, posted_at, now, encode_varints(values), next_due, chunk))
+                existing[tweet_id] = (now, values)
+
+            self._conn.executemany(
+                'INSERT INTO series (tweet_id, posted_at, last_at, last_values, next_due, readings, data) '
+                'VALUES (?, ?, ?, ?, ?, 1, ?)',
+                inserts
+            )
+            self._conn.executemany(
+                'UPDATE series SET data = CAST(data || ? AS BLOB), last_at = ?, last_values = ?, next_due = ?, '
+                'readings = readings + 1 WHERE tweet_id = ?',
+                updates
+            )
+        return len(inserts) + len(updates)
+
+    def due(self, limit, now=None):
+        """IDs (as text) of up to limit tweets whose next reading is due, most overdue first"""
+        now = int(time.time() if now is None else now)
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT tweet_id FROM series WHERE next_due <= ? ORDER BY next_due LIMIT ?', (now, limit)
+            ).fetchall()
+        return [str(row[0]) for row in rows]
+
+    def retire(self, tweet_ids):
+        """Stop taking readings of tweets (e.g. deleted ones); their history is kept"""
+        tweet_ids = [int(tweet_id) for tweet_id in tweet_ids]
+        with self._lock, self._conn:
+            self._conn.executemany('UPDATE series SET next_due = NULL WHERE tweet_id = ?',
+                                   [(tweet_id,) for tweet_id in tweet_ids])
+
+    def series(self, tweet_id):
+        """[{'time': unix time, metric: value, ...}] for one tweet, oldest first (empty if untracked)"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT posted_at, data FROM series WHERE tweet_id = ?', (int(tweet_id),)
+            ).fetchone()
+        if row is None:
+            return []
+        return [dict(zip(METRICS, values), time=at) for at, values in decode_series(*row)]
+
+    def iter_series(self, batch_size=1000):
+        """Yield (tweet_id, [(unix time, [metric values])]) for every tweet, oldest tweet first"""
+        last_id = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT tweet_id, posted_at, data FROM series WHERE tweet_id > ? ORDER BY tweet_id LIMIT ?',
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for tweet_id, posted_at, data in rows:
+                yield str(tweet_id), decode_series(posted_at, data)
+            last_id = rows[-1][0]
+
+    def stats(self, now=None):
+        """Tweets tracked, readings, bytes of series data and readings due now"""
+        now = int(time.time() if now is None else now)
+        with self._lock:
+            tweets, readings, size, due = self._conn.execute(
+                'SELECT COUNT(*), SUM(readings), SUM(LENGTH(data)), SUM(next_due <= ?) FROM series', (now,)
+            ).fetchone()
+        return {'tweets': tweets, 'readings': readings or 0, 'bytes': size or 0, 'due': due or 0}
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Copy rows between the Google Sheet and the local SQLite store.
+
+  import   - load the current sheet into the store (run once on a new machine)
+  project  - rewrite the sheet from the store, newest first
+  stats    - show what the store holds (no API calls)
+"""
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import get_account, get_store, import_sheet_to_store, project_store_to_sheet
+
+def show_stats(account):
+    store = get_store(account)
+    print(f"Store: {store.path}")
+    print(f"  Tweets: {store.count()}")
+    print(f"  Newest tweet ID: {store.latest_tweet_id()}")
+    print(f"  Oldest tweet ID: {store.oldest_tweet_id()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['import', 'project', 'stats'])
+    parser.add_argument('--account', help='Account to copy (defaults to the first configured account)')
+    args = parser.parse_args()
+
+    account = get_account(args.account)
+    if args.command == 'import':
+        import_sheet_to_store(account)
+    elif args.command == 'project':
+        project_store_to_sheet(account)
+    show_stats(account)
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
-from app import has_link, count_hashtags, count_mentions
+import os
+from features import TweetFeatureExtractor
+
+extractor = TweetFeatureExtractor(username=os.environ.get('TWITTER_USERNAME', ''))
 
 # Test the media detection functions
 test_tweets = [
@@ -26,9 +29,10 @@ print("Testing media detection functions:\n")
 
 for i, tweet in enumerate(test_tweets, 1):
     print(f"Tweet {i}: {tweet['text'][:50]}...")
-    print(f"  Has Link: {has_link(tweet['text'])}")
-    print(f"  Hashtag Count: {count_hashtags(tweet['text'])}")
-    print(f"  Mention Count: {count_mentions(tweet['text'])}")
+    hashtags, mentions, link = extractor.scan_text(tweet['text'])
+    print(f"  Has Link: {'TRUE' if link else 'FALSE'}")
+    print(f"  Hashtag Count: {hashtags}")
+    print(f"  Mention Count: {mentions}")
     print()
 
 print("✓ Media detection functions are working correctly")
\ No newline at end of file
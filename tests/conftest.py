@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def fake_app(tmp_path):
+    """The app wired to fake Twitter and Sheets backends and a throwaway DATA_DIR.
+
+    Yields (account, twitter, spreadsheet); the timeline is empty until
+    twitter.__init__(tweets) is called with some.
+    """
+    from benchmark_sync import fake_backends, make_accounts
+    from fake_backends import CallRecorder, FakeSheetsService, FakeSpreadsheet, FakeTwitterClient
+
+    recorder = CallRecorder()
+    twitter = FakeTwitterClient([], recorder)
+    spreadsheet = FakeSpreadsheet()
+    sheets = FakeSheetsService(spreadsheet, recorder)
+    with fake_backends(twitter, sheets, str(tmp_path), make_accounts(1, spreadsheet)):
+        import app
+        yield app.get_account(), twitter, spreadsheet
@@ -0,0 +1,89 @@
+import json
+import threading
+
+import pytest
+
+from accounts import load_accounts
+from benchmark_sync import fake_backends, make_accounts
+from fake_backends import CallRecorder, FakeSheetsService, FakeSpreadsheet, FakeTwitterClient, make_tweets
+
+@pytest.fixture
+def two_accounts(tmp_path):
+    recorder = CallRecorder()
+    twitter = FakeTwitterClient(make_tweets(8), recorder)
+    spreadsheet = FakeSpreadsheet()
+    accounts = make_accounts(2, spreadsheet)
+    with fake_backends(twitter, FakeSheetsService(spreadsheet, recorder), str(tmp_path), accounts):
+        import app
+        yield app, accounts, twitter, spreadsheet
+
+def test_load_accounts(tmp_path):
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps([
+        {'name': 'alpha', 'spreadsheet_id': 'sheet-a', 'user_id': 1},
+        {'username': 'beta', 'spreadsheet_id': 'sheet-b', 'sheet': 'beta posts'}
+    ]))
+    alpha, beta = load_accounts(str(path))
+    assert (alpha.name, alpha.user_id, alpha.sheet) == ('alpha', '1', 'posts')
+    assert (beta.name, beta.username, beta.a1('A1')) == ('beta', 'beta', "'beta posts'!A1")
+
+@pytest.mark.parametrize('entries', [
+    [],
+    [{'name': 'alpha', 'user_id': 1}],
+    [{'name': 'alpha', 'spreadsheet_id': 'sheet-a'}],
+    [{'name': 'a b', 'spreadsheet_id': 'sheet-a', 'user_id': 1}],
+    [{'name': 'alpha', 'spreadsheet_id': 'sheet-a', 'user_id': 1}] * 2
+])
+def test_load_accounts_rejects_bad_entries(tmp_path, entries):
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps(entries))
+    with pytest.raises(ValueError):
+        load_accounts(str(path))
+
+def test_accounts_run_in_parallel(two_accounts):
+    app, accounts, _, _ = two_accounts
+    # Each account waits for the other, so this only finishes if they overlap
+    both_running = threading.Barrier(len(accounts), timeout=5)
+
+    def sync(account):
+        both_running.wait()
+        return account.name
+
+    results = app.for_each_account(sync, accounts)
+    assert results == {'account1': 'account1', 'account2': 'account2'}
+
+def test_one_failing_account_does_not_stop_the_others(two_accounts):
+    app, accounts, _, _ = two_accounts
+
+    def sync(account):
+        if account.name == 'account1':
+            raise RuntimeError('Sheets API returned 503')
+        return 3
+
+    assert app.for_each_account(sync, accounts) == {
+        'account1': {'error': 'Sheets API returned 503'},
+        'account2': 3
+    }
+
+def test_every_account_failing_raises(two_accounts):
+    app, accounts, _, _ = two_accounts
+
+    def sync(account):
+        raise RuntimeError(f'{account.name} failed')
+
+    with pytest.raises(RuntimeError):
+        app.for_each_account(sync, accounts)
+
+def test_each_account_keeps_its_own_checkpoint(two_accounts):
+    app, accounts, twitter, spreadsheet = two_accounts
+    first, second = accounts
+    tweets = make_tweets(8)
+    # The second account is behind by three tweets
+    app.get_store(second).upsert_rows(app.build_rows(tweets[:5][::-1], account=second))
+    twitter.__init__(tweets, twitter.recorder)
+
+    assert app.sync_all_accounts() == {'account1': 8, 'account2': 3}
+    assert app.get_last_tweet_id(None, first) == app.get_last_tweet_id(None, second) == str(tweets[-1].id)
+    assert len(spreadsheet.tabs['posts']) == 9
+    assert len(spreadsheet.tabs['posts2']) == 4
+    assert app.sync_all_accounts() == {'account1': 0, 'account2': 0}
@@ -0,0 +1,70 @@
+import statistics
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import analytics
+import app
+from fake_backends import make_tweets
+
+@pytest.fixture
+def history(fake_app):
+    account, _, _ = fake_app
+    rows = app.build_rows(make_tweets(300)[::-1], account=account)
+    app.get_store(account).upsert_rows(rows)
+    return account, rows
+
+def column(rows, header):
+    return [row[app.HEADERS.index(header)] for row in rows]
+
+def rate(row):
+    impressions = row[app.HEADERS.index('Impressions')]
+    return row[app.HEADERS.index('Total Engagements')] * 100 / impressions if impressions else 0.0
+
+def test_grouped_percentiles_match_numpy():
+    rng = np.random.default_rng(7)
+    codes = rng.integers(0, 4, 500)
+    values = rng.exponential(3.0, 500)
+    # Group 4 is empty
+    result = analytics.grouped_percentiles(codes, values, 5)
+    for group in range(4):
+        assert np.allclose(result[group], np.percentile(values[codes == group], analytics.PERCENTILES))
+    assert np.isnan(result[4]).all()
+
+def test_grouped_stats_match_the_rows(history):
+    account, rows = history
+    columns = analytics.TweetColumns.load(app.get_store(account))
+    stats = columns.grouped_stats()
+    assert stats['tweets'] == len(rows)
+
+    for weekday, summary in stats['by_weekday'].items():
+        group = [row for row in rows if row[app.HEADERS.index('Day of Week')] == weekday]
+        assert summary['count'] == len(group)
+        assert summary['median_engagements'] == pytest.approx(
+            statistics.median(column(group, 'Total Engagements')), abs=0.01)
+        assert summary['mean_engagement_rate'] == pytest.approx(statistics.mean(map(rate, group)), abs=0.01)
+    assert sum(s['count'] for s in stats['by_tweet_type'].values()) == len(rows)
+    assert sum(s['count'] for s in stats['by_media'].values()) == len(rows)
+
+def test_top_tweets(history):
+    account, rows = history
+    columns = analytics.TweetColumns.load(app.get_store(account))
+    best = analytics.top_tweets(columns, 'likes', limit=5)
+    assert sorted(columns.likes[best], reverse=True) == list(columns.likes[best])
+    assert list(columns.likes[best]) == sorted(column(rows, 'Likes'), reverse=True)[:5]
+
+    popular = analytics.top_tweets(columns, 'engagement_rate', limit=5, min_impressions=15000)
+    assert (columns.impressions[popular] >= 15000).all()
+
+def test_stats_endpoint_reloads_after_a_sync(history):
+    account, rows = history
+    client = app.app.test_client()
+    body = client.get('/stats?top=3&metric=impressions').get_json()
+    assert body['tweets'] == len(rows)
+    assert [t['impressions'] for t in body['top_tweets']] == sorted(column(rows, 'Impressions'), reverse=True)[:3]
+    assert body['top_tweets'][0]['content']
+
+    app.store_rows(app.build_rows(make_tweets(301)[300:], account=account), account)
+    assert client.get('/stats').get_json()['tweets'] == len(rows) + 1
+    assert client.get('/stats?metric=nope').status_code == 400
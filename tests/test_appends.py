@@ -0,0 +1,55 @@
+import app
+from fake_backends import make_tweets
+
+def test_replayed_append_is_not_applied_twice(fake_app):
+    account, _, spreadsheet = fake_app
+    spreadsheet.tabs['posts'] = [list(app.HEADERS)]
+    rows = app.build_rows(make_tweets(3)[::-1], account=account)
+
+    journal = app.get_journal(account)
+    (entry,) = app.plan_appends(rows, account)
+    assert entry['guard'] == ['posts!U2:U', rows[-1][app.TWEET_ID_COLUMN]]
+
+    # The append goes through but the commit mark is lost
+    params = entry['params']
+    app.get_sheets_service().spreadsheets().values().append(**params).execute()
+    assert journal.pending() == [entry]
+
+    assert app.replay_journal(account) == 1
+    assert journal.pending() == []
+    assert len(spreadsheet.tabs['posts']) == 1 + len(rows)
+
+def test_unapplied_append_is_sent_on_replay(fake_app):
+    account, _, spreadsheet = fake_app
+    spreadsheet.tabs['posts'] = [list(app.HEADERS)]
+    rows = app.build_rows(make_tweets(3)[::-1], account=account)
+
+    app.plan_appends(rows, account)
+    assert app.replay_journal(account) == 1
+    assert [row[app.TWEET_ID_COLUMN] for row in spreadsheet.tabs['posts'][1:]] == \
+        [row[app.TWEET_ID_COLUMN] for row in rows]
+
+def test_backfill_appends_each_page_oldest_first_in_the_append_layout(fake_app, monkeypatch):
+    account, twitter, spreadsheet = fake_app
+    account.layout = app.APPEND
+    monkeypatch.setattr(app, 'PAGE_SIZE', 2)
+    tweets = make_tweets(5)
+    twitter.__init__(tweets)
+
+    assert app.backfill_tweets(restart=True, account=account) == 5
+    # Pages come newest first, so only the rows within each page are in order
+    pages = [tweets[3:5], tweets[1:3], tweets[0:1]]
+    assert [row[app.TWEET_ID_COLUMN] for row in spreadsheet.tabs['posts data'][1:]] == \
+        [str(t.id) for page in pages for t in page]
+
+def test_backfill_starts_below_the_sheet_when_the_store_is_newer(fake_app):
+    account, twitter, spreadsheet = fake_app
+    tweets = make_tweets(10)
+    twitter.__init__(tweets)
+    # An existing sheet, with a store that has only seen the syncs since it was added
+    rows = app.build_rows(tweets[4:][::-1], account=account)
+    spreadsheet.tabs['posts'] = [list(app.HEADERS)] + rows
+    app.get_store(account).upsert_rows(rows[:2])
+
+    assert app.backfill_tweets(restart=True, account=account) == 4
+    assert [row[app.TWEET_ID_COLUMN] for row in spreadsheet.tabs['posts'][1:]] == [str(t.id) for t in tweets[::-1]]
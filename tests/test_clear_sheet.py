@@ -0,0 +1,37 @@
+import pytest
+
+import app
+import clear_sheet as script
+from benchmark_sync import seed_history
+from fake_backends import make_tweets
+
+@pytest.fixture(autouse=True)
+def fake_service(fake_app, monkeypatch):
+    # The script imported the client getter by name
+    monkeypatch.setattr(script, 'get_sheets_service', app.get_sheets_service)
+
+def test_clear_keeps_the_store_by_default(fake_app, capsys):
+    account, _, spreadsheet = fake_app
+    seed_history(app.get_sheets_service(), make_tweets(3), account)
+
+    assert script.clear_sheet(account=account)
+    assert not any(any(row) for row in spreadsheet.tabs['posts'])
+    assert app.get_store(account).count() == 3
+    assert 'sync_store.py project' in capsys.readouterr().out
+
+def test_clear_with_store_starts_over(fake_app):
+    account, twitter, spreadsheet = fake_app
+    tweets = make_tweets(3)
+    seed_history(app.get_sheets_service(), tweets, account)
+    app.save_sync_state({'since_id': str(tweets[0].id), 'pagination_token': '1'}, account)
+
+    assert script.clear_sheet(clear_store=True, account=account)
+    assert app.get_store(account).count() == 0
+    assert app.load_sync_state(account) is None
+
+    # The next sync writes the header and the newest page again
+    twitter.__init__(tweets)
+    assert app.sync_tweets_to_sheets(account) == 3
+    assert spreadsheet.tabs['posts'][0] == list(app.HEADERS)
+    assert [row[app.TWEET_ID_COLUMN] for row in spreadsheet.tabs['posts'][1:] if any(row)] == \
+        [str(t.id) for t in tweets[::-1]]
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+
+import clients
+
+@pytest.fixture
+def fresh_clients(tmp_path, monkeypatch):
+    monkeypatch.setattr(clients, '_twitter_client', None)
+    monkeypatch.setattr(clients, '_sheets_service', None)
+    monkeypatch.setattr(clients, '_rate_limits', None)
+    monkeypatch.setattr(clients, 'RATE_LIMITS_PATH', str(tmp_path / 'rate_limits.json'))
+    monkeypatch.setenv('TWITTER_API_KEY', 'key')
+    monkeypatch.setenv('TWITTER_API_KEY_SECRET', 'secret')
+    monkeypatch.setenv('TWITTER_BEARER_TOKEN', 'bearer')
+    yield
+    clients.reset_clients()
+
+def test_twitter_client_is_built_once(fresh_clients):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        built = set(map(id, pool.map(lambda _: clients.get_twitter_client(), range(16))))
+    assert len(built) == 1
+    assert clients.get_twitter_client().rate_limits is clients.get_rate_limits()
+
+def test_twitter_client_needs_keys(fresh_clients, monkeypatch):
+    monkeypatch.delenv('TWITTER_API_KEY')
+    with pytest.raises(ValueError):
+        clients.get_twitter_client()
+
+def test_sheets_service_is_built_once_without_discovery_fetch(fresh_clients):
+    from google.oauth2 import service_account
+
+    with mock.patch.object(service_account.Credentials, 'from_service_account_info',
+                           return_value=AnonymousCredentials()) as load_credentials, \
+            mock.patch('httplib2.Http.request', side_effect=AssertionError('no network')):
+        first = clients.get_sheets_service()
+        assert clients.get_sheets_service() is first
+    assert load_credentials.call_count == 1
+    assert isinstance(first._http, clients.PooledHttp)
+
+    clients.reset_clients()
+    assert clients._sheets_service is None
+
+class FakeHttp:
+    def __init__(self):
+        self.requests = 0
+        self.closed = False
+
+    def request(self, uri, method='GET', *args, **kwargs):
+        self.requests += 1
+        return SimpleNamespace(status=200), b'{}'
+
+    def close(self):
+        self.closed = True
+
+class CountingQuota:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+def test_pooled_http_reuses_connections():
+    reads, writes = CountingQuota(), CountingQuota()
+    http = clients.PooledHttp(AnonymousCredentials(), pool_size=1, read_quota=reads, write_quota=writes)
+    connection = FakeHttp()
+    http._idle.put(connection)
+
+    url = 'https://sheets.googleapis.com/v4/spreadsheets/abc/values:batchUpdate'
+    http.request(url, 'POST')
+    http.request('https://sheets.googleapis.com/v4/spreadsheets/abc/values/posts%21A1', 'GET')
+    assert connection.requests == 2
+    assert (reads.acquired, writes.acquired) == (1, 1)
+
+    http.close()
+    assert connection.closed
+
+def test_pooled_http_closes_connections_beyond_the_pool():
+    http = clients.PooledHttp(AnonymousCredentials(), pool_size=1)
+    other = FakeHttp()
+
+    class OverlappingHttp(FakeHttp):
+        def request(self, *args, **kwargs):
+            # Another thread's request finishes first and fills the pool
+            http._idle.put_nowait(other)
+            return super().request(*args, **kwargs)
+
+    connection = OverlappingHttp()
+    with mock.patch('google_auth_httplib2.AuthorizedHttp', return_value=connection):
+        http.request('https://sheets.googleapis.com/v4/spreadsheets/abc')
+    assert connection.closed
+    assert http._idle.get_nowait() is other
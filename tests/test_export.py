@@ -0,0 +1,76 @@
+import csv
+import io
+from datetime import date, time
+
+import pytest
+
+import app
+import tweet_export
+from fake_backends import make_tweets
+
+@pytest.fixture
+def history(fake_app):
+    account, _, _ = fake_app
+    tweets = make_tweets(25)[::-1]
+    rows = app.build_rows(tweets, account=account)
+    app.get_store(account).upsert_rows(rows)
+    return account, rows
+
+def test_typed_row():
+    row = ['2024-03-05', '14:05:09 ET', 'Afternoon', 'Tuesday', 'hello', 12, '8', '2', '1', '1', '0', '400',
+           '3.00%', 'Original', 'TRUE', 'FALSE', '0', 'POSSIBLE', '1', '0', '1600000000000000000', 'now']
+    typed = dict(zip([name for name, _ in tweet_export.EXPORT_COLUMNS], tweet_export.typed_row(row)))
+    assert typed['tweet_id'] == 1600000000000000000
+    assert typed['date'] == date(2024, 3, 5)
+    assert typed['time'] == time(14, 5, 9)
+    assert typed['likes'] == 8
+    assert typed['engagement_rate'] == 3.0
+    assert typed['has_link'] is True
+    assert typed['has_image'] is False
+    assert typed['has_video'] is None
+
+def test_csv_round_trip(history):
+    account, rows = history
+    chunks = list(tweet_export.iter_export(app.get_store(account), 'csv', batch_size=10))
+    # The header and the first batch, then one chunk per batch
+    assert len(chunks) == 3
+
+    records = list(csv.DictReader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+    assert [r['tweet_id'] for r in records] == [row[app.TWEET_ID_COLUMN] for row in rows]
+    for record, row in zip(records, rows):
+        assert int(record['likes']) == row[app.HEADERS.index('Likes')]
+        assert float(record['engagement_rate']) == float(row[app.HEADERS.index('Engagement Rate')].rstrip('%'))
+        assert record['has_link'] == row[app.HEADERS.index('Has Link')].lower()
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_columnar_round_trip(history, fmt):
+    pa = pytest.importorskip('pyarrow')
+    account, rows = history
+    data = b''.join(tweet_export.iter_export(app.get_store(account), fmt, batch_size=10))
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        table = pq.read_table(pa.BufferReader(data))
+    else:
+        table = pa.ipc.open_stream(data).read_all()
+    assert table.schema == tweet_export.arrow_schema()
+    assert table.column('tweet_id').to_pylist() == [int(row[app.TWEET_ID_COLUMN]) for row in rows]
+    assert table.column('has_link').to_pylist() == [row[app.HEADERS.index('Has Link')] == 'TRUE' for row in rows]
+
+def test_local_copy_is_memory_mapped(history, tmp_path):
+    pytest.importorskip('pyarrow')
+    account, rows = history
+    path = str(tmp_path / 'tweets.arrow')
+    assert tweet_export.write_local_copy(app.get_store(account), path, batch_size=10) == len(rows)
+    table = tweet_export.open_local_copy(path)
+    assert table.num_rows == len(rows)
+    assert table.column('likes').to_pylist() == [row[app.HEADERS.index('Likes')] for row in rows]
+
+def test_export_endpoint(history):
+    _, rows = history
+    response = app.app.test_client().get('/export?format=csv')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert len(response.get_data(as_text=True).splitlines()) == 1 + len(rows)
+
+    assert app.app.test_client().get('/export?format=xlsx').status_code == 400
@@ -0,0 +1,70 @@
+import json
+import time
+from unittest import mock
+
+import pytest
+
+import app
+import clients
+from accounts import Account
+from leader import LeaderLock
+
+@pytest.fixture
+def health(tmp_path):
+    accounts = [Account('alpha', 'sheet-a'), Account('beta', 'sheet-b')]
+    with mock.patch.object(app, 'SYNC_STATUS_PATH', str(tmp_path / 'sync_status.json')), \
+            mock.patch.object(clients, '_accounts', accounts):
+        yield accounts
+
+def get_health(leader_lock):
+    with mock.patch.object(app, 'leader_lock', leader_lock):
+        response = app.app.test_client().get('/health')
+    assert response.status_code == 200
+    return response.get_json()
+
+def test_follower_reports_leader_sync_failure(tmp_path, health):
+    alpha, beta = health
+    # The leader's sync outcomes, as it would record them
+    app.record_sync_status(alpha)
+    app.record_sync_status(beta, error='Sheets API returned 503')
+
+    # A worker that doesn't hold the lock has no sync state of its own
+    follower = LeaderLock(str(tmp_path / 'scheduler.lock'))
+    body = get_health(follower)
+
+    assert body['role'] == 'follower'
+    assert body['status'] == 'degraded'
+    assert body['accounts']['beta']['last_error'] == 'Sheets API returned 503'
+    assert body['accounts']['alpha']['last_error'] is None
+    assert body['accounts']['alpha']['last_success_age'] is not None
+
+def test_leader_and_follower_agree(tmp_path, health):
+    alpha, _ = health
+    app.record_sync_status(alpha, error='timeout')
+    leader = LeaderLock(str(tmp_path / 'scheduler.lock'))
+    assert leader.try_acquire()
+    try:
+        leader_body = get_health(leader)
+        follower_body = get_health(LeaderLock(str(tmp_path / 'scheduler.lock')))
+    finally:
+        leader.release()
+
+    assert leader_body['role'] == 'leader'
+    assert follower_body['role'] == 'follower'
+    assert leader_body['status'] == follower_body['status'] == 'degraded'
+    assert leader_body['accounts'] == follower_body['accounts']
+
+def test_success_clears_error(tmp_path, health):
+    alpha, _ = health
+    app.record_sync_status(alpha, error='timeout')
+    app.record_sync_status(alpha)
+
+    status = json.loads((tmp_path / 'sync_status.json').read_text())
+    assert status['alpha']['last_error'] is None
+    assert status['alpha']['last_success'] <= time.time()
+    assert get_health(None)['status'] == 'healthy'
+
+def test_no_syncs_yet(health):
+    body = get_health(None)
+    assert body['status'] == 'healthy'
+    assert body['accounts']['alpha'] == {'last_success_age': None, 'last_error': None}
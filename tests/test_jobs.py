@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+import app
+from jobs import FAILED, SUCCEEDED, JobFailed, JobQueue, report_progress
+from rate_limit import RateLimitExceeded
+
+def blocking_job(result='done'):
+    """A job that runs until released, so others can be submitted while it's in flight"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def func():
+        started.set()
+        release.wait(5)
+        return result
+
+    return func, started, release
+
+def test_submit_coalesces_a_job_in_flight():
+    jobs = JobQueue()
+    func, started, release = blocking_job()
+    first, coalesced = jobs.submit('sync', func)
+    assert not coalesced
+    started.wait(5)
+
+    second, coalesced = jobs.submit('sync', lambda: 'never runs')
+    assert coalesced and second is first
+    assert jobs.in_flight() == [first]
+
+    release.set()
+    assert first.wait(5)
+    assert first.status == SUCCEEDED and first.result == 'done'
+    assert jobs.in_flight() == []
+
+    # Once finished, the next submit starts a new job
+    third, coalesced = jobs.submit('sync', lambda: 'again')
+    assert not coalesced and third is not first
+    assert third.wait(5) and third.result == 'again'
+
+def test_other_kinds_queue_behind_and_run_in_order():
+    jobs = JobQueue()
+    order = []
+    func, started, release = blocking_job()
+    sync, _ = jobs.submit('sync', lambda: order.append('sync') or func())
+    started.wait(5)
+    refresh, coalesced = jobs.submit('refresh', lambda: order.append('refresh'))
+    assert not coalesced
+    assert refresh.status == 'queued'
+
+    release.set()
+    assert refresh.wait(5)
+    assert order == ['sync', 'refresh']
+
+def test_run_raises_with_the_retry_after():
+    jobs = JobQueue()
+
+    def rate_limited():
+        raise RateLimitExceeded('GET /2/users/:id/tweets', reset_at=0)
+
+    with pytest.raises(JobFailed) as raised:
+        jobs.run('sync', rate_limited)
+    assert raised.value.job.status == FAILED
+    assert raised.value.retry_after == 0
+    assert 'Rate limit exhausted' in raised.value.job.to_dict()['error']
+
+def test_progress_is_reported_on_the_running_job():
+    jobs = JobQueue()
+
+    def func():
+        report_progress(stage='writing', tweets=3)
+        return 3
+
+    job, _ = jobs.submit('sync', func)
+    assert job.wait(5) and job.result == 3
+    assert job.progress == {'stage': 'writing', 'tweets': 3}
+    # Outside a job it does nothing
+    report_progress(stage='ignored')
+
+def test_finished_jobs_are_pruned():
+    jobs = JobQueue(max_finished=2)
+    ids = [jobs.submit(f'job{i}', lambda: None)[0] for i in range(4)]
+    for job in ids:
+        job.wait(5)
+    assert [jobs.get(job.id) for job in ids[:2]] == [None, None]
+    assert jobs.get(ids[-1].id) is ids[-1]
+
+def test_manual_sync_joins_the_sync_in_flight(monkeypatch):
+    func, started, release = blocking_job(result={})
+    monkeypatch.setattr(app, 'job_queue', JobQueue())
+    monkeypatch.setattr(app, 'leader_lock', None)
+    monkeypatch.setattr(app, 'sync_all_accounts', func)
+    client = app.app.test_client()
+
+    first = client.get('/sync')
+    started.wait(5)
+    second = client.get('/sync')
+    assert (first.status_code, second.status_code) == (202, 202)
+    assert first.get_json()['coalesced'] is False
+    assert second.get_json()['coalesced'] is True
+    assert second.get_json()['job_id'] == first.get_json()['job_id']
+
+    release.set()
+    app.job_queue.get(first.get_json()['job_id']).wait(5)
+    assert client.get(first.get_json()['status_url']).get_json()['status'] == SUCCEEDED
@@ -0,0 +1,159 @@
+import json
+import socket
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import app
+import fake_backends
+from benchmark_sync import seed_history
+from fake_backends import make_tweets
+from journal import SheetJournal
+from sheet_plan import delete_rows_request
+
+def sheet_ids(spreadsheet):
+    return [row[app.TWEET_ID_COLUMN] for row in spreadsheet.tabs['posts'][1:]]
+
+def test_pending_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = SheetJournal(path)
+    first = journal.plan('values.batchUpdate', {'spreadsheetId': 's'})
+    second = journal.plan('batchUpdate', {'spreadsheetId': 's'}, guard=('posts!U2', '7'))
+    journal.commit(first)
+    with open(path, 'a') as f:
+        f.write('{"op": "pla')  # Torn by a crash mid-append
+
+    reloaded = SheetJournal(path)
+    assert [entry['seq'] for entry in reloaded.pending()] == [second['seq']]
+    assert reloaded.pending()[0]['guard'] == ['posts!U2', '7']
+    assert reloaded.plan('batchUpdate', {})['seq'] == second['seq'] + 1
+
+def test_compacted_journal_keeps_numbering(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = SheetJournal(str(path), max_bytes=0)
+    entry = journal.plan('batchUpdate', {})
+    journal.commit(entry)
+    assert not path.exists()
+    assert journal.plan('batchUpdate', {})['seq'] == entry['seq'] + 1
+
+def test_sync_failing_partway_is_replayed(fake_app, monkeypatch):
+    account, twitter, spreadsheet = fake_app
+    tweets = make_tweets(9)
+    seed_history(app.get_sheets_service(), tweets[:3], account)
+    twitter.__init__(tweets)
+    monkeypatch.setattr(app, 'PAGE_SIZE', 2)
+    monkeypatch.setattr(app, 'WRITE_RETRY_DELAY', 0)
+
+    # The second page's write keeps getting 503s until the outage ends
+    failing_id = str(tweets[-3].id)
+    outage = {'on': True, 'failures': 0}
+    execute = fake_backends.FakeRequest.execute
+
+    def flaky_execute(request, **kwargs):
+        if outage['on'] and request._name == 'sheets.batchUpdate' and failing_id in json.dumps(request._payload):
+            outage['failures'] += 1
+            raise HttpError(httplib2.Response({'status': 503}), b'Service unavailable')
+        return execute(request, **kwargs)
+
+    monkeypatch.setattr(fake_backends.FakeRequest, 'execute', flaky_execute)
+
+    try:
+        app.sync_tweets_to_sheets(account)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError('the sync should have failed')
+    assert outage['failures'] == app.WRITE_ATTEMPTS
+    (entry,) = app.get_journal(account).pending()
+    # The first page made it; the second is stored locally and journaled
+    assert sheet_ids(spreadsheet) == [str(t.id) for t in tweets[:6:-1] + tweets[:3][::-1]]
+    assert app.get_store(account).count() == 7
+
+    outage['on'] = False
+    app.sync_tweets_to_sheets(account)
+    assert app.get_journal(account).pending() == []
+    assert sheet_ids(spreadsheet) == [str(t.id) for t in tweets[::-1]]
+
+def test_guard_skips_an_applied_write(fake_app):
+    account, _, spreadsheet = fake_app
+    tweets = make_tweets(3)
+    seed_history(app.get_sheets_service(), tweets[:2], account)
+    row = app.build_rows([tweets[2]], account=account)
+    body = app.plan_insert_rows(spreadsheet.sheet_ids['posts'], row, start_row=1)
+    params = {'spreadsheetId': account.spreadsheet_id, 'body': body}
+
+    journal = app.get_journal(account)
+    entry = journal.plan('batchUpdate', params, guard=(account.a1('U2'), row[0][app.TWEET_ID_COLUMN]))
+    # Applied, but the commit mark never reached the journal
+    app.get_sheets_service().spreadsheets().batchUpdate(**params).execute()
+
+    reloaded = SheetJournal(journal.path)
+    assert [pending['seq'] for pending in reloaded.pending()] == [entry['seq']]
+    assert app.replay_journal(account) == 1
+    assert journal.pending() == []
+    assert sheet_ids(spreadsheet) == [str(t.id) for t in tweets[::-1]]
+
+def fail_after_apply(monkeypatch, name):
+    """Make the next request called name apply, then time out before the response arrives"""
+    calls = {'failed': 0, 'sent': 0}
+    execute = fake_backends.FakeRequest.execute
+
+    def flaky_execute(request, **kwargs):
+        if request._name != name:
+            return execute(request, **kwargs)
+        calls['sent'] += 1
+        result = execute(request, **kwargs)
+        if not calls['failed']:
+            calls['failed'] += 1
+            raise socket.timeout('timed out')
+        return result
+
+    monkeypatch.setattr(fake_backends.FakeRequest, 'execute', flaky_execute)
+    return calls
+
+def test_retry_checks_the_guard_after_a_lost_response(fake_app, monkeypatch):
+    account, twitter, spreadsheet = fake_app
+    tweets = make_tweets(9)
+    seed_history(app.get_sheets_service(), tweets[:3], account)
+    twitter.__init__(tweets)
+    monkeypatch.setattr(app, 'WRITE_RETRY_DELAY', 0)
+    calls = fail_after_apply(monkeypatch, 'sheets.batchUpdate')
+
+    assert app.sync_tweets_to_sheets(account) == 6
+    assert calls['failed'] == 1
+    assert app.get_journal(account).pending() == []
+    assert sheet_ids(spreadsheet) == [str(t.id) for t in tweets[::-1]]
+
+def test_unguarded_write_is_not_sent_twice(fake_app, monkeypatch):
+    account, _, spreadsheet = fake_app
+    spreadsheet.tabs['posts'] = [list(app.HEADERS), ['a'], ['b']]
+    monkeypatch.setattr(app, 'WRITE_RETRY_DELAY', 0)
+    calls = fail_after_apply(monkeypatch, 'sheets.batchUpdate')
+    params = {'spreadsheetId': account.spreadsheet_id, 'body': {'requests': [
+        delete_rows_request(spreadsheet.sheet_ids['posts'], 1, 2)
+    ]}}
+
+    with pytest.raises(socket.timeout):
+        app.journaled_write('batchUpdate', params, account=account)
+    assert calls['sent'] == 1
+    assert len(app.get_journal(account).pending()) == 1
+
+    # Replaying it could delete another row, so it's dropped
+    assert app.replay_journal(account) == 1
+    assert calls['sent'] == 1
+    assert app.get_journal(account).pending() == []
+    assert spreadsheet.tabs['posts'][1:] == [['b']]
+
+def test_idempotent_write_is_retried(fake_app, monkeypatch):
+    account, _, spreadsheet = fake_app
+    monkeypatch.setattr(app, 'WRITE_RETRY_DELAY', 0)
+    calls = fail_after_apply(monkeypatch, 'sheets.values.batchUpdate')
+    params = {'spreadsheetId': account.spreadsheet_id, 'body': {'valueInputOption': 'RAW', 'data': [
+        {'range': account.a1('A1:B1'), 'values': [['x', 'y']]}
+    ]}}
+
+    app.journaled_write('values.batchUpdate', params, account=account, idempotent=True)
+    assert calls['sent'] == 2
+    assert app.get_journal(account).pending() == []
+    assert spreadsheet.tabs['posts'][0][:2] == ['x', 'y']
@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import app
+from leader import LeaderLock
+
+@pytest.fixture
+def lock_path(tmp_path):
+    return str(tmp_path / 'scheduler.lock')
+
+def test_only_one_worker_leads(lock_path):
+    leader, follower = LeaderLock(lock_path), LeaderLock(lock_path)
+    assert leader.try_acquire()
+    assert leader.try_acquire()  # Already held
+    assert not follower.try_acquire()
+    assert leader.is_leader and not follower.is_leader
+
+    leader.publish({'url': 'http://127.0.0.1:1234'})
+    assert follower.current_leader() == {'url': 'http://127.0.0.1:1234'}
+    with pytest.raises(RuntimeError):
+        follower.publish({'url': 'elsewhere'})
+
+    # A follower takes over once the leader lets go, and the old info is ignored
+    leader.release()
+    assert follower.current_leader() is None
+    assert follower.try_acquire()
+    follower.release()
+
+def test_lock_is_freed_when_the_leader_process_dies(lock_path):
+    script = (
+        'import sys, time\n'
+        'from leader import LeaderLock\n'
+        f'lock = LeaderLock({lock_path!r})\n'
+        'assert lock.try_acquire()\n'
+        "lock.publish({'pid': 1})\n"
+        "print('leading', flush=True)\n"
+        'time.sleep(60)\n'
+    )
+    process = subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE, text=True,
+                               cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        assert process.stdout.readline().strip() == 'leading'
+        follower = LeaderLock(lock_path)
+        assert not follower.try_acquire()
+        assert follower.current_leader() == {'pid': 1}
+    finally:
+        process.kill()
+        process.wait()
+        process.stdout.close()
+
+    assert follower.try_acquire()
+    follower.release()
+
+class LeaderHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({'path': self.path, 'served_by': 'leader'}).encode()
+        self.send_response(202)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_follower_forwards_job_requests(lock_path, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), LeaderHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    leader = LeaderLock(lock_path)
+    assert leader.try_acquire()
+    leader.publish({'url': f'http://127.0.0.1:{server.server_address[1]}'})
+    monkeypatch.setattr(app, 'leader_lock', LeaderLock(lock_path))
+    try:
+        response = app.app.test_client().get('/sync?account=team')
+    finally:
+        server.shutdown()
+        server.server_close()
+        leader.release()
+
+    assert response.status_code == 202
+    assert response.get_json() == {'path': '/sync?account=team', 'served_by': 'leader'}
+
+def test_follower_without_a_leader_asks_to_retry(lock_path, monkeypatch):
+    monkeypatch.setattr(app, 'leader_lock', LeaderLock(lock_path))
+    response = app.app.test_client().get('/sync')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app.LEADER_POLL_SECONDS)
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+
+import app
+from fake_backends import make_tweets
+from features import index_media, media_counts
+
+HAS_IMAGE = app.HEADERS.index('Has Image')
+
+def test_index_media():
+    media = [SimpleNamespace(media_key='3_1', type='photo'), SimpleNamespace(media_key='7_2', type='video')]
+    assert index_media(media) == {'3_1': 'photo', '7_2': 'video'}
+    assert index_media(None) == {}
+
+@pytest.mark.parametrize('types, expected', [
+    (['photo', 'photo'], (2, 'FALSE')),
+    (['video'], (0, 'TRUE')),
+    (['animated_gif', 'photo'], (1, 'TRUE')),
+    ([None], (1, 'POSSIBLE')),
+    ([None, 'video'], (1, 'TRUE'))
+])
+def test_media_counts(types, expected):
+    keys = [f'key{i}' for i in range(len(types))]
+    known = {key: media_type for key, media_type in zip(keys, types) if media_type}
+    assert media_counts(keys, known) == expected
+
+def media_columns(row):
+    return row[HAS_IMAGE:HAS_IMAGE + 3]
+
+def expected_columns(tweet):
+    types = [item.type for item in tweet.media]
+    images = types.count('photo')
+    video = 'TRUE' if set(types) & {'video', 'animated_gif'} else 'FALSE'
+    return ['TRUE' if images else 'FALSE', images, video]
+
+def test_media_comes_with_the_timeline_page(fake_app):
+    account, twitter, _ = fake_app
+    tweets = make_tweets(40)
+    twitter.__init__(tweets, twitter.recorder)
+
+    ((page, media_types, _),) = app.iter_tweet_pages(account=account, max_pages=1)
+    rows = app.build_rows(page, account=account, media_types=media_types)
+
+    # No lookups beyond the timeline call itself
+    assert dict(twitter.recorder.calls) == {'twitter.get_users_tweets': 1}
+    with_media = [(tweet, row) for tweet, row in zip(page, rows) if tweet.media]
+    assert with_media
+    for tweet, row in with_media:
+        assert media_columns(row) == expected_columns(tweet)
+
+def test_rebuilt_rows_use_the_cached_media_types(fake_app):
+    account, twitter, _ = fake_app
+    tweets = make_tweets(40)
+    twitter.__init__(tweets, twitter.recorder)
+    ((page, _, _),) = app.iter_tweet_pages(account=account, max_pages=1)
+    twitter.recorder.reset()
+
+    # e.g. a refresh or a projection, long after the page was fetched
+    rows = app.build_rows(page, account=account)
+    assert not twitter.recorder.calls
+    for tweet, row in zip(page, rows):
+        if tweet.media:
+            assert media_columns(row) == expected_columns(tweet)
@@ -0,0 +1,78 @@
+import pytest
+
+import app
+import clients
+from fake_backends import make_tweets
+from metadata_cache import MetadataCache
+
+NOW = 1700000000.0
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MetadataCache(str(tmp_path / 'metadata_cache.db'), max_entries=3, default_ttl=100)
+    yield cache
+    cache.close()
+
+def test_values_expire_after_their_ttl(cache):
+    cache.put('user_id', 'ashebytes', '1237140914558164992', now=NOW)
+    cache.put('tweet', '1', {'text': 'hello', 'author_id': None}, ttl=10, now=NOW)
+
+    assert cache.get('user_id', 'ashebytes', now=NOW + 99) == '1237140914558164992'
+    assert cache.get('tweet', '1', now=NOW + 5) == {'text': 'hello', 'author_id': None}
+    assert cache.get('tweet', '1', now=NOW + 10) is None
+    assert cache.get('user_id', 'ashebytes', now=NOW + 100) is None
+    assert cache.stats(now=NOW + 50) == {'user_id': {'entries': 1, 'expired': 0},
+                                         'tweet': {'entries': 1, 'expired': 1}}
+
+def test_namespaces_are_separate(cache):
+    cache.put('user_id', '1', 'a', now=NOW)
+    cache.put('tweet', 1, 'b', now=NOW)
+    assert cache.get_many('user_id', ['1', '2'], now=NOW) == {'1': 'a'}
+    assert cache.get('tweet', '1', now=NOW) == 'b'
+    cache.delete('tweet', 1)
+    assert cache.get('tweet', '1', now=NOW) is None
+
+def test_least_recently_used_entries_go_first(cache):
+    for i, key in enumerate('abc'):
+        cache.put('tweet', key, key, now=NOW + i)
+    # Reading 'a' makes 'b' the least recently used
+    assert cache.get('tweet', 'a', now=NOW + 10) == 'a'
+    cache.put('tweet', 'd', 'd', now=NOW + 11)
+    assert cache.get_many('tweet', 'abcd', now=NOW + 12) == {'a': 'a', 'c': 'c', 'd': 'd'}
+
+def test_expired_entries_are_evicted_before_live_ones(cache):
+    cache.put('tweet', 'old', 'x', ttl=1, now=NOW)
+    cache.put('tweet', 'a', 'a', now=NOW + 1)
+    cache.put('tweet', 'b', 'b', now=NOW + 2)
+    cache.put('tweet', 'c', 'c', now=NOW + 3)
+    assert cache.stats(now=NOW + 3) == {'tweet': {'entries': 3, 'expired': 0}}
+    assert cache.get_many('tweet', 'abc', now=NOW + 3) == {'a': 'a', 'b': 'b', 'c': 'c'}
+
+def test_large_lookups_are_chunked(tmp_path):
+    cache = MetadataCache(str(tmp_path / 'cache.db'))
+    cache.put_many('tweet', {str(i): i for i in range(0, 1200, 2)}, now=NOW)
+    found = cache.get_many('tweet', [str(i) for i in range(1200)], now=NOW)
+    assert found == {str(i): i for i in range(0, 1200, 2)}
+    cache.close()
+
+def test_user_id_is_looked_up_once(fake_app):
+    _, twitter, _ = fake_app
+    assert clients.lookup_user_id('@AsheBytes') == clients.USER_ID
+    assert clients.lookup_user_id('ashebytes') == clients.USER_ID
+    assert twitter.recorder.calls['twitter.get_user'] == 1
+
+def test_referenced_tweets_come_from_the_page_includes(fake_app):
+    account, twitter, _ = fake_app
+    tweets = make_tweets(50)
+    twitter.__init__(tweets, twitter.recorder)
+    app.sync_tweets_to_sheets(account)
+
+    replies = [t for t in tweets if t.referenced_tweets]
+    assert replies
+    references = app.get_referenced_tweets([str(t.id) for t in tweets])
+    assert set(references) == {str(t.id) for t in replies}
+    for tweet in replies:
+        (ref,) = references[str(tweet.id)]
+        assert ref['type'] == tweet.referenced_tweets[0].type
+        assert ref['text'] == tweet.referenced[0].text
+    assert twitter.recorder.calls['twitter.get_tweets'] == 0
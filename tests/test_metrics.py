@@ -0,0 +1,100 @@
+import json
+from unittest import mock
+
+import pytest
+
+import app
+import clients
+import metrics
+from fake_backends import make_tweets
+
+@pytest.fixture
+def registry(monkeypatch):
+    """An empty registry, so test metrics don't show up in the app's /metrics"""
+    monkeypatch.setattr(metrics, '_registry', [])
+
+def test_counter_and_gauge_render(registry):
+    calls = metrics.Counter('test_calls_total', 'Calls', ['api', 'status'])
+    calls.inc(api='sheets', status=429)
+    calls.inc(2, api='sheets', status=200)
+    metrics.Gauge('test_age_seconds', 'Age', ['account'], function=lambda: {('alpha',): 1.5})
+
+    assert calls.value(api='sheets', status=429) == 1
+    assert metrics.render().splitlines() == [
+        '# HELP test_calls_total Calls',
+        '# TYPE test_calls_total counter',
+        'test_calls_total{api="sheets",status="200"} 2',
+        'test_calls_total{api="sheets",status="429"} 1',
+        '# HELP test_age_seconds Age',
+        '# TYPE test_age_seconds gauge',
+        'test_age_seconds{account="alpha"} 1.5'
+    ]
+    with pytest.raises(ValueError):
+        calls.inc(api='sheets')
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = metrics.Histogram('test_seconds', 'Latency', buckets=(0.1, 1))
+    for seconds in (0.05, 0.5, 0.7, 3):
+        latency.observe(seconds)
+    lines = latency.render()[2:]
+    assert lines == [
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        'test_seconds_sum 4.25',
+        'test_seconds_count 4'
+    ]
+
+def test_label_values_are_escaped():
+    assert metrics.format_labels(['message'], ['say "hi"\n']) == '{message="say \\"hi\\"\\n"}'
+
+def test_stages_are_traced(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    metrics.set_trace_log(str(path))
+    try:
+        with metrics.stage('fetch', account='alpha'):
+            pass
+        with pytest.raises(RuntimeError), metrics.stage('write'):
+            raise RuntimeError('boom')
+    finally:
+        metrics.set_trace_log(None)
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(e['stage'], e['outcome']) for e in events] == [('fetch', 'ok'), ('write', 'error')]
+    assert events[0]['account'] == 'alpha'
+
+@pytest.mark.parametrize('uri, method, operation', [
+    ('https://sheets.googleapis.com/v4/spreadsheets/abc?fields=sheets', 'GET', 'get'),
+    ('https://sheets.googleapis.com/v4/spreadsheets/abc:batchUpdate', 'POST', 'batchUpdate'),
+    ('https://sheets.googleapis.com/v4/spreadsheets/abc/values:batchGet?ranges=A1', 'GET', 'values.batchGet'),
+    ('https://sheets.googleapis.com/v4/spreadsheets/abc/values/posts%21A%3AV:append', 'POST', 'values.append'),
+    ('https://sheets.googleapis.com/v4/spreadsheets/abc/values/posts%21U2', 'GET', 'values.get')
+])
+def test_sheets_operation(uri, method, operation):
+    assert clients.sheets_operation(uri, method) == operation
+
+def test_api_call_counts_statuses():
+    before = metrics.API_REQUESTS.value(api='sheets', operation='test', status=429)
+    with metrics.api_call('sheets', 'test') as call:
+        call['status'] = 429
+    with pytest.raises(OSError), metrics.api_call('sheets', 'test'):
+        raise OSError('connection reset')
+
+    assert metrics.API_REQUESTS.value(api='sheets', operation='test', status=429) == before + 1
+    assert metrics.API_REQUESTS.value(api='sheets', operation='test', status='error') >= 1
+
+def test_sync_is_counted_and_exposed(fake_app):
+    account, twitter, _ = fake_app
+    twitter.__init__(make_tweets(5), twitter.recorder)
+    rows_before = metrics.ROWS_WRITTEN.value(account=account.name, source='sync')
+
+    app.sync_tweets_to_sheets(account)
+    assert metrics.ROWS_WRITTEN.value(account=account.name, source='sync') == rows_before + 5
+
+    with mock.patch.object(app, 'leader_lock', None):
+        response = app.app.test_client().get('/metrics')
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert f'tweet_sync_syncs_total{{account="{account.name}",outcome="ok"}}' in body
+    assert f'tweet_sync_last_success_age_seconds{{account="{account.name}"}}' in body
+    assert 'tweet_sync_stage_seconds_count{stage="update_spreadsheet",outcome="ok"}' in body
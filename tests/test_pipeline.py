@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+import app
+from fake_backends import make_tweets
+from pipeline import prefetch
+
+def test_items_keep_their_order():
+    assert list(prefetch(iter(range(100)), depth=3)) == list(range(100))
+
+def test_slow_consumer_holds_back_the_producer():
+    produced = []
+
+    def pages():
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    items = prefetch(pages(), depth=2)
+    assert next(items) == 0
+    time.sleep(0.3)
+    # The queue holds depth items, plus the one the producer is waiting to put
+    assert len(produced) <= 1 + 2 + 1
+    assert list(items) == list(range(1, 20))
+
+def test_producer_error_reaches_the_consumer():
+    def pages():
+        yield 1
+        raise RuntimeError('Twitter API returned 503')
+
+    items = prefetch(pages())
+    assert next(items) == 1
+    with pytest.raises(RuntimeError, match='503'):
+        next(items)
+
+def test_stopping_early_closes_the_producer():
+    closed = threading.Event()
+
+    def pages():
+        try:
+            for i in range(1000):
+                yield i
+        finally:
+            closed.set()
+
+    for item in prefetch(pages(), depth=1):
+        if item == 2:
+            break
+    assert closed.wait(timeout=5)
+
+def test_interrupted_sync_resumes_from_its_checkpoint(fake_app, monkeypatch):
+    account, twitter, spreadsheet = fake_app
+    monkeypatch.setattr(app, 'PAGE_SIZE', 2)
+    tweets = make_tweets(9)
+    twitter.__init__(tweets, twitter.recorder)
+    # Synced up to the third tweet before
+    app.update_spreadsheet(tweets[:3][::-1], account=account)
+
+    update_spreadsheet = app.update_spreadsheet
+    pages_written = []
+
+    def fail_third_page(page, **kwargs):
+        if len(pages_written) == 2:
+            return False
+        pages_written.append(page)
+        return update_spreadsheet(page, **kwargs)
+    monkeypatch.setattr(app, 'update_spreadsheet', fail_third_page)
+
+    with pytest.raises(RuntimeError):
+        app.sync_tweets_to_sheets(account)
+    state = app.load_sync_state(account)
+    assert state == {'since_id': str(tweets[2].id), 'pagination_token': '4'}
+
+    monkeypatch.setattr(app, 'update_spreadsheet', update_spreadsheet)
+    twitter.recorder.reset()
+    assert app.sync_tweets_to_sheets(account) == 2
+    assert app.load_sync_state(account) is None
+    # Only the missing page is fetched again, then a check for anything newer
+    assert twitter.recorder.calls['twitter.get_users_tweets'] == 2
+    assert [row[app.TWEET_ID_COLUMN] for row in spreadsheet.tabs['posts'][1:]] == [str(t.id) for t in tweets[::-1]]
@@ -0,0 +1,92 @@
+import pytest
+
+import rate_limit
+from rate_limit import QuotaBucket, RateLimitExceeded, RateLimitTracker, endpoint_key
+
+class FakeClock:
+    """Stands in for the time module; sleeping just moves the clock forward"""
+
+    def __init__(self, now=1700000000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, 'time', clock)
+    return clock
+
+def headers(remaining, reset_at, limit=900):
+    return {'x-rate-limit-limit': str(limit), 'x-rate-limit-remaining': str(remaining),
+            'x-rate-limit-reset': str(int(reset_at))}
+
+def test_endpoint_key_replaces_ids():
+    assert endpoint_key('get', '/2/users/1237140914558164992/tweets') == 'GET /2/users/:id/tweets'
+    assert endpoint_key('GET', '/2/tweets') == 'GET /2/tweets'
+
+def test_calls_are_reserved_against_the_budget(clock):
+    tracker = RateLimitTracker()
+    tracker.update('GET /2/tweets', headers(2, clock.now + 600))
+
+    tracker.acquire('GET /2/tweets')
+    tracker.acquire('GET /2/tweets')
+    assert tracker.budget()['GET /2/tweets']['remaining'] == 0
+    with pytest.raises(RateLimitExceeded) as raised:
+        tracker.acquire('GET /2/tweets')
+    assert raised.value.retry_after == 600
+    assert clock.slept == []
+
+def test_short_waits_sleep_until_the_reset(clock):
+    tracker = RateLimitTracker(max_wait=60)
+    tracker.exhaust('GET /2/tweets', clock.now + 30)
+
+    tracker.acquire('GET /2/tweets')
+    assert clock.slept == [30 + rate_limit.RESET_MARGIN]
+    # The window has reset, so the endpoint is unknown again
+    assert tracker.budget() == {}
+
+def test_waiting_raises_the_limit_for_this_thread(clock):
+    tracker = RateLimitTracker(max_wait=60)
+    tracker.exhaust('GET /2/tweets', clock.now + 900)
+    with tracker.waiting(900 + rate_limit.RESET_MARGIN):
+        tracker.acquire('GET /2/tweets')
+    assert clock.slept == [900 + rate_limit.RESET_MARGIN]
+
+    tracker.exhaust('GET /2/tweets', clock.now + 900)
+    with pytest.raises(RateLimitExceeded):
+        tracker.acquire('GET /2/tweets')
+
+def test_budget_survives_a_restart(clock, tmp_path):
+    path = str(tmp_path / 'rate_limits.json')
+    RateLimitTracker(path).update('GET /2/tweets', headers(5, clock.now + 300))
+    assert RateLimitTracker(path).budget()['GET /2/tweets']['remaining'] == 5
+
+def test_missing_headers_are_ignored(clock):
+    tracker = RateLimitTracker()
+    tracker.update('GET /2/tweets', {'content-type': 'application/json'})
+    assert tracker.budget() == {}
+
+def test_quota_bucket_spreads_calls_over_the_minute(clock):
+    bucket = QuotaBucket(per_minute=60)
+    for _ in range(60):
+        bucket.acquire()
+    assert clock.slept == []
+    assert bucket.available() == 0
+
+    bucket.acquire()
+    assert clock.slept == [pytest.approx(1.0)]
+
+    clock.now += 30
+    assert bucket.available() == 30
+    clock.now += 600
+    assert bucket.available() == 60
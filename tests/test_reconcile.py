@@ -0,0 +1,110 @@
+import socket
+
+import app
+import fake_backends
+from benchmark_sync import seed_history
+from fake_backends import make_tweets
+from reconcile import plan_reconcile, reconcile_requests
+
+def apply_requests(sheet, requests):
+    """Apply deleteDimension / insertDimension / updateCells to a list of one-cell rows"""
+    sheet = list(sheet)
+    for request in requests:
+        if 'deleteDimension' in request:
+            span = request['deleteDimension']['range']
+            del sheet[span['startIndex']:span['endIndex']]
+        elif 'insertDimension' in request:
+            span = request['insertDimension']['range']
+            sheet[span['startIndex']:span['startIndex']] = [None] * (span['endIndex'] - span['startIndex'])
+        else:
+            update = request['updateCells']
+            start = update['start']['rowIndex']
+            for offset, row in enumerate(update['rows']):
+                sheet[start + offset] = row['values'][0]['userEnteredValue']['stringValue']
+    return sheet
+
+def reconcile(sheet_ids, stored_ids, **kwargs):
+    """Plan against a newest-first sheet with a header, apply it, and return (plan, resulting IDs)"""
+    plan = plan_reconcile([[tweet_id] if tweet_id else [] for tweet_id in sheet_ids], stored_ids, **kwargs)
+    rows_by_id = {tweet_id: [tweet_id] for tweet_id in plan.missing}
+    sheet = apply_requests(['Tweet ID'] + list(sheet_ids), reconcile_requests(0, plan, rows_by_id))
+    return plan, sheet[1:]
+
+def test_consistent_sheet_has_empty_plan():
+    ids = ['50', '40', '30', '20', '10']
+    plan = plan_reconcile([[tweet_id] for tweet_id in ids], ids)
+    assert plan.empty
+    assert plan.missing == []
+    assert plan.summary() == {'duplicates': 0, 'blank_rows': 0, 'unknown': 0, 'missing': 0,
+                              'rows_deleted': 0, 'rows_inserted': 0}
+    assert reconcile_requests(0, plan, {}) == []
+
+def test_duplicates_keep_the_first_copy():
+    plan, sheet = reconcile(['50', '40', '40', '30', '50', '20'], ['50', '40', '30', '20'])
+    assert plan.duplicates == 2
+    # Row numbers are zero-based sheet rows below the header
+    assert plan.deletes == [(3, 4), (5, 6)]
+    assert sheet == ['50', '40', '30', '20']
+
+def test_blank_rows_are_deleted():
+    plan, sheet = reconcile(['50', '', '', '40', ' '], ['50', '40'])
+    assert plan.blanks == 3
+    assert plan.deletes == [(2, 4), (5, 6)]
+    assert sheet == ['50', '40']
+
+def test_missing_rows_are_inserted_in_order():
+    plan, sheet = reconcile(['50', '30', '10'], ['60', '50', '40', '30', '20', '10', '5'])
+    assert plan.missing == ['60', '40', '20', '5']
+    assert plan.inserts == [(1, ['60']), (2, ['40']), (3, ['20']), (4, ['5'])]
+    assert sheet == ['60', '50', '40', '30', '20', '10', '5']
+
+def test_everything_at_once():
+    plan, sheet = reconcile(['50', '', '50', '30', '25', '10'], ['50', '40', '30', '20', '10'])
+    assert (plan.duplicates, plan.blanks, plan.unknown) == (1, 1, 1)
+    # Unknown IDs stay unless pruning
+    assert sheet == ['50', '40', '30', '25', '20', '10']
+
+def test_prune_unknown():
+    plan, sheet = reconcile(['50', '99', '40'], ['50', '40'], prune_unknown=True)
+    assert plan.unknown == 1
+    assert sheet == ['50', '40']
+
+def test_unsorted_sheet_gets_missing_rows_at_the_bottom():
+    plan, sheet = reconcile(['10', '50', '30'], ['10', '50', '40', '30'])
+    assert plan.inserts == [(4, ['40'])]
+    assert sheet == ['10', '50', '30', '40']
+
+def test_append_layout_adds_missing_rows_at_the_bottom():
+    plan, sheet = reconcile(['10', '30'], ['10', '20', '30'], newest_first=False)
+    assert plan.inserts == [(3, ['20'])]
+    assert sheet == ['10', '30', '20']
+
+def test_retry_plans_again_after_a_lost_response(fake_app, monkeypatch):
+    account, _, spreadsheet = fake_app
+    tweets = make_tweets(6)
+    seed_history(app.get_sheets_service(), tweets, account)
+    rows = spreadsheet.tabs['posts']
+    # Rows 2 and 4 duplicated, row 5 missing
+    spreadsheet.tabs['posts'] = rows[:3] + [list(rows[2])] + rows[3:5] + [list(rows[4])] + rows[6:]
+    monkeypatch.setattr(app, 'WRITE_RETRY_DELAY', 0)
+
+    # The fix is applied but the response times out
+    calls = {'sent': 0}
+    execute = fake_backends.FakeRequest.execute
+
+    def flaky_execute(request, **kwargs):
+        result = execute(request, **kwargs)
+        if request._name == 'sheets.batchUpdate':
+            calls['sent'] += 1
+            if calls['sent'] == 1:
+                raise socket.timeout('timed out')
+        return result
+
+    monkeypatch.setattr(fake_backends.FakeRequest, 'execute', flaky_execute)
+
+    summary = app.reconcile_sheet(account=account)
+    # The second read found nothing left to fix, so nothing was sent again
+    assert calls['sent'] == 1
+    assert summary['duplicates'] == 0
+    assert app.get_journal(account).pending() == []
+    assert [row[app.TWEET_ID_COLUMN] for row in spreadsheet.tabs['posts'][1:]] == [str(t.id) for t in tweets[::-1]]
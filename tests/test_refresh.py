@@ -0,0 +1,71 @@
+import app
+from accounts import Account
+from fake_backends import make_tweets
+
+def test_diff_merges_adjacent_changes():
+    old = ['10', '2', '0', '5', '1', '300', '6.00%']
+    new = [10, 3, 1, 5, 1, 400, '6.00%']
+    assert app.diff_metric_cells(7, old, new, account=Account('alpha', 'sheet-a')) == [
+        {'range': 'posts!G7:H7', 'values': [[3, 1]]},
+        {'range': 'posts!K7', 'values': [[400]]}
+    ]
+
+def test_refresh_rewrites_only_changed_cells(fake_app, monkeypatch):
+    account, twitter, spreadsheet = fake_app
+    monkeypatch.setattr(app, 'LOOKUP_BATCH_SIZE', 4)
+    tweets = make_tweets(10)
+    twitter.__init__(tweets, twitter.recorder)
+    app.update_spreadsheet(tweets[::-1], account=account)
+    before = [list(row) for row in spreadsheet.tabs['posts']]
+
+    tweets[2].public_metrics = dict(tweets[2].public_metrics, like_count=tweets[2].public_metrics['like_count'] + 7)
+    twitter.recorder.reset()
+    sent = []
+    journaled_write = app.journaled_write
+
+    def record_write(kind, params, **kwargs):
+        sent.append((kind, params))
+        return journaled_write(kind, params, **kwargs)
+    monkeypatch.setattr(app, 'journaled_write', record_write)
+
+    updated = app.refresh_metrics(account=account)
+    # Likes, total engagements and engagement rate changed, in one write
+    assert updated == 3
+    assert twitter.recorder.calls['twitter.get_tweets'] == 3
+    # The summary tab is written after the refresh
+    (params,) = [params for kind, params in sent
+                 if kind == 'values.batchUpdate' and params['body']['data'][0]['range'].startswith('posts!')]
+    row = 1 + [t.id for t in tweets[::-1]].index(tweets[2].id)
+    assert [d['range'] for d in params['body']['data']] == [f'posts!F{row + 1}:G{row + 1}', f'posts!M{row + 1}']
+
+    after = spreadsheet.tabs['posts']
+    changed = [(r, c) for r, (old, new) in enumerate(zip(before, after))
+               for c, (a, b) in enumerate(zip(old, new)) if str(a) != str(b)]
+    assert [r for r, _ in changed] == [row] * 3
+
+def test_unchanged_metrics_send_no_write(fake_app):
+    account, twitter, _ = fake_app
+    tweets = make_tweets(5)
+    twitter.__init__(tweets, twitter.recorder)
+    app.update_spreadsheet(tweets[::-1], account=account)
+    twitter.recorder.reset()
+
+    assert app.refresh_metrics(account=account) == 0
+    assert twitter.recorder.calls['sheets.values.batchUpdate'] == 0
+    assert twitter.recorder.calls['sheets.batchUpdate'] == 0
+
+def test_max_rows_refreshes_the_newest(fake_app):
+    account, twitter, _ = fake_app
+    tweets = make_tweets(6)
+    twitter.__init__(tweets, twitter.recorder)
+    app.update_spreadsheet(tweets[::-1], account=account)
+    requested = []
+    get_tweets = twitter.get_tweets
+
+    def record_ids(ids, **kwargs):
+        requested.extend(ids)
+        return get_tweets(ids, **kwargs)
+    twitter.get_tweets = record_ids
+
+    app.refresh_metrics(max_rows=2, account=account)
+    assert sorted(requested) == sorted(str(t.id) for t in tweets[-2:])
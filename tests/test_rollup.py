@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from rollup import GROUPS, SKETCH_ACCURACY, QuantileSketch, Rollup, changed_cells
+
+np = pytest.importorskip('numpy')
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+def sample(count, seed):
+    rng = random.Random(seed)
+    # Engagement rates in percent: long-tailed, with some zeros
+    return [0.0 if rng.random() < 0.05 else rng.lognormvariate(0.5, 1.2) for _ in range(count)]
+
+def assert_close(sketch, values):
+    for q in QUANTILES:
+        # The sketch ranks like numpy's 'lower' method, then answers with its bucket's midpoint
+        expected = np.quantile(values, q, method='lower')
+        actual = sketch.quantile(q)
+        if expected == 0:
+            assert actual == 0
+        else:
+            assert abs(actual - expected) <= SKETCH_ACCURACY * expected * (1 + 1e-9), q
+
+def test_quantiles_within_relative_error():
+    values = sample(5000, seed=1)
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    assert sketch.count == len(values)
+    assert_close(sketch, values)
+
+def test_merge_matches_one_sketch_of_both():
+    left_values, right_values = sample(2000, seed=2), sample(3000, seed=3)
+    left, right, combined = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for value in left_values:
+        left.add(value)
+        combined.add(value)
+    for value in right_values:
+        right.add(value)
+        combined.add(value)
+
+    left.merge(right)
+    assert left.count == combined.count
+    assert left.zeros == combined.zeros
+    assert left.buckets == combined.buckets
+    assert_close(left, left_values + right_values)
+
+def test_removing_values_restores_the_sketch():
+    values = sample(500, seed=4)
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    for value in values[250:]:
+        sketch.add(value, -1)
+    assert sketch.count == 250
+    assert_close(sketch, values[:250])
+
+def test_empty_sketch():
+    assert QuantileSketch().quantile(0.5) is None
+
+def test_empty_rollup():
+    rollup = Rollup()
+    grid = rollup.grid()
+    assert rollup.tweets == 0
+    assert len(grid) == 1 + len(GROUPS)
+    for row in grid[1:]:
+        assert row[2:] == [0, 0, 0, 0, '', '', '']
+    assert Rollup.from_dict(rollup.to_dict()).grid() == grid
+    assert changed_cells(grid, Rollup.build([]).grid()) == []
+
+def row(day, period, engagements, impressions):
+    return ['2024-05-03', '09:00:00 ET', period, day, 'text', engagements] + [0] * 5 + [impressions]
+
+def test_rollup_update_and_merge():
+    rows = [row('Friday', 'Morning', 10, 1000), row('Friday', 'Evening', 30, 1000), row('Monday', 'Morning', 0, 0)]
+    built = Rollup.build([rows[:2], rows[2:]])
+
+    merged = Rollup.build([rows[:1]])
+    merged.merge(Rollup.build([rows[1:]]))
+    assert merged.grid() == built.grid()
+
+    overall = built.aggregates[('Overall', 'All tweets')]
+    assert (overall.count, overall.engagements, overall.impressions) == (3, 40, 2000)
+    assert built.aggregates[('Day of Week', 'Friday')].count == 2
+
+    # A refresh takes the old row out and puts the new one in
+    built.update(old_rows=[rows[0]], new_rows=[row('Friday', 'Morning', 20, 1000)])
+    assert overall.engagements == 50
+    assert overall.count == 3
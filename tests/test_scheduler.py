@@ -0,0 +1,123 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from scheduler import CronSchedule, Scheduler, parse_field
+
+EASTERN = pytz.timezone('US/Eastern')
+
+def utc(*args):
+    return datetime(*args, tzinfo=pytz.UTC)
+
+def test_parse_field():
+    assert parse_field('*/15', 0, 59) == {0, 15, 30, 45}
+    assert parse_field('1-5', 0, 6) == {1, 2, 3, 4, 5}
+    assert parse_field('0,30', 0, 59) == {0, 30}
+    with pytest.raises(ValueError):
+        parse_field('60', 0, 59)
+
+def test_next_after_is_strictly_later():
+    schedule = CronSchedule('0 6 * * *')
+    at_six = EASTERN.localize(datetime(2024, 1, 15, 6, 0))
+    assert schedule.next_after(at_six, EASTERN) == EASTERN.localize(datetime(2024, 1, 16, 6, 0))
+
+def test_next_after_keeps_wall_time_across_spring_forward():
+    schedule = CronSchedule('0 6 * * *')
+    # 06:00 EST on the Saturday, then 06:00 EDT on the Sunday the clocks go forward
+    first = schedule.next_after(utc(2024, 3, 9, 10, 0), EASTERN)
+    second = schedule.next_after(first, EASTERN)
+    assert first.astimezone(pytz.UTC) == utc(2024, 3, 9, 11, 0)
+    assert second.astimezone(pytz.UTC) == utc(2024, 3, 10, 10, 0)
+    assert second - first == timedelta(hours=23)
+
+def test_next_after_keeps_wall_time_across_fall_back():
+    schedule = CronSchedule('0 6 * * *')
+    first = schedule.next_after(utc(2024, 11, 2, 9, 0), EASTERN)
+    second = schedule.next_after(first, EASTERN)
+    assert first.astimezone(pytz.UTC) == utc(2024, 11, 2, 10, 0)
+    assert second.astimezone(pytz.UTC) == utc(2024, 11, 3, 11, 0)
+    assert second - first == timedelta(hours=25)
+
+def test_next_after_runs_a_skipped_wall_time_once():
+    # 02:30 doesn't exist on 2024-03-10 in US/Eastern; the run moves to 03:30 EDT
+    schedule = CronSchedule('30 2 * * *')
+    skipped = schedule.next_after(utc(2024, 3, 9, 12, 0), EASTERN)
+    assert skipped.astimezone(pytz.UTC) == utc(2024, 3, 10, 7, 30)
+    assert skipped.strftime('%H:%M %Z') == '03:30 EDT'
+    assert schedule.next_after(skipped, EASTERN) == EASTERN.localize(datetime(2024, 3, 11, 2, 30))
+
+def test_day_of_month_or_weekday():
+    # Like cron, restricting both day fields fires on either
+    schedule = CronSchedule('0 7 1 * 0')
+    sunday = schedule.next_after(EASTERN.localize(datetime(2024, 6, 25, 12, 0)), EASTERN)
+    first = schedule.next_after(sunday, EASTERN)
+    assert sunday.date() == datetime(2024, 6, 30).date()
+    assert first.date() == datetime(2024, 7, 1).date()
+
+class FixedClockScheduler(Scheduler):
+    def __init__(self, now, **kwargs):
+        self.fixed_now = now
+        super().__init__(**kwargs)
+
+    def now(self):
+        return self.fixed_now
+
+def write_state(path, **last_runs):
+    path.write_text(json.dumps({name: moment.timestamp() for name, moment in last_runs.items()}))
+
+def test_missed_deadline_is_caught_up_once(tmp_path):
+    state = tmp_path / 'scheduler_state.json'
+    now = EASTERN.localize(datetime(2024, 5, 3, 12, 0))
+    # Last ran two days ago, so at least one 06:00 deadline was missed
+    write_state(state, sync=now - timedelta(days=2))
+
+    runs = []
+    scheduler = FixedClockScheduler(now, timezone=EASTERN, state_path=str(state))
+    job = scheduler.add_job('sync', lambda: runs.append(scheduler.now()), '0 6 * * *')
+    assert job.next_run == now
+
+    due, wait = scheduler._pop_due()
+    assert due is job and wait == 0
+    assert scheduler._run(job) is None
+    scheduler._reschedule(job)
+
+    # One catch-up run, then back on schedule rather than once per missed day
+    assert runs == [now]
+    assert job.next_run == EASTERN.localize(datetime(2024, 5, 4, 6, 0))
+    assert json.loads(state.read_text())['sync'] == now.timestamp()
+    due, wait = scheduler._pop_due()
+    assert due is None and wait > 0
+
+def test_no_catch_up_when_nothing_was_missed(tmp_path):
+    state = tmp_path / 'scheduler_state.json'
+    now = EASTERN.localize(datetime(2024, 5, 3, 12, 0))
+    write_state(state, sync=EASTERN.localize(datetime(2024, 5, 3, 6, 0)))
+
+    scheduler = FixedClockScheduler(now, timezone=EASTERN, state_path=str(state))
+    job = scheduler.add_job('sync', lambda: None, '0 6 * * *')
+    assert job.next_run == EASTERN.localize(datetime(2024, 5, 4, 6, 0))
+
+def test_catch_up_can_be_turned_off(tmp_path):
+    state = tmp_path / 'scheduler_state.json'
+    now = EASTERN.localize(datetime(2024, 5, 3, 12, 0))
+    write_state(state, sync=now - timedelta(days=2))
+
+    scheduler = FixedClockScheduler(now, timezone=EASTERN, state_path=str(state))
+    job = scheduler.add_job('sync', lambda: None, '0 6 * * *', catch_up=False)
+    assert job.next_run == EASTERN.localize(datetime(2024, 5, 4, 6, 0))
+
+def test_failed_run_retries_before_next_deadline(tmp_path):
+    now = EASTERN.localize(datetime(2024, 5, 3, 12, 0))
+    scheduler = FixedClockScheduler(now, timezone=EASTERN)
+
+    def fail():
+        raise RuntimeError('Sheets API returned 503')
+
+    job = scheduler.add_job('sync', fail, '0 6 * * *', retry_delay=60)
+    assert scheduler._run(job) == 60
+    scheduler._reschedule(job, 60)
+    assert job.next_run == now + timedelta(seconds=60)
+    assert job.last_error == 'Sheets API returned 503'
+    assert job.last_run is None
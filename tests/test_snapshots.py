@@ -0,0 +1,69 @@
+from snapshots import DAY, HOUR, METRICS, WEEK, SnapshotStore, decode_series, decode_varints, encode_varints
+from tweet_store import snowflake_time
+
+# Snowflake IDs for tweets posted at known times
+EPOCH_MS = 1288834974657
+
+def tweet_id_at(posted_at):
+    return str((int(posted_at * 1000) - EPOCH_MS) << 22)
+
+def metrics(**values):
+    return {name: values.get(name, 0) for name in METRICS}
+
+def test_varints_round_trip():
+    values = [0, 1, -1, 63, -64, 64, -65, 127, 128, -128, 300, -300, 2 ** 31, -(2 ** 31), 2 ** 40, -(2 ** 40),
+              2 ** 62, -(2 ** 62)]
+    assert decode_varints(encode_varints(values)) == values
+
+def test_small_deltas_take_one_byte():
+    assert len(encode_varints([0, 1, -1, 63, -64])) == 5
+    assert len(encode_varints([64])) == 2
+
+def test_decode_series_accumulates_deltas():
+    posted_at = 1700000000
+    data = encode_varints([60] + [10, 1, 0, 0, 0, 5000]) + encode_varints([3600] + [-2, 0, 0, 1, 0, 2 ** 40])
+    assert decode_series(posted_at, data) == [
+        (posted_at + 60, [10, 1, 0, 0, 0, 5000]),
+        (posted_at + 3660, [8, 1, 0, 1, 0, 5000 + 2 ** 40])
+    ]
+
+def test_series_round_trip_with_falling_metrics(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    posted_at = 1700000000
+    tweet_id = tweet_id_at(posted_at)
+    assert int(snowflake_time(tweet_id).timestamp()) == posted_at
+
+    readings = [metrics(like_count=5, impression_count=2 ** 40),
+                metrics(like_count=3, impression_count=2 ** 40 + 7),  # Unliked
+                metrics(like_count=900, retweet_count=4, impression_count=2 ** 41)]
+    for hour, reading in enumerate(readings, start=1):
+        assert store.record({tweet_id: reading}, now=posted_at + hour * HOUR) == 1
+
+    assert store.series(tweet_id) == [dict(reading, time=posted_at + hour * HOUR)
+                                      for hour, reading in enumerate(readings, start=1)]
+    assert store.series(tweet_id_at(posted_at + 1)) == []
+    store.close()
+
+def test_due_hands_out_the_most_overdue_first(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    now = 1700000000
+    young = tweet_id_at(now - HOUR)  # Read hourly
+    middle = tweet_id_at(now - 3 * DAY)  # Read daily
+    old = tweet_id_at(now - 30 * DAY)  # Read weekly
+    store.record({young: metrics(), middle: metrics(), old: metrics()}, now=now)
+
+    assert store.due(10, now=now) == []
+    assert store.due(10, now=now + HOUR) == [young]
+    assert store.due(10, now=now + DAY) == [young, middle]
+    assert store.due(10, now=now + WEEK) == [young, middle, old]
+    assert store.due(2, now=now + WEEK) == [young, middle]
+
+    # A fresh reading moves the young tweet to the back of the queue
+    store.record({young: metrics(like_count=1)}, now=now + DAY)
+    assert store.due(10, now=now + DAY) == [middle]
+
+    store.retire([middle])
+    assert store.due(10, now=now + WEEK) == [young, old]
+    stats = store.stats(now=now + WEEK)
+    assert (stats['tweets'], stats['readings'], stats['due']) == (3, 4, 2)
+    store.close()
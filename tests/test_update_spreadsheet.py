@@ -0,0 +1,61 @@
+import app
+from fake_backends import make_tweets
+
+def sent_requests(twitter):
+    return {name: count for name, count in twitter.recorder.calls.items() if name.startswith('sheets.')}
+
+def tweet_ids(spreadsheet):
+    return [row[app.TWEET_ID_COLUMN] for row in spreadsheet.tabs['posts'][1:]]
+
+def test_first_sync_is_one_batch_update(fake_app):
+    account, twitter, spreadsheet = fake_app
+    tweets = make_tweets(5)[::-1]
+
+    assert app.update_spreadsheet(tweets, account=account)
+    # One metadata read, then header, rows and formatting in a single write
+    assert sent_requests(twitter) == {'sheets.get': 1, 'sheets.batchUpdate': 1}
+    assert spreadsheet.tabs['posts'][0] == list(app.HEADERS)
+    assert tweet_ids(spreadsheet) == [str(t.id) for t in tweets]
+    assert app.get_journal(account).pending() == []
+
+def test_later_syncs_use_cached_header_state(fake_app):
+    account, twitter, spreadsheet = fake_app
+    tweets = make_tweets(6)
+    app.update_spreadsheet(tweets[:3][::-1], account=account)
+    twitter.recorder.reset()
+
+    assert app.update_spreadsheet(tweets[3:][::-1], account=account)
+    assert sent_requests(twitter) == {'sheets.batchUpdate': 1}
+    assert tweet_ids(spreadsheet) == [str(t.id) for t in tweets[::-1]]
+
+def test_write_is_guarded_by_its_first_row(fake_app, monkeypatch):
+    account, _, spreadsheet = fake_app
+    tweets = make_tweets(6)[::-1]
+    # A sync's second page goes in below the first
+    app.update_spreadsheet(tweets[:3], account=account)
+    journal = app.get_journal(account)
+    planned = []
+    plan = journal.plan
+
+    def record_plan(*args, **kwargs):
+        planned.append(plan(*args, **kwargs))
+        return planned[-1]
+    monkeypatch.setattr(journal, 'plan', record_plan)
+
+    assert app.update_spreadsheet(tweets[3:], account=account)
+    (entry,) = planned
+    assert entry['kind'] == 'batchUpdate'
+    assert entry['guard'] == ['posts!U5', str(tweets[3].id)]
+    assert app.guard_holds(entry)
+    assert tweet_ids(spreadsheet) == [str(t.id) for t in tweets]
+
+def test_failed_write_leaves_no_blank_rows(fake_app, monkeypatch):
+    account, twitter, spreadsheet = fake_app
+    tweets = make_tweets(3)[::-1]
+    monkeypatch.setattr(app, 'WRITE_ATTEMPTS', 1)
+    monkeypatch.setattr(spreadsheet, 'apply', lambda request: (_ for _ in ()).throw(OSError('connection reset')))
+
+    assert not app.update_spreadsheet(tweets, account=account)
+    # The insert and the cell data are one request, so nothing landed
+    assert spreadsheet.tabs['posts'] == []
+    assert len(app.get_journal(account).pending()) == 1
@@ -0,0 +1,284 @@
+"""
+Typed exports of the tweet history.
+
+Rows come from the local store in the sheet's column order (the same rows
+update_spreadsheet writes) and are converted to typed values: integers for
+counts, a float for the engagement rate, booleans for the TRUE/FALSE flags
+and real dates and times. Output is produced one store batch at a time, so
+memory stays flat however long the history is.
+
+CSV needs nothing extra. Parquet and Arrow need pyarrow, which is imported
+only when one of those formats is asked for. The Arrow IPC file written by
+write_local_copy() can be opened with pyarrow.memory_map() for zero-copy reads.
+"""
+import csv
+import io
+import os
+from datetime import date, time as dt_time
+
+from tweet_store import COLUMNS, snowflake_time
+
+EXPORT_BATCH_SIZE = 5000  # Rows per store query / record batch
+LOCAL_COPY_FILE = 'tweets.arrow'  # Per account, next to the store (see write_local_copy)
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows')
+}
+
+# Column -> type for every exported column; created_at is derived from the tweet ID
+EXPORT_COLUMNS = [
+    ('tweet_id', 'int'),
+    ('created_at', 'timestamp'),
+    ('date', 'date'),
+    ('time', 'time'),
+    ('time_period', 'string'),
+    ('day_of_week', 'string'),
+    ('content', 'string'),
+    ('total_engagements', 'int'),
+    ('likes', 'int'),
+    ('retweets', 'int'),
+    ('bookmarks', 'int'),
+    ('replies', 'int'),
+    ('quotes', 'int'),
+    ('impressions', 'int'),
+    ('engagement_rate', 'float'),
+    ('tweet_type', 'string'),
+    ('has_link', 'bool'),
+    ('has_image', 'bool'),
+    ('image_count', 'int'),
+    ('has_video', 'bool'),
+    ('hashtag_count', 'int'),
+    ('mention_count', 'int'),
+    ('sync_time', 'string')
+]
+
+COLUMN_INDEX = {name: index for index, name in enumerate(COLUMNS)}
+
+class ExportUnavailable(Exception):
+    """The requested format needs an optional dependency that isn't installed"""
+
+def require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ExportUnavailable("Parquet and Arrow exports need pyarrow (pip install pyarrow)")
+    return pyarrow
+
+def parse_int(value):
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_rate(value):
+    """'12.5%' (or 12.5) -> 12.5"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(str(value).rstrip('%'))
+    except ValueError:
+        return None
+
+def parse_bool(value):
+    """'TRUE'/'FALSE' -> True/False; anything else (e.g. 'POSSIBLE') -> None"""
+    text = str(value).upper()
+    if text == 'TRUE':
+        return True
+    if text == 'FALSE':
+        return False
+    return None
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+def parse_time(value):
+    """'14:05:09 ET' -> time(14, 5, 9)"""
+    try:
+        return dt_time.fromisoformat(str(value).split(' ')[0])
+    except ValueError:
+        return None
+
+PARSERS = {
+    'int': parse_int,
+    'float': parse_rate,
+    'bool': parse_bool,
+    'date': parse_date,
+    'time': parse_time,
+    'string': lambda value: '' if value is None else str(value)
+}
+
+def typed_row(row):
+    """Convert one sheet/store row (columns A:V) to typed values in EXPORT_COLUMNS order"""
+    values = []
+    for name, kind in EXPORT_COLUMNS:
+        if name == 'created_at':
+            values.append(snowflake_time(row[COLUMN_INDEX['tweet_id']]))
+            continue
+        index = COLUMN_INDEX[name]
+        values.append(PARSERS[kind](row[index] if index < len(row) else None))
+    return values
+
+def iter_typed_batches(store, batch_size=EXPORT_BATCH_SIZE, newest_first=True):
+    """Yield lists of typed rows, one store batch at a time"""
+    for rows in store.iter_rows(batch_size=batch_size, newest_first=newest_first):
+        yield [typed_row(row) for row in rows]
+
+def format_csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+def iter_csv(batches):
+    """Yield CSV text: the header, then one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+
+    for batch in batches:
+        writer.writerows([format_csv_value(v) for v in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def arrow_schema():
+    pa = require_pyarrow()
+    types = {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'bool': pa.bool_(),
+        'date': pa.date32(),
+        'time': pa.time32('ms'),  # Parquet has no seconds unit; keep every format identical
+        'timestamp': pa.timestamp('ms', tz='UTC'),
+        'string': pa.string()
+    }
+    return pa.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS])
+
+def to_record_batch(batch, schema):
+    pa = require_pyarrow()
+    columns = list(zip(*batch)) if batch else [[] for _ in EXPORT_COLUMNS]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
+
+class ChunkSink:
+    """Write-only file object that hands back whatever was written since the last drain()"""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def iter_arrow(batches, fmt='arrow'):
+    """Yield Parquet ('parquet') or Arrow IPC stream ('arrow') bytes, one chunk per batch"""
+    pa = require_pyarrow()
+    schema = arrow_schema()
+    sink = ChunkSink()
+    stream = pa.PythonFile(sink, mode='w')
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(stream, schema)
+    else:
+        writer = pa.ipc.new_stream(stream, schema)
+
+    try:
+        for batch in batches:
+            # Parquet gets one row group per batch
+            writer.write_batch(to_record_batch(batch, schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+def iter_export(store, fmt='csv', batch_size=EXPORT_BATCH_SIZE):
+    """Stream the store's full history in the given format"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(FORMATS)})")
+    batches = iter_typed_batches(store, batch_size)
+    if fmt == 'csv':
+        return (chunk.encode('utf-8') for chunk in iter_csv(batches))
+    # Fail now rather than halfway through a streamed response
+    require_pyarrow()
+    return iter_arrow(batches, fmt)
+
+def write_export(store, path, fmt='csv', batch_size=EXPORT_BATCH_SIZE):
+    """Write an export to path atomically. Returns the number of bytes written."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    written = 0
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        for chunk in iter_export(store, fmt, batch_size):
+            f.write(chunk)
+            written += len(chunk)
+    os.replace(tmp_path, path)
+    return written
+
+def write_local_copy(store, path, batch_size=EXPORT_BATCH_SIZE):
+    """Write the history as an uncompressed Arrow IPC file for memory-mapped reads.
+
+    Read it back with pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all();
+    the columns point straight into the mapped file instead of being copied.
+    Returns the number of rows written.
+    """
+    pa = require_pyarrow()
+    schema = arrow_schema()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    rows = 0
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in iter_typed_batches(store, batch_size):
+            writer.write_batch(to_record_batch(batch, schema))
+            rows += len(batch)
+    os.replace(tmp_path, path)
+    return rows
+
+def open_local_copy(path):
+    """Memory-map a local copy written by write_local_copy() as a pyarrow Table"""
+    pa = require_pyarrow()
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
@@ -0,0 +1,285 @@
+"""
+Local SQLite mirror of the posts sheet.
+
+Every row written to the sheet goes through here first, so since_id lookups,
+sort order and historical queries are answered locally and the Sheets API is
+only used for writes. Rows use the same column order as the sheet (A:V).
+
+It also caches media_key -> media type from the media expansion, so rows can
+be rebuilt without requesting media again.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+# Sheet column order (A:V) mapped to store columns
+COLUMNS = [
+    'date', 'time', 'time_period', 'day_of_week', 'content', 'total_engagements',
+    'likes', 'retweets', 'bookmarks', 'replies', 'quotes', 'impressions',
+    'engagement_rate', 'tweet_type', 'has_link', 'has_image', 'image_count', 'has_video',
+    'hashtag_count', 'mention_count', 'tweet_id', 'sync_time'
+]
+METRIC_COLUMNS = COLUMNS[5:13]
+TWEET_ID_INDEX = COLUMNS.index('tweet_id')
+
+# Tweet IDs are snowflakes: the top bits are milliseconds since this epoch
+TWITTER_EPOCH_MS = 1288834974657
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    tweet_id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    date TEXT,
+    time TEXT,
+    time_period TEXT,
+    day_of_week TEXT,
+    content TEXT,
+    total_engagements INTEGER,
+    likes INTEGER,
+    retweets INTEGER,
+    bookmarks INTEGER,
+    replies INTEGER,
+    quotes INTEGER,
+    impressions INTEGER,
+    engagement_rate TEXT,
+    tweet_type TEXT,
+    has_link TEXT,
+    has_image TEXT,
+    image_count INTEGER,
+    has_video TEXT,
+    hashtag_count INTEGER,
+    mention_count INTEGER,
+    sync_time TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tweets_created_at ON tweets (created_at);
+CREATE TABLE IF NOT EXISTS media (
+    media_key TEXT PRIMARY KEY,
+    type TEXT NOT NULL
+);
+"""
+
+def snowflake_time(tweet_id):
+    """Get the UTC creation time encoded in a tweet ID"""
+    timestamp_ms = (int(tweet_id) >> 22) + TWITTER_EPOCH_MS
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
+class TweetStore:
+    """Thread-safe SQLite store of sheet rows keyed by tweet ID"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def upsert_rows(self, rows):
+        """Insert or replace sheet rows. Returns the number of rows written."""
+        records = []
+        for row in rows:
+            row = list(row) + [''] * (len(COLUMNS) - len(row))
+            tweet_id = int(row[TWEET_ID_INDEX])
+            created_at = snowflake_time(tweet_id).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+            records.append([tweet_id, created_at] + [value for i, value in enumerate(row) if i != TWEET_ID_INDEX])
+
+        if not records:
+            return 0
+
+        columns = ['tweet_id', 'created_at'] + [c for c in COLUMNS if c != 'tweet_id']
+        placeholders = ', '.join('?' * len(columns))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO tweets ({', '.join(columns)}) VALUES ({placeholders})",
+                records
+            )
+            self._writes += 1
+        return len(records)
+
+    def clear(self):
+        """Delete every stored tweet (media types are kept). Returns the number deleted."""
+        with self._lock, self._conn:
+            deleted = self._conn.execute('DELETE FROM tweets').rowcount
+            self._writes += 1
+        return deleted
+
+    def update_metrics(self, tweet_id, metric_cells):
+        """Overwrite the metric columns (F:M) for one tweet"""
+        assignments = ', '.join(f'{c} = ?' for c in METRIC_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE tweets SET {assignments} WHERE tweet_id = ?",
+                list(metric_cells) + [int(tweet_id)]
+            )
+            self._writes += 1
+
+    def save_media_types(self, media_types):
+        """Cache media_key -> type pairs. Returns the number written."""
+        if not media_types:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO media (media_key, type) VALUES (?, ?)',
+                media_types.items()
+            )
+        return len(media_types)
+
+    def media_types(self, media_keys):
+        """Look up cached types for media keys; unknown keys are left out"""
+        media_keys = list(set(media_keys))
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(media_keys), 500):
+                chunk = media_keys[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                found.update(self._conn.execute(
+                    f'SELECT media_key, type FROM media WHERE media_key IN ({placeholders})',
+                    chunk
+                ).fetchall())
+        return found
+
+    def version(self):
+        """Changes whenever the tweets change, in this process or another one"""
+        with self._lock:
+            data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            return (self._writes, data_version)
+
+    def latest_tweet_id(self):
+        """ID of the newest stored tweet, or None if the store is empty"""
+        with self._lock:
+            row = self._conn.execute('SELECT MAX(tweet_id) FROM tweets').fetchone()
+        return str(row[0]) if row and row[0] is not None else None
+
+    def oldest_tweet_id(self):
+        """ID of the oldest stored tweet, or None if the store is empty"""
+        with self._lock:
+            row = self._conn.execute('SELECT MIN(tweet_id) FROM tweets').fetchone()
+        return str(row[0]) if row and row[0] is not None else None
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM tweets').fetchone()[0]
+
+    def has_tweet(self, tweet_id):
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM tweets WHERE tweet_id = ?', (int(tweet_id),)).fetchone()
+        return row is not None
+
+    def count_newer(self, tweet_id):
+        """Number of stored tweets newer than tweet_id, i.e. its row offset in a newest-first sheet"""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM tweets WHERE tweet_id > ?', (int(tweet_id),)).fetchone()[0]
+
+    def known_ids(self, tweet_ids):
+        """The given tweet IDs (as text) that are already stored"""
+        tweet_ids = [int(tweet_id) for tweet_id in tweet_ids]
+        if not tweet_ids:
+            return set()
+        placeholders = ', '.join('?' * len(tweet_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT tweet_id FROM tweets WHERE tweet_id IN ({placeholders})',
+                tweet_ids
+            ).fetchall()
+        return {str(row[0]) for row in rows}
+
+    def tweet_ids(self, newest_first=True):
+        """All stored tweet IDs as strings, in sheet order by default"""
+        order = 'DESC' if newest_first else 'ASC'
+        with self._lock:
+            rows = self._conn.execute(f'SELECT tweet_id FROM tweets ORDER BY tweet_id {order}').fetchall()
+        return [str(r[0]) for r in rows]
+
+    def iter_rows(self, batch_size=1000, newest_first=True, since=None, until=None):
+        """Yield batches of sheet rows ordered by tweet ID.
+
+        since/until filter on created_at (ISO 8601 UTC strings). Each batch is
+        fetched with keyset pagination so memory stays bounded by batch_size.
+        """
+        order = 'DESC' if newest_first else 'ASC'
+        compare = '<' if newest_first else '>'
+        select = ', '.join(COLUMNS[:TWEET_ID_INDEX] + ['CAST(tweet_id AS TEXT)'] + COLUMNS[TWEET_ID_INDEX + 1:])
+
+        filters = []
+        params = []
+        if since:
+            filters.append('created_at >= ?')
+            params.append(since)
+        if until:
+            filters.append('created_at < ?')
+            params.append(until)
+
+        last_id = None
+        while True:
+            clauses = list(filters)
+            batch_params = list(params)
+            if last_id is not None:
+                clauses.append(f'tweet_id {compare} ?')
+                batch_params.append(last_id)
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+            with self._lock:
+                batch = self._conn.execute(
+                    f'SELECT {select} FROM tweets {where} ORDER BY tweet_id {order} LIMIT ?',
+                    batch_params + [batch_size]
+                ).fetchall()
+
+            if not batch:
+                return
+
+            yield [list(row) for row in batch]
+            last_id = int(batch[-1][TWEET_ID_INDEX])
+
+    def fetch_columns(self, columns):
+        """All rows of the given store columns (or SQL expressions) as tuples, oldest first"""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT {', '.join(columns)} FROM tweets ORDER BY tweet_id"
+            ).fetchall()
+
+    def rows_by_id(self, tweet_ids):
+        """Map tweet ID (as text) -> sheet row for the given IDs that are stored"""
+        tweet_ids = [int(tweet_id) for tweet_id in tweet_ids]
+        select = ', '.join(COLUMNS[:TWEET_ID_INDEX] + ['CAST(tweet_id AS TEXT)'] + COLUMNS[TWEET_ID_INDEX + 1:])
+        found = {}
+        with self._lock:
+            for start in range(0, len(tweet_ids), 500):
+                chunk = tweet_ids[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                for row in self._conn.execute(f'SELECT {select} FROM tweets WHERE tweet_id IN ({placeholders})', chunk):
+                    found[row[TWEET_ID_INDEX]] = list(row)
+        return found
+
+    def contents(self, tweet_ids):
+        """Map tweet ID (as text) -> content for the given IDs"""
+        tweet_ids = [int(tweet_id) for tweet_id in tweet_ids]
+        if not tweet_ids:
+            return {}
+        placeholders = ', '.join('?' * len(tweet_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT tweet_id, content FROM tweets WHERE tweet_id IN ({placeholders})',
+                tweet_ids
+            ).fetchall()
+        return {str(tweet_id): content for tweet_id, content in rows}
+
+    def get_rows(self, limit=None, newest_first=True):
+        """Return up to limit rows in sheet order"""
+        rows = []
+        for batch in self.iter_rows(batch_size=limit or 1000, newest_first=newest_first):
+            rows.extend(batch)
+            if limit and len(rows) >= limit:
+                return rows[:limit]
+        return rows
@@ -0,0 +1,45 @@
+"""
+Twitter API client that spends the shared rate-limit budget.
+
+Kept apart from rate_limit.py because importing tweepy is slow: only code
+that actually talks to Twitter pays for it.
+"""
+import time
+
+import tweepy
+
+from metrics import api_call
+from rate_limit import RESET_MARGIN, RateLimitExceeded, RateLimitTracker, endpoint_key
+
+class RateLimitedClient(tweepy.Client):
+    """tweepy.Client that schedules every request within the shared budget"""
+
+    def __init__(self, *args, rate_limits=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limits = rate_limits or RateLimitTracker()
+
+    def request(self, method, route, params=None, json=None, user_auth=False):
+        endpoint = endpoint_key(method, route)
+
+        for attempt in range(2):
+            self.rate_limits.acquire(endpoint)
+            try:
+                with api_call('twitter', endpoint) as call:
+                    try:
+                        response = super().request(method, route, params=params, json=json, user_auth=user_auth)
+                    except tweepy.HTTPException as e:
+                        call['status'] = e.response.status_code
+                        raise
+                    call['status'] = response.status_code
+            except tweepy.TooManyRequests as e:
+                # Spent elsewhere (another process or app): wait for the reset and
+                # try once more, or give up if the window is too far away
+                reset_at = int(e.response.headers.get('x-rate-limit-reset', 0)) or int(time.time()) + 15 * 60
+                reset_at = max(reset_at, int(time.time()) + RESET_MARGIN)
+                self.rate_limits.exhaust(endpoint, reset_at)
+                if attempt:
+                    raise RateLimitExceeded(endpoint, reset_at) from e
+                continue
+
+            self.rate_limits.update(endpoint, response.headers)
+            return response